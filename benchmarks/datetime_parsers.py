@@ -0,0 +1,125 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Compares the DATE, TIME, TIMESTAMP and TIMESTAMPTZ parsers in vertica_python.vertica.column
+with the strptime based implementations they replaced.
+
+Usage (from the root of the source tree):
+  $ PYTHONPATH=. python benchmarks/datetime_parsers.py [number_of_calls]
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import re
+import sys
+import timeit
+from datetime import date, datetime
+
+import pytz
+from dateutil import parser
+
+from vertica_python.compat import as_str
+from vertica_python.vertica.column import (date_parse, time_parse, timestamp_parse,
+                                           timestamp_tz_parse)
+
+YEARS_RE = re.compile(r"^([0-9]+)-")
+
+
+# Reference implementations, as of vertica-python 0.9.3
+def legacy_timestamp_parse(s):
+    s = as_str(s)
+    try:
+        if len(s) == 19:
+            return datetime.strptime(s, '%Y-%m-%d %H:%M:%S')
+        return datetime.strptime(s, '%Y-%m-%d %H:%M:%S.%f')
+    except ValueError:
+        year = YEARS_RE.match(s).groups()[0]
+        s = s[len(year) + 1:]
+        if len(s) == 14:
+            dt = datetime.strptime(s, '%m-%d %H:%M:%S')
+        else:
+            dt = datetime.strptime(s, '%m-%d %H:%M:%S.%f')
+        return dt.replace(year=min(int(year), 9999))
+
+
+def legacy_timestamp_tz_parse(s):
+    s = as_str(s)
+    if s.endswith('+00'):
+        return legacy_timestamp_parse(s[:-3]).replace(tzinfo=pytz.UTC)
+    return parser.parse(s)
+
+
+def legacy_time_parse(s):
+    s = as_str(s)
+    if len(s) == 8:
+        return datetime.strptime(s, '%H:%M:%S').time()
+    return datetime.strptime(s, '%H:%M:%S.%f').time()
+
+
+def legacy_date_parse(s):
+    s = as_str(s)
+    return date(*map(lambda x: min(int(x), 9999), s.split('-')))
+
+
+CASES = [
+    ('timestamp', b'2015-10-21 11:12:03', legacy_timestamp_parse, timestamp_parse),
+    ('timestamp(6)', b'2015-10-21 11:12:03.002343', legacy_timestamp_parse, timestamp_parse),
+    ('timestamp > 9999', b'19850-10-26 01:25:01.1', legacy_timestamp_parse, timestamp_parse),
+    ('timestamptz +00', b'2015-10-21 11:12:03.002343+00', legacy_timestamp_tz_parse,
+     timestamp_tz_parse),
+    ('timestamptz -05', b'2015-10-21 11:12:03.002343-05', legacy_timestamp_tz_parse,
+     timestamp_tz_parse),
+    ('timestamptz +05:30', b'2015-10-21 11:12:03+05:30', legacy_timestamp_tz_parse,
+     timestamp_tz_parse),
+    ('time', b'11:12:03', legacy_time_parse, time_parse),
+    ('time(6)', b'11:12:03.002343', legacy_time_parse, time_parse),
+    ('date', b'2015-10-21', legacy_date_parse, date_parse),
+]
+
+
+def main(number):
+    print('{0:<18}{1:>14}{2:>14}{3:>10}'.format('value', 'legacy (us)', 'current (us)', 'speedup'))
+    for name, value, legacy, current in CASES:
+        assert legacy(value) == current(value), name
+        legacy_time = min(timeit.repeat(lambda: legacy(value), number=number, repeat=3))
+        current_time = min(timeit.repeat(lambda: current(value), number=number, repeat=3))
+        print('{0:<18}{1:>14.3f}{2:>14.3f}{3:>9.1f}x'.format(
+            name, legacy_time / number * 1e6, current_time / number * 1e6,
+            legacy_time / current_time))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
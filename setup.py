@@ -59,6 +59,11 @@ setup(
         'future',
         'six>=1.10.0'
     ],
+    extras_require={
+        'numpy': ['numpy'],
+        'pandas': ['pandas'],
+        'pyarrow': ['pyarrow', 'numpy'],
+    },
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
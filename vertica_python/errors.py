@@ -104,17 +104,29 @@ class MessageError(InternalError):
     pass
 
 
+class PoolError(InterfaceError):
+    pass
+
+
+class PoolTimeoutError(PoolError):
+    pass
+
+
 class EmptyQueryError(ProgrammingError):
     pass
 
 
 class QueryError(ProgrammingError):
-    def __init__(self, error_response, sql):
+    def __init__(self, error_response, sql, batch_index=None):
         self.error_response = error_response
         self.sql = sql
-        ProgrammingError.__init__(self,
-                                  "{0}, SQL: {1}".format(error_response.error_message(),
-                                                         repr(self.one_line_sql())))
+        # index of the failing parameter set of an executemany()
+        self.batch_index = batch_index
+        message = "{0}, SQL: {1}".format(error_response.error_message(),
+                                         repr(self.one_line_sql()))
+        if batch_index is not None:
+            message += ", parameter set: {0}".format(batch_index)
+        ProgrammingError.__init__(self, message)
 
     def one_line_sql(self):
         if self.sql:
@@ -123,11 +135,11 @@ class QueryError(ProgrammingError):
             return ''
 
     @classmethod
-    def from_error_response(cls, error_response, sql):
+    def from_error_response(cls, error_response, sql, batch_index=None):
         klass = QUERY_ERROR_CLASSES.get(error_response.sqlstate, None)
         if klass is None:
             klass = cls
-        return klass(error_response, sql)
+        return klass(error_response, sql, batch_index)
 
 
 class LockFailure(QueryError):
@@ -0,0 +1,302 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+Thread-safe connection pool
+
+A ConnectionPool keeps a bounded set of open connections to be shared by the
+threads of an application, so that connection setup (authentication, load
+balancing, SSL handshake) is paid once per connection rather than once per
+unit of work:
+
+>> pool = ConnectionPool(conn_info, min_size=2, max_size=10)
+>> with pool.connection() as conn:
+>>     cur = conn.cursor()
+>>     cur.execute("SELECT 1")
+
+A connection is reused as long as it is alive. Connections idle for longer than
+idle_timeout are closed (keeping at least min_size connections open), and
+connections older than max_lifetime are closed instead of being reused.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from . import errors
+from .vertica.connection import connect
+
+_now = getattr(time, 'monotonic', time.time)
+
+
+class _PoolEntry(object):
+    __slots__ = ('connection', 'created', 'last_used')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created = self.last_used = _now()
+
+
+class ConnectionPool(object):
+    def __init__(self, conn_info, min_size=0, max_size=10, idle_timeout=600,
+                 max_lifetime=3600, check_interval=30, timeout=None):
+        """
+        conn_info: the keyword arguments of vertica_python.connect()
+        min_size: the number of connections opened with the pool and kept open
+        max_size: the maximum number of open connections, idle or in use
+        idle_timeout: seconds after which an idle connection is closed
+                      (None: never)
+        max_lifetime: seconds after which a connection is closed instead of
+                      being reused (None: never)
+        check_interval: a connection idle for at least this many seconds is
+                        checked with a round trip to the server before being
+                        handed out (0: always, None: never)
+        timeout: default number of seconds getconn() waits for a connection
+                 when max_size connections are in use (None: forever)
+        """
+        if max_size < 1:
+            raise ValueError('max_size must be a positive integer')
+        if not 0 <= min_size <= max_size:
+            raise ValueError('min_size must be between 0 and max_size')
+
+        self.conn_info = dict(conn_info)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.check_interval = check_interval
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # least recently used first
+        self._in_use = {}
+        self._size = 0  # connections open or being opened
+        self._closed = False
+
+        try:
+            for _ in range(min_size):
+                self._idle.append(self._open())
+                self._size += 1
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value, traceback):
+        self.close()
+
+    @property
+    def size(self):
+        """The number of open connections, idle or in use"""
+        return self._size
+
+    @property
+    def idle(self):
+        """The number of idle connections"""
+        return len(self._idle)
+
+    def closed(self):
+        return self._closed
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Checks out a connection for the duration of a with block, and returns
+        it to the pool at the end of the block.
+        """
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def getconn(self, timeout=None):
+        """
+        Checks out a connection. If max_size connections are in use, waits
+        for one to be returned for up to timeout seconds (default: the timeout
+        of the pool) and raises PoolTimeoutError after that.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        deadline = None if timeout is None else _now() + timeout
+
+        while True:
+            entry, expired = self._checkout(deadline)
+            for stale in expired:
+                self._close(stale)
+
+            if entry is None:
+                # a slot was reserved for a new connection
+                try:
+                    entry = self._open()
+                except Exception:
+                    self._release_slot()
+                    raise
+            elif not self._alive(entry):
+                self._close(entry)
+                self._release_slot()
+                continue
+
+            with self._cond:
+                self._in_use[id(entry.connection)] = entry
+            return entry.connection
+
+    def putconn(self, conn, close=False):
+        """
+        Returns a connection to the pool. Its remaining results are discarded
+        and its transaction is rolled back; the connection is closed instead
+        if close is True, if it cannot be reset or if it is too old.
+        """
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            raise errors.PoolError('Connection is not checked out from this pool')
+
+        if (close or self._closed or self._expired(entry, _now())
+                or not self._reset(conn)):
+            self._close(entry)
+            self._release_slot()
+            return
+
+        entry.last_used = _now()
+        with self._cond:
+            if not self._closed:
+                self._idle.append(entry)
+                self._cond.notify()
+                return
+        # the pool was closed during the reset
+        self._close(entry)
+        self._release_slot()
+
+    def close(self):
+        """
+        Closes the idle connections. Connections in use are closed when they
+        are returned, and getconn() fails from now on.
+        """
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close(entry)
+
+    #############################################
+    # internal
+    #############################################
+    def _connect(self):
+        return connect(**self.conn_info)
+
+    def _open(self):
+        return _PoolEntry(self._connect())
+
+    def _checkout(self, deadline):
+        # Returns (an idle entry or None if a slot was reserved for a new
+        # connection, the expired idle entries that were removed)
+        expired = []
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise errors.PoolError('Connection pool is closed')
+
+                now = _now()
+                while self._idle:
+                    # the least recently used connections expire first
+                    entry = self._idle[0]
+                    if not (self._expired(entry, now) or
+                            (self.idle_timeout is not None and
+                             now - entry.last_used > self.idle_timeout and
+                             self._size - len(expired) > self.min_size)):
+                        break
+                    expired.append(self._idle.popleft())
+                self._size -= len(expired)
+
+                if self._idle:
+                    return self._idle.pop(), expired
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, expired
+
+                remaining = None if deadline is None else deadline - now
+                if remaining is not None and remaining <= 0:
+                    raise errors.PoolTimeoutError(
+                        'No connection available within the timeout, {0} connections in use'
+                        .format(self.max_size))
+                self._cond.wait(remaining)
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _expired(self, entry, now):
+        return self.max_lifetime is not None and now - entry.created > self.max_lifetime
+
+    def _alive(self, entry):
+        conn = entry.connection
+        if conn.closed():
+            return False
+        if self.check_interval is None or _now() - entry.last_used < self.check_interval:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute('SELECT 1')
+            cur.fetchall()
+            return True
+        except Exception:
+            return False
+
+    def _reset(self, conn):
+        # Brings a returned connection back to a clean transaction state
+        try:
+            if conn.closed():
+                return False
+            conn._discard_results()
+            if conn.transaction_status != 'no_transaction':
+                conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _close(self, entry):
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
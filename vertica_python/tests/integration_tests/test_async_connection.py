@@ -0,0 +1,88 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+from __future__ import print_function, division, absolute_import
+
+from .base import VerticaPythonIntegrationTestCase
+
+try:
+    import asyncio
+    from ...vertica.async_connection import async_connect
+except (ImportError, SyntaxError):
+    # Python 2 or Python < 3.5
+    asyncio = None
+
+
+class AsyncConnectionTestCase(VerticaPythonIntegrationTestCase):
+    def setUp(self):
+        super(AsyncConnectionTestCase, self).setUp()
+        if asyncio is None:
+            self.skipTest('asyncio connections require Python 3.5 or later')
+        self._table = 'async_connection_test'
+        self.loop = asyncio.new_event_loop()
+        self.conn = self._run(async_connect(**self._conn_info))
+        self.cur = self.conn.cursor()
+        self._run(self.cur.execute("DROP TABLE IF EXISTS {0}".format(self._table)))
+
+    def tearDown(self):
+        if asyncio is not None:
+            self._run(self.cur.execute("DROP TABLE IF EXISTS {0}".format(self._table)))
+            self._run(self.conn.close())
+            self.loop.close()
+        super(AsyncConnectionTestCase, self).tearDown()
+
+    def _run(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_execute_and_copy(self):
+        self._run(self.cur.execute("CREATE TABLE {0} (a INT, b VARCHAR)".format(self._table)))
+        self._run(self.cur.copy("COPY {0} FROM STDIN DELIMITER ','".format(self._table),
+                                "1,aa\n2,bb\n"))
+        self._run(self.cur.execute("SELECT a, b FROM {0} ORDER BY a".format(self._table)))
+        self.assertListOfListsEqual(self._run(self.cur.fetchmany(1)), [[1, 'aa']])
+        self.assertListOfListsEqual(self._run(self.cur.fetchall()), [[2, 'bb']])
+
+    def test_concurrent_queries(self):
+        conns = self._run(asyncio.gather(*[async_connect(**self._conn_info) for _ in range(3)]))
+        try:
+            cursors = [conn.cursor() for conn in conns]
+            self._run(asyncio.gather(*[cur.execute("SELECT {0}".format(i))
+                                       for i, cur in enumerate(cursors)]))
+            results = self._run(asyncio.gather(*[cur.fetchall() for cur in cursors]))
+            self.assertListEqual(results, [[[0]], [[1]], [[2]]])
+        finally:
+            self._run(asyncio.gather(*[conn.close() for conn in conns]))
+
+
+exec(AsyncConnectionTestCase.createPrepStmtClass())
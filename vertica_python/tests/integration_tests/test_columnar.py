@@ -0,0 +1,147 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import print_function, division, absolute_import
+
+from datetime import date
+
+from .base import VerticaPythonIntegrationTestCase
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class ColumnarFetchTestCase(VerticaPythonIntegrationTestCase):
+    def setUp(self):
+        super(ColumnarFetchTestCase, self).setUp()
+        self._table = 'columnar_fetch_test'
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("DROP TABLE IF EXISTS {0}".format(self._table))
+            cur.execute("CREATE TABLE {0} (a INT, b FLOAT, c BOOLEAN, d VARCHAR, e DATE)"
+                        .format(self._table))
+            cur.execute("INSERT INTO {0} VALUES (1, 1.5, true, 'aa', '2015-10-21')"
+                        .format(self._table))
+            cur.execute("INSERT INTO {0} VALUES (2, NULL, false, NULL, NULL)"
+                        .format(self._table))
+            conn.commit()
+
+    def tearDown(self):
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("DROP TABLE IF EXISTS {0}".format(self._table))
+        super(ColumnarFetchTestCase, self).tearDown()
+
+    def test_fetchnumpy(self):
+        if numpy is None:
+            self.skipTest('numpy is not installed')
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT * FROM {0} ORDER BY a".format(self._table))
+            res = cur.fetchnumpy()
+            self.assertListEqual(list(res.keys()), ['a', 'b', 'c', 'd', 'e'])
+            self.assertEqual(res['a'].dtype, numpy.int64)
+            self.assertListEqual(res['a'].tolist(), [1, 2])
+            self.assertIsInstance(res['b'], numpy.ma.MaskedArray)
+            self.assertListEqual(res['b'].tolist(), [1.5, None])
+            self.assertListEqual(res['c'].tolist(), [True, False])
+            self.assertListEqual(res['d'].tolist(), ['aa', None])
+            self.assertListEqual(res['e'].tolist(), [date(2015, 10, 21), None])
+            self.assertEqual(cur.rowcount, 2)
+            self.assertIsNone(cur.fetchone())
+
+    def test_fetch_dataframe(self):
+        if pandas is None:
+            self.skipTest('pandas is not installed')
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT * FROM {0} ORDER BY a".format(self._table))
+            df = cur.fetch_dataframe()
+            self.assertListEqual(list(df.columns), ['a', 'b', 'c', 'd', 'e'])
+            self.assertEqual(df['a'].dtype, 'Int64')
+            self.assertListEqual(df['a'].tolist(), [1, 2])
+            self.assertEqual(df['b'].dtype, numpy.float64)
+            self.assertTrue(numpy.isnan(df['b'][1]))
+            self.assertEqual(df['c'].dtype, 'boolean')
+            self.assertListEqual(df['d'].tolist(), ['aa', None])
+            self.assertEqual(cur.rowcount, 2)
+
+    def test_fetch_dataframe_chunks(self):
+        if pandas is None:
+            self.skipTest('pandas is not installed')
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT * FROM {0} ORDER BY a".format(self._table))
+            chunks = []
+            df = cur.fetch_dataframe(chunk_size=1)
+            while len(df):
+                chunks.append(df)
+                df = cur.fetch_dataframe(chunk_size=1)
+            self.assertEqual(len(chunks), 2)
+            self.assertListEqual([chunk['a'][0] for chunk in chunks], [1, 2])
+            self.assertEqual(chunks[0]['a'].dtype, chunks[1]['a'].dtype)
+
+    def test_fetch_arrow_batches(self):
+        if pyarrow is None:
+            self.skipTest('pyarrow is not installed')
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT * FROM {0} ORDER BY a".format(self._table))
+            batches = list(cur.fetch_arrow_batches(batch_size=1))
+            self.assertEqual(len(batches), 2)
+            schema = batches[0].schema
+            self.assertListEqual(schema.names, ['a', 'b', 'c', 'd', 'e'])
+            self.assertListEqual(schema.types, [pyarrow.int64(), pyarrow.float64(), pyarrow.bool_(),
+                                                pyarrow.string(), pyarrow.date32()])
+            self.assertTrue(batches[1].schema.equals(schema))
+            table = pyarrow.Table.from_batches(batches)
+            self.assertListEqual(table.column('d').to_pylist(), ['aa', None])
+            self.assertListEqual(table.column('e').to_pylist(), [date(2015, 10, 21), None])
+            self.assertEqual(cur.rowcount, 2)
+
+
+exec(ColumnarFetchTestCase.createPrepStmtClass())
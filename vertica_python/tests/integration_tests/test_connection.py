@@ -36,8 +36,10 @@
 from __future__ import print_function, division, absolute_import
 
 import getpass
+import threading
 import uuid
 from .base import VerticaPythonIntegrationTestCase
+from ... import errors
 
 
 class ConnectionTestCase(VerticaPythonIntegrationTestCase):
@@ -87,5 +89,22 @@ class ConnectionTestCase(VerticaPythonIntegrationTestCase):
         res = self._query_and_fetchone(query)
         self.assertEqual(res[0], label)
 
+    def test_cancel(self):
+        with self._connect() as conn:
+            cur = conn.cursor()
+            timer = threading.Timer(1.0, conn.cancel)
+            timer.start()
+            try:
+                with self.assertRaises(errors.QueryError):
+                    cur.execute("SELECT SLEEP(60)")
+                    cur.fetchall()
+            finally:
+                timer.join()
+
+            # the session survives the cancellation
+            self.assertFalse(conn.closed())
+            cur.execute("SELECT 1")
+            self.assertListEqual(cur.fetchall(), [[1]])
+
 
 exec(ConnectionTestCase.createPrepStmtClass())
\ No newline at end of file
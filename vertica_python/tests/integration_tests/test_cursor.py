@@ -43,8 +43,10 @@ import os as _os
 import re
 import tempfile
 
+import pytz
+
 from .base import VerticaPythonIntegrationTestCase
-from ... import errors
+from ... import errors, connect
 
 
 class CursorTestCase(VerticaPythonIntegrationTestCase):
@@ -172,6 +174,63 @@ class CursorTestCase(VerticaPythonIntegrationTestCase):
             res = cur.fetchall()
             self.assertListOfListsEqual(res, [[None, 'foo'], [1, None]])
 
+    def test_copy_rows(self):
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.copy_rows(self._table, ['a', 'b'],
+                          ((i, None if i == 2 else u'x"\\,{}'.format(i)) for i in range(1, 4)))
+            cur.execute("SELECT a, b FROM {0} ORDER BY a ASC".format(self._table))
+            res = cur.fetchall()
+            self.assertListOfListsEqual(res, [[1, 'x"\\,1'], [2, None], [3, 'x"\\,3']])
+
+    def test_copy_rows_multiline(self):
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.copy_rows(self._table, ['a', 'b'], [(1, u'a\nb'), (2, u'c\r\nd')])
+            cur.execute("SELECT a, b FROM {0} ORDER BY a ASC".format(self._table))
+            self.assertListOfListsEqual(cur.fetchall(), [[1, u'a\nb'], [2, u'c\r\nd']])
+
+    def test_copy_rows_types(self):
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("DROP TABLE IF EXISTS copy_rows_test")
+            cur.execute("CREATE TABLE copy_rows_test (a BOOLEAN, b FLOAT, c NUMERIC(10, 2), "
+                        "d TIMESTAMP, e DATE, f VARBINARY(8))")
+            row = [True, 1.5, Decimal('12.34'), datetime(2020, 1, 2, 3, 4, 5),
+                   date(2020, 1, 2), b'\x00\xff']
+            cur.copy_rows('copy_rows_test', ['a', 'b', 'c', 'd', 'e', 'f'],
+                          [row, [None] * 6])
+            cur.execute("SELECT * FROM copy_rows_test ORDER BY a NULLS LAST")
+            self.assertListOfListsEqual(cur.fetchall(), [row, [None] * 6])
+            cur.execute("DROP TABLE IF EXISTS copy_rows_test")
+
+    def test_copy_rows_native(self):
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("DROP TABLE IF EXISTS copy_rows_test")
+            cur.execute("CREATE TABLE copy_rows_test (a INT, b FLOAT, c NUMERIC(38, 2), "
+                        "d TIMESTAMP, e DATE, f VARCHAR(16), g CHAR(4), h BOOLEAN)")
+            rows = [[1, 1.5, Decimal('-12345678901234567890.25'), datetime(2020, 1, 2, 3, 4, 5, 6),
+                     date(1999, 12, 31), u'a\xfc', u'ab  ', True],
+                    [2] + [None] * 7]
+            cur.copy_rows('copy_rows_test', ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h'],
+                          iter(rows), native=True)
+            cur.execute("SELECT * FROM copy_rows_test ORDER BY a")
+            self.assertListOfListsEqual(cur.fetchall(), rows)
+            cur.execute("DROP TABLE IF EXISTS copy_rows_test")
+
+    def test_copy_compressed(self):
+        with self._connect() as conn:
+            cur = conn.cursor()
+            for compression in ('gzip', 'bzip2'):
+                cur.copy("COPY {0} (a, b) FROM STDIN DELIMITER ','".format(self._table),
+                         "1,foo\n2,bar", compression=compression)
+            cur.copy_rows(self._table, ['a', 'b'], [(3, 'baz')], compression='gzip')
+            cur.execute("SELECT a, b FROM {0} ORDER BY a ASC, b ASC".format(self._table))
+            res = cur.fetchall()
+            self.assertListOfListsEqual(res, [[1, 'foo'], [1, 'foo'], [2, 'bar'], [2, 'bar'],
+                                              [3, 'baz']])
+
     def test_copy_with_string(self):
         with self._connect() as conn1, self._connect() as conn2:
             cur1 = conn1.cursor()
@@ -625,6 +684,23 @@ class SimpleQueryTestCase(VerticaPythonIntegrationTestCase):
             cur.execute("SELECT :a, :b", parameters={"a": all_chars, "b": backslash_data})
             self.assertEqual([all_chars, backslash_data], cur.fetchone())
 
+    def test_prepare_threshold(self):
+        with connect(prepare_threshold=2, **self._conn_info) as conn:
+            cur = conn.cursor()
+            cur.execute("CREATE TABLE {0} (a INT, b VARCHAR)".format(self._table))
+            for i in range(3):
+                cur.execute("INSERT INTO {0} VALUES (:a, :b)".format(self._table),
+                            {'a': i, 'b': "it's %s" % i})
+            conn.commit()
+            self.assertIn("INSERT INTO {0} VALUES (?, ?)".format(self._table),
+                          conn._statement_cache)
+
+            for i in range(3):
+                cur.execute("SELECT b FROM {0} WHERE a = %s AND b LIKE 'it''s%%'"
+                            .format(self._table), [i])
+                self.assertListOfListsEqual(cur.fetchall(), [["it's %s" % i]])
+            self.assertEqual(len(conn._statement_cache), 2)
+
 
 class SimpleQueryExecutemanyTestCase(VerticaPythonIntegrationTestCase):
     def setUp(self):
@@ -677,6 +753,22 @@ class SimpleQueryExecutemanyTestCase(VerticaPythonIntegrationTestCase):
     def test_executemany_utf8(self):
         self._test_executemany(self._table, [(1, u'a\xfc'), (2, u'bb')])
 
+    def test_executemany_escaped(self):
+        self._test_executemany(self._table, [(1, u'a"b'), (2, u'c\\d'), (3, u'e,f')])
+
+    def test_executemany_multiline(self):
+        self._test_executemany(self._table, [(1, u'a\nb'), (2, u'c\r\nd')])
+
+    def test_executemany_generator(self):
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.executemany("INSERT INTO {0} (a, b) VALUES (%s, %s)".format(self._table),
+                            ((i, str(i)) for i in range(100)))
+            conn.commit()
+
+            cur.execute("SELECT count(*), sum(a) FROM {0}".format(self._table))
+            self.assertListEqual(cur.fetchone(), [100, 4950])
+
     # test for #292
     def test_executemany_autocommit(self):
         with self._connect() as conn:
@@ -824,36 +916,67 @@ class PreparedStatementTestCase(VerticaPythonIntegrationTestCase):
             cur.execute("CREATE TABLE {} (a int, b varchar)".format(self._table))
             cur.executemany("INSERT INTO {} VALUES (?, ?)".format(self._table), values)
 
-            self.assertListOfListsEqual(cur.fetchall(), [[1]])
+            # the affected row counts are collected
+            self.assertListEqual(cur.batch_rowcounts, [1, 1, 1, 1])
+            self.assertEqual(cur.rowcount, 4)
             self.assertIsNone(cur.fetchone())
-            self.assertTrue(cur.nextset())
+            self.assertFalse(cur.nextset())
 
-            self.assertListOfListsEqual(cur.fetchall(), [[1]])
+            cur.executemany("SELECT * FROM {} WHERE a=? ORDER BY b"
+                            .format(self._table), [[1],[2],[3]])
+            self.assertListOfListsEqual(cur.fetchall(), [[1, 'aa']])
             self.assertIsNone(cur.fetchone())
             self.assertTrue(cur.nextset())
 
-            self.assertListOfListsEqual(cur.fetchall(), [[1]])
+            self.assertListOfListsEqual(cur.fetchall(), [[2, u'a\xfc'], [2, None]])
             self.assertIsNone(cur.fetchone())
             self.assertTrue(cur.nextset())
 
-            self.assertListOfListsEqual(cur.fetchall(), [[1]])
+            self.assertListOfListsEqual(cur.fetchall(), [])
             self.assertIsNone(cur.fetchone())
             self.assertFalse(cur.nextset())
 
-            cur.executemany("SELECT * FROM {} WHERE a=? ORDER BY b"
-                            .format(self._table), [[1],[2],[3]])
-            self.assertListOfListsEqual(cur.fetchall(), [[1, 'aa']])
+    def test_executemany_results(self):
+        # statements other than DML keep a result set per parameter set
+        values = ((None, 'foo'), [1, 'aa'], (2, None), [2, u'a\xfc'])
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("CREATE TABLE {} (a int, b varchar)".format(self._table))
+            cur.executemany("INSERT INTO {} VALUES (?, ?)".format(self._table), values)
+            cur.executemany("SELECT COUNT(*) FROM {} WHERE b <=> ?".format(self._table),
+                            [[value[1]] for value in values])
+
+            self.assertListOfListsEqual(cur.fetchall(), [[1]])
             self.assertIsNone(cur.fetchone())
             self.assertTrue(cur.nextset())
 
-            self.assertListOfListsEqual(cur.fetchall(), [[2, u'a\xfc'], [2, None]])
+            self.assertListOfListsEqual(cur.fetchall(), [[1]])
             self.assertIsNone(cur.fetchone())
             self.assertTrue(cur.nextset())
 
-            self.assertListOfListsEqual(cur.fetchall(), [])
+            self.assertListOfListsEqual(cur.fetchall(), [[1]])
+            self.assertIsNone(cur.fetchone())
+            self.assertTrue(cur.nextset())
+
+            self.assertListOfListsEqual(cur.fetchall(), [[1]])
             self.assertIsNone(cur.fetchone())
             self.assertFalse(cur.nextset())
 
+    def test_executemany_error(self):
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("CREATE TABLE {} (a INT NOT NULL)".format(self._table))
+            conn.commit()
+            with self.assertRaises(errors.QueryError) as context:
+                cur.executemany("INSERT INTO {} VALUES (?)".format(self._table),
+                                [[1], [2], [None], [4]])
+            self.assertEqual(context.exception.batch_index, 2)
+            conn.rollback()
+
+            # the connection can be used again
+            cur.execute("SELECT COUNT(*) FROM {}".format(self._table))
+            self.assertListEqual(cur.fetchone(), [0])
+
     def test_bind_boolean(self):
         values = (True, 't', 'true', '1', 1, 'Yes', 'y', None,
                   False, 'f', 'false', '0', 0, 'No', 'n')
@@ -999,3 +1122,116 @@ class PreparedStatementTestCase(VerticaPythonIntegrationTestCase):
 
             self.assertEqual(cur.description[0].display_size, 10000)
             self.assertEqual(cur.description[1].display_size, 1000)
+
+    def test_binary_transfer(self):
+        values = [True, -123456789012, 1.5, date(2015, 10, 21), time(11, 12, 3, 2343),
+                  datetime(2015, 10, 21, 11, 12, 3, 2343), Decimal('1.25'), 'text']
+        with connect(binary_transfer=True, **self._conn_info) as conn:
+            cur = conn.cursor()
+            cur.execute("""CREATE TABLE {} (c1 BOOL, c2 INT, c3 FLOAT, c4 DATE, c5 TIME,
+                           c6 TIMESTAMP, c7 NUMERIC(10,2), c8 VARCHAR)""".format(self._table))
+            cur.execute("INSERT INTO {} VALUES (?,?,?,?,?,?,?,?)".format(self._table), values)
+            cur.execute("INSERT INTO {} VALUES (?,?,?,?,?,?,?,?)".format(self._table),
+                        [None] * 8)
+            conn.commit()
+
+            cur.execute("SELECT * FROM {} WHERE c1".format(self._table))
+            self.assertListOfListsEqual(cur.fetchall(), [values])
+            cur.execute("SELECT * FROM {} WHERE c1 IS NULL".format(self._table))
+            self.assertListOfListsEqual(cur.fetchall(), [[None] * 8])
+            self.assertListEqual([col.format_code for col in cur.description],
+                                 [1, 1, 1, 1, 1, 1, 0, 0])
+
+            cur.execute("SELECT TIMESTAMPTZ '2015-10-21 11:12:03.002343+00' AS c")
+            self.assertEqual(cur.fetchone()[0],
+                             datetime(2015, 10, 21, 11, 12, 3, 2343, tzinfo=pytz.utc))
+
+    def test_server_side_cursor(self):
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("CREATE TABLE {} (a INT)".format(self._table))
+            cur.executemany("INSERT INTO {} VALUES (?)".format(self._table),
+                            [[i] for i in range(10)])
+            conn.commit()
+
+            cur = conn.cursor(server_side=True)
+            cur.arraysize = 3
+            cur.execute("SELECT a FROM {} WHERE a >= ? ORDER BY a".format(self._table), [2])
+            self.assertListOfListsEqual(cur.fetchmany(), [[2], [3], [4]])
+            self.assertListOfListsEqual(cur.fetchall(), [[i] for i in range(5, 10)])
+            self.assertEqual(cur.rowcount, 8)
+
+            # discard the rows that have not been fetched
+            cur.execute("SELECT a FROM {} ORDER BY a".format(self._table))
+            self.assertListEqual(cur.fetchone(), [0])
+            cur.execute("SELECT COUNT(*) FROM {}".format(self._table))
+            self.assertListEqual(cur.fetchone(), [10])
+
+    def test_prepare_and_execute(self):
+        with connect(binary_transfer=True, **self._conn_info) as conn:
+            cur = conn.cursor()
+            cur.execute("CREATE TABLE {} (a INT, b VARCHAR)".format(self._table))
+            cur.execute("INSERT INTO {} VALUES (?, ?)".format(self._table), [1, 'aa'])
+            conn.commit()
+
+            # results of the first execution are in text format
+            sql = "SELECT a, b FROM {} WHERE a = ? AND b = ?".format(self._table)
+            for format_codes in ([0, 0], [1, 0]):
+                cur.execute(sql, [1, 'aa'])
+                self.assertListOfListsEqual(cur.fetchall(), [[1, 'aa']])
+                self.assertListEqual([col.format_code for col in cur.description], format_codes)
+
+            with self.assertRaises(errors.QueryError):
+                cur.execute("SELECT a FROM {} WHERE no_such_column = ?".format(self._table), [1])
+            with self.assertRaises(errors.QueryError):
+                cur.execute("SELECT 1 / ?", [0])
+            cur.execute("SELECT ?", [2])
+            self.assertListEqual(cur.fetchone(), [2])
+
+    def test_statement_cache(self):
+        with connect(prepared_statement_cache_size=2, **self._conn_info) as conn:
+            cur = conn.cursor()
+            cur.execute("CREATE TABLE {} (a INT, b VARCHAR)".format(self._table))
+            cur.executemany("INSERT INTO {} VALUES (?, ?)".format(self._table),
+                            [[1, 'aa'], [2, 'bb']])
+            conn.commit()
+
+            statements = ["SELECT a FROM {} WHERE b = ?".format(self._table),
+                          "SELECT b FROM {} WHERE a = ?".format(self._table)]
+            for _ in range(3):
+                cur.execute(statements[0], ['aa'])
+                self.assertListOfListsEqual(cur.fetchall(), [[1]])
+                cur.execute(statements[1], [2])
+                self.assertListOfListsEqual(cur.fetchall(), [['bb']])
+            self.assertListEqual(sorted(conn._statement_cache._statements), sorted(statements))
+
+            # evict a statement, then prepare it again
+            cur.execute("SELECT COUNT(*) FROM {}".format(self._table))
+            self.assertListEqual(cur.fetchone(), [2])
+            self.assertNotIn(statements[0], conn._statement_cache)
+            cur.execute(statements[0], ['bb'])
+            self.assertListOfListsEqual(cur.fetchall(), [[2]])
+
+    def test_multiple_cursors(self):
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("CREATE TABLE {} (a INT)".format(self._table))
+            cur.executemany("INSERT INTO {} VALUES (?)".format(self._table),
+                            [[i] for i in range(10)])
+            conn.commit()
+
+            cur1 = conn.cursor()
+            cur2 = conn.cursor()
+            cur1.execute("SELECT a FROM {} ORDER BY a".format(self._table))
+            self.assertListEqual(cur1.fetchone(), [0])
+            cur2.execute("SELECT COUNT(*) FROM {}".format(self._table))
+            self.assertListEqual(cur2.fetchone(), [10])
+            self.assertListOfListsEqual(cur1.fetchall(), [[i] for i in range(1, 10)])
+
+            streaming = conn.cursor(server_side=True)
+            streaming.arraysize = 3
+            streaming.execute("SELECT a FROM {} ORDER BY a".format(self._table))
+            for row in streaming.iterate():
+                cur1.execute("SELECT a * 2 FROM {} WHERE a = ?".format(self._table), row)
+                self.assertListEqual(cur1.fetchone(), [row[0] * 2])
+            self.assertEqual(streaming.rowcount, 10)
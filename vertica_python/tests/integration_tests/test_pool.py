@@ -0,0 +1,84 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+from __future__ import print_function, division, absolute_import
+
+from .base import VerticaPythonIntegrationTestCase
+from ...pool import ConnectionPool
+
+
+class ConnectionPoolTestCase(VerticaPythonIntegrationTestCase):
+    def setUp(self):
+        super(ConnectionPoolTestCase, self).setUp()
+        self._table = 'pool_test'
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("DROP TABLE IF EXISTS {0}".format(self._table))
+            cur.execute("CREATE TABLE {0} (a INT)".format(self._table))
+
+    def tearDown(self):
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.execute("DROP TABLE IF EXISTS {0}".format(self._table))
+        super(ConnectionPoolTestCase, self).tearDown()
+
+    def test_reuse_and_reset(self):
+        with ConnectionPool(self._conn_info, min_size=1, max_size=2) as pool:
+            with pool.connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT current_session()")
+                session = cur.fetchone()[0]
+                # not committed, rolled back when the connection is returned
+                cur.execute("INSERT INTO {0} VALUES (1)".format(self._table))
+                cur.execute("SELECT 1")
+
+            with pool.connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT current_session()")
+                self.assertEqual(cur.fetchone()[0], session)
+                cur.execute("SELECT COUNT(*) FROM {0}".format(self._table))
+                self.assertEqual(cur.fetchone()[0], 0)
+            self.assertEqual(pool.size, 1)
+
+    def test_broken_connection(self):
+        with ConnectionPool(self._conn_info, max_size=1, check_interval=0) as pool:
+            with pool.connection() as conn:
+                conn.close_socket()
+            with pool.connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT 1")
+                self.assertListEqual(cur.fetchall(), [[1]])
+
+
+exec(ConnectionPoolTestCase.createPrepStmtClass())
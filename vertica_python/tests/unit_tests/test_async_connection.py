@@ -0,0 +1,263 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+from __future__ import print_function, division, absolute_import
+
+from struct import pack, unpack
+
+from .base import VerticaPythonUnitTestCase
+
+try:
+    import asyncio
+    from ...vertica import async_cursor
+    from ...vertica.async_connection import async_connect
+except (ImportError, SyntaxError):
+    # Python 2 or Python < 3.5
+    asyncio = None
+
+
+def _message(message_id, payload=b''):
+    return message_id + pack('!I', len(payload) + 4) + payload
+
+
+def _row_description(names):
+    payload = pack('!HI', len(names), 0)
+    for name in names:
+        # VARCHAR columns
+        payload += name + b'\x00' + pack('!QHBIHHHiH', 0, 0, 0, 9, 65535, 1, 0, -1, 0)
+    return _message(b'T', payload)
+
+
+def _data_row(values):
+    return _message(b'D', pack('!H', len(values)) + b''.join(
+        pack('!I', len(value)) + value for value in values))
+
+
+READY_FOR_QUERY = _message(b'Z', b'I')
+
+
+class FakeServerProtocol(asyncio.Protocol if asyncio else object):
+    """
+    Answers startup with a successful authentication, SELECT queries with the
+    rows of the server and COPY queries by collecting the copied data. In the
+    extended query protocol, parameters are INTEGER and each execution of an
+    INSERT inserts a row.
+    """
+    def __init__(self, server):
+        self.server = server
+        self.buffer = b''
+        self.started = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.buffer += data
+        while True:
+            if not self.started:
+                if len(self.buffer) < 4:
+                    return
+                size = unpack('!I', self.buffer[:4])[0]
+                if len(self.buffer) < size:
+                    return
+                self.buffer = self.buffer[size:]
+                self.started = True
+                self.transport.write(_message(b'R', pack('!I', 0)) +
+                                     _message(b'S', b'server_version\x00v10\x00') +
+                                     _message(b'K', pack('!2I', 42, 4242)) + READY_FOR_QUERY)
+                continue
+            if len(self.buffer) < 5:
+                return
+            size = unpack('!I', self.buffer[1:5])[0]
+            if len(self.buffer) < size + 1:
+                return
+            message_id, payload = self.buffer[:1], self.buffer[5:size + 1]
+            self.buffer = self.buffer[size + 1:]
+            self.handle(message_id, payload)
+
+    def handle(self, message_id, payload):
+        if message_id == b'Q':
+            query = payload.rstrip(b'\x00')
+            self.server.queries.append(query)
+            if query.startswith(b'COPY'):
+                self.transport.write(_message(b'G', pack('!BH', 0, 0)))
+            else:
+                self.transport.write(_row_description([b'a', b'b']) +
+                                     b''.join(_data_row(row) for row in self.server.rows) +
+                                     _message(b'C', b'SELECT\x00') + READY_FOR_QUERY)
+        elif message_id == b'P':
+            name, query = payload.split(b'\x00')[:2]
+            self.server.statements[name] = query
+            self.server.parsed.append(query)
+            self.transport.write(_message(b'1'))
+        elif message_id == b'D':
+            query = self.server.statements[payload[1:].rstrip(b'\x00')]
+            count = query.count(b'?')
+            parameters = pack('!H', count)
+            if count:
+                parameters += pack('!I', 0) + pack('!BIiH', 0, 6, -1, 0) * count
+            tag = query.split()[0]
+            self.transport.write(
+                _message(b't', parameters) +
+                (_row_description([b'a', b'b']) if tag == b'SELECT' else _message(b'n')) +
+                _message(b'm', tag + b'\x00' + pack('!H', 0) + b'\x00'))
+        elif message_id == b'B':
+            self.bound = self.server.statements[payload.split(b'\x00')[1]]
+            self.transport.write(_message(b'2'))
+        elif message_id == b'E':
+            if self.bound.startswith(b'SELECT'):
+                self.transport.write(b''.join(_data_row(row) for row in self.server.rows) +
+                                     _message(b'C', b'SELECT\x00'))
+            else:
+                self.transport.write(_message(b'C', b'INSERT 0 1\x00'))
+        elif message_id == b'S':
+            self.transport.write(READY_FOR_QUERY)
+        elif message_id == b'C':
+            self.transport.write(_message(b'3'))
+        elif message_id == b'd':
+            self.server.copied += payload
+        elif message_id == b'c':
+            self.transport.write(_message(b'C', b'COPY\x00') + READY_FOR_QUERY)
+        elif message_id == b'X':
+            self.transport.close()
+
+
+class AsyncConnectionTestCase(VerticaPythonUnitTestCase):
+    def setUp(self):
+        super(AsyncConnectionTestCase, self).setUp()
+        if asyncio is None:
+            self.skipTest('asyncio connections require Python 3.5 or later')
+        self.loop = asyncio.new_event_loop()
+        self.queries = []
+        self.copied = b''
+        self.statements = {}
+        self.parsed = []
+        self.rows = [[b'1', b'x'], [b'2', b'y'], [b'3', b'z']]
+        self.server = self._run(self.loop.create_server(
+            lambda: FakeServerProtocol(self), '127.0.0.1', 0))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.conn = self._run(async_connect(host='127.0.0.1', port=self.port,
+                                           user='dbadmin', password=''))
+
+    def tearDown(self):
+        if asyncio is not None:
+            self._run(self.conn.close())
+            self.server.close()
+            self._run(self.server.wait_closed())
+            self.loop.close()
+        super(AsyncConnectionTestCase, self).tearDown()
+
+    def _run(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_startup(self):
+        self.assertFalse(self.conn.closed())
+        self.assertEqual(self.conn.backend_pid, 42)
+        self.assertEqual(self.conn.parameters['server_version'], 'v10')
+
+    def test_execute_and_fetch(self):
+        cur = self.conn.cursor()
+        self._run(cur.execute("SELECT a, b FROM t WHERE b = :b", {'b': "it's"}))
+        self.assertListEqual(self.queries, [b"SELECT a, b FROM t WHERE b = 'it''s'"])
+        self.assertListEqual([col.name for col in cur.description], ['a', 'b'])
+        self.assertListEqual(self._run(cur.fetchmany(2)), [['1', 'x'], ['2', 'y']])
+        self.assertListEqual(self._run(cur.fetchall()), [['3', 'z']])
+        self.assertEqual(cur.rowcount, 3)
+
+    def test_async_iteration(self):
+        cur = self.conn.cursor('dict')
+        self._run(cur.execute("SELECT a, b FROM t"))
+        iterator = cur.__aiter__()
+        self.assertEqual(self._run(iterator.__anext__()), {'a': '1', 'b': 'x'})
+        self.assertListEqual(self._run(cur.fetchall()), [{'a': '2', 'b': 'y'}, {'a': '3', 'b': 'z'}])
+        self.assertRaises(StopAsyncIteration, self._run, iterator.__anext__())
+
+    def test_copy(self):
+        cur = self.conn.cursor()
+        self._run(cur.copy("COPY t FROM STDIN", u"1,x\n2,y\n"))
+        self.assertEqual(self.copied, b"1,x\n2,y\n")
+
+        def parameter_sets():
+            yield (1, 2)
+            raise RuntimeError('bad parameter set')
+        with self.assertRaises(RuntimeError):
+            self._run(cur.executemany("INSERT INTO t (a, b) VALUES (?, ?)", parameter_sets(),
+                                      use_prepared_statements=True))
+        # the session is ready for the next query
+        self._run(cur.execute("SELECT a, b FROM t"))
+        self.assertEqual(len(self._run(cur.fetchall())), 3)
+
+    def test_multiple_cursors(self):
+        cur1 = self.conn.cursor()
+        cur2 = self.conn.cursor()
+        self._run(cur1.execute("SELECT a, b FROM t"))
+        self.assertListEqual(self._run(cur1.fetchmany(1)), [['1', 'x']])
+        self._run(cur2.execute("SELECT a, b FROM t"))
+        # the rest of the results of cur1 have been buffered
+        self.assertListEqual(self._run(cur1.fetchall()), [['2', 'y'], ['3', 'z']])
+        self.assertEqual(len(self._run(cur2.fetchall())), 3)
+
+    def test_statement_cache(self):
+        cur1 = self.conn.cursor()
+        cur2 = self.conn.cursor()
+        for cur in (cur1, cur2, cur1):
+            self._run(cur.execute("SELECT a, b FROM t WHERE a = ?", [1],
+                                  use_prepared_statements=True))
+            self.assertListEqual(self._run(cur.fetchall()), [['1', 'x'], ['2', 'y'], ['3', 'z']])
+        self.assertListEqual(self.parsed, [b'SELECT a, b FROM t WHERE a = ?'])
+
+    def test_executemany_prepared(self):
+        window = async_cursor.DEFAULT_EXECUTEMANY_WINDOW
+        async_cursor.DEFAULT_EXECUTEMANY_WINDOW = 2
+        try:
+            cur = self.conn.cursor()
+            self._run(cur.executemany("INSERT INTO t (a, b) VALUES (?, ?)",
+                                      ((i, i) for i in range(5)), use_prepared_statements=True))
+        finally:
+            async_cursor.DEFAULT_EXECUTEMANY_WINDOW = window
+        self.assertListEqual(cur.batch_rowcounts, [1] * 5)
+        self.assertEqual(cur.rowcount, 5)
+        with self.assertRaises(ValueError):
+            self._run(cur.executemany("INSERT INTO t (a, b) VALUES (?, ?)", [(1, 2), (3,)],
+                                      use_prepared_statements=True))
+        # the session is ready for the next query
+        self._run(cur.execute("SELECT a, b FROM t"))
+        self.assertEqual(len(self._run(cur.fetchall())), 3)
+
+    def test_executemany_copy(self):
+        cur = self.conn.cursor()
+        self._run(cur.executemany("INSERT INTO t (a, b) VALUES (%s, %s)",
+                                  ((i, u'"{}"'.format(i)) for i in range(2))))
+        self.assertTrue(self.queries[0].startswith(b"COPY t (a,b) FROM STDIN"))
+        self.assertEqual(self.copied, b'0,"\\"0\\""\n1,"\\"1\\""\n')
@@ -0,0 +1,84 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import print_function, division, absolute_import
+
+from datetime import date, datetime
+from struct import pack
+
+from .base import VerticaPythonUnitTestCase
+from ...datatypes import VerticaType
+from ...vertica.messages import Bind
+
+
+def _bind_message(parameter_formats, type_oids, values, result_formats=b'\x00\x00'):
+    body = b'\x00s0\x00' + parameter_formats + pack('!H', len(type_oids))
+    body += pack('!{0}I'.format(len(type_oids)), *type_oids)
+    for value in values:
+        body += pack('!i', -1) if value is None else pack('!I', len(value)) + value
+    body += result_formats
+    return b'B' + pack('!I', len(body) + 4) + body
+
+
+class BindTestCase(VerticaPythonUnitTestCase):
+    def test_text_parameters(self):
+        oids = [VerticaType.INT8, VerticaType.VARCHAR, VerticaType.BOOL]
+        message = Bind('', 's0', [1, u'a\xfc', None], oids).get_message()
+        self.assertEqual(message, _bind_message(b'\x00\x00', oids, [b'1', b'a\xc3\xbc', None]))
+
+    def test_binary_parameters(self):
+        oids = [VerticaType.INT8, VerticaType.FLOAT8, VerticaType.BOOL, VerticaType.DATE,
+                VerticaType.TIMESTAMP, VerticaType.VARCHAR, VerticaType.INT8]
+        values = [-2, 1.5, 'yes', date(1999, 12, 31), datetime(2000, 1, 1, 0, 0, 1, 5),
+                  'text', None]
+        message = Bind('', 's0', values, oids, binary_parameters=True).get_message()
+        expected = _bind_message(
+            pack('!8H', 7, 1, 1, 1, 1, 1, 0, 0), oids,
+            [pack('!q', -2), pack('!d', 1.5), b'\x01', pack('!q', -1), pack('!q', 1000005),
+             b'text', None])
+        self.assertEqual(message, expected)
+
+    def test_binary_parameters_fallback_to_text(self):
+        # values that are not of a matching Python type are sent as text
+        oids = [VerticaType.INT8, VerticaType.INT8, VerticaType.DATE, VerticaType.TIMESTAMP]
+        values = ['12', 2 ** 63, '2000-01-01', date(2000, 1, 1)]
+        message = Bind('', 's0', values, oids, binary_parameters=True).get_message()
+        expected = _bind_message(b'\x00\x00', oids,
+                                 [b'12', b'9223372036854775808', b'2000-01-01', b'2000-01-01'])
+        self.assertEqual(message, expected)
+
+    def test_result_format_codes(self):
+        message = Bind('', 's0', [], [], result_format_codes=[1, 0]).get_message()
+        self.assertEqual(message, _bind_message(b'\x00\x00', [], [], pack('!3H', 2, 1, 0)))
@@ -0,0 +1,99 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import print_function, division, absolute_import
+
+from datetime import date, datetime, time
+from struct import pack
+
+import pytz
+
+from .base import VerticaPythonUnitTestCase
+from ... import errors
+from ...vertica.column import Column
+
+USECS_PER_DAY = 86400000000
+
+
+def _column(data_type_oid, format_code=0, binary_transfer=False):
+    return Column({'name': 'col', 'data_type_oid': data_type_oid, 'data_type_name': 'type',
+                   'type_modifier': -1, 'data_type_size': 8, 'null_ok': True,
+                   'is_identity': False, 'format_code': format_code},
+                  binary_transfer=binary_transfer)
+
+
+class BinaryFormatTestCase(VerticaPythonUnitTestCase):
+    def test_format_code(self):
+        self.assertEqual(_column(6).format_code, 0)
+        self.assertEqual(_column(6, binary_transfer=True).format_code, 1)
+        self.assertEqual(_column(9, binary_transfer=True).format_code, 0)
+        self.assertEqual(_column(16, binary_transfer=True).format_code, 0)
+
+    def test_numbers(self):
+        self.assertEqual(_column(5, 1).convert(b'\x01'), True)
+        self.assertEqual(_column(5, 1).convert(b'\x00'), False)
+        self.assertEqual(_column(6, 1).convert(pack('!q', -9223372036854775807)),
+                         -9223372036854775807)
+        self.assertEqual(_column(7, 1).convert(pack('!d', 1.5e-300)), 1.5e-300)
+        self.assertIsNone(_column(6, 1).convert(None))
+
+    def test_date(self):
+        column = _column(10, 1)
+        self.assertEqual(column.convert(pack('!q', 0)), date(2000, 1, 1))
+        self.assertEqual(column.convert(pack('!q', -730119)), date(1, 1, 1))
+        self.assertEqual(column.convert(pack('!q', 5772)), date(2015, 10, 21))
+
+    def test_date_year_over_9999(self):
+        column = _column(10, 1)
+        days = date(9999, 12, 31).toordinal() - date(2000, 1, 1).toordinal()
+        self.assertEqual(column.convert(pack('!q', days + 1)), date(9999, 1, 1))
+        self.assertEqual(column.convert(pack('!q', days + 146097 * 5 + 61)), date(9999, 3, 1))
+
+    def test_date_bc(self):
+        with self.assertRaises(errors.NotSupportedError):
+            _column(10, 1).convert(pack('!q', -730120))
+
+    def test_time(self):
+        usecs = ((11 * 60 + 12) * 60 + 3) * 1000000 + 2343
+        self.assertEqual(_column(11, 1).convert(pack('!q', usecs)), time(11, 12, 3, 2343))
+
+    def test_timestamp(self):
+        usecs = 5772 * USECS_PER_DAY + ((11 * 60 + 12) * 60 + 3) * 1000000 + 2343
+        self.assertEqual(_column(12, 1).convert(pack('!q', usecs)),
+                         datetime(2015, 10, 21, 11, 12, 3, 2343))
+        self.assertEqual(_column(12, 1).convert(pack('!q', -1)),
+                         datetime(1999, 12, 31, 23, 59, 59, 999999))
+        self.assertEqual(_column(13, 1).convert(pack('!q', usecs)),
+                         datetime(2015, 10, 21, 11, 12, 3, 2343, tzinfo=pytz.utc))
@@ -0,0 +1,215 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import print_function, division, absolute_import
+
+from datetime import date, datetime
+from struct import pack
+
+from .base import VerticaPythonUnitTestCase
+from ...vertica.column import Column
+from ...vertica.columnar import ColumnBuffer, arrow_schema
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def _column(data_type_oid, format_code=0, type_modifier=-1, null_ok=True):
+    return Column({'name': 'col', 'data_type_oid': data_type_oid, 'data_type_name': 'type',
+                   'type_modifier': type_modifier, 'data_type_size': 8, 'null_ok': null_ok,
+                   'is_identity': False, 'format_code': format_code})
+
+
+def _buffer(column, values):
+    buf = ColumnBuffer(column)
+    for value in values:
+        buf.append(value)
+    return buf
+
+
+class ColumnBufferTestCase(VerticaPythonUnitTestCase):
+    def setUp(self):
+        super(ColumnBufferTestCase, self).setUp()
+        if numpy is None:
+            self.skipTest('numpy is not installed')
+
+    def test_int(self):
+        data = _buffer(_column(6), [b'1', b'-9223372036854775807', b'3']).to_numpy(numpy)
+        self.assertEqual(data.dtype, numpy.int64)
+        self.assertListEqual(data.tolist(), [1, -9223372036854775807, 3])
+        self.assertNotIsInstance(data, numpy.ma.MaskedArray)
+
+    def test_float_with_nulls(self):
+        data = _buffer(_column(7), [b'1.5', None, b'-2']).to_numpy(numpy)
+        self.assertIsInstance(data, numpy.ma.MaskedArray)
+        self.assertEqual(data.dtype, numpy.float64)
+        self.assertListEqual(data.tolist(), [1.5, None, -2.0])
+
+    def test_bool(self):
+        data = _buffer(_column(5), [b't', b'f', None]).to_numpy(numpy)
+        self.assertEqual(data.dtype, numpy.bool_)
+        self.assertListEqual(data.tolist(), [True, False, None])
+
+    def test_binary_format(self):
+        data = _buffer(_column(6, 1), [pack('!q', -5), None, pack('!q', 2 ** 40)]).to_numpy(numpy)
+        self.assertEqual(data.dtype, numpy.int64)
+        self.assertListEqual(data.tolist(), [-5, None, 2 ** 40])
+        data = _buffer(_column(7, 1), [pack('!d', 0.25)]).to_numpy(numpy)
+        self.assertListEqual(data.tolist(), [0.25])
+
+    def test_numeric(self):
+        # NUMERIC(18, 0) fits in an int64, NUMERIC(10, 2) and NUMERIC(19, 0) do not
+        data = _buffer(_column(16, type_modifier=(18 << 16) + 4), [b'-123']).to_numpy(numpy)
+        self.assertEqual(data.dtype, numpy.int64)
+        self.assertListEqual(data.tolist(), [-123])
+        for type_modifier in ((10 << 16) + 2 + 4, (19 << 16) + 4):
+            data = _buffer(_column(16, type_modifier=type_modifier), [b'1']).to_numpy(numpy)
+            self.assertEqual(data.dtype, object)
+
+    def test_object(self):
+        data = _buffer(_column(10), [b'2015-10-21', None]).to_numpy(numpy)
+        self.assertEqual(data.dtype, object)
+        self.assertListEqual(data.tolist(), [date(2015, 10, 21), None])
+
+    def test_no_converter(self):
+        # VARBINARY and INTERVAL values are kept as received
+        data = _buffer(_column(17), [b'\x00\xff', None]).to_numpy(numpy)
+        self.assertEqual(data.dtype, object)
+        self.assertListEqual(data.tolist(), [b'\x00\xff', None])
+        data = _buffer(_column(14), [b'1 02:00']).to_numpy(numpy)
+        self.assertListEqual(data.tolist(), [b'1 02:00'])
+
+    def test_empty(self):
+        self.assertEqual(len(_buffer(_column(6), []).to_numpy(numpy)), 0)
+        self.assertEqual(len(_buffer(_column(9), []).to_numpy(numpy)), 0)
+
+
+class ColumnBufferPandasTestCase(VerticaPythonUnitTestCase):
+    def setUp(self):
+        super(ColumnBufferPandasTestCase, self).setUp()
+        if pandas is None:
+            self.skipTest('pandas is not installed')
+
+    def _series(self, column, values):
+        return pandas.Series(_buffer(column, values).to_pandas(pandas, numpy))
+
+    def test_nullable_dtypes(self):
+        self.assertEqual(self._series(_column(6), [b'1', b'2']).dtype, 'Int64')
+        self.assertEqual(self._series(_column(5), [b't']).dtype, 'boolean')
+        series = self._series(_column(6), [b'1', None])
+        self.assertTrue(series.isna().tolist()[1])
+        self.assertEqual(series[0], 1)
+
+    def test_not_null_dtypes(self):
+        self.assertEqual(self._series(_column(6, null_ok=False), [b'1']).dtype, numpy.int64)
+        self.assertEqual(self._series(_column(5, null_ok=False), [b'f']).dtype, numpy.bool_)
+        # a NULL still gets a nullable dtype
+        self.assertEqual(self._series(_column(6, null_ok=False), [None]).dtype, 'Int64')
+
+    def test_float(self):
+        series = self._series(_column(7), [b'1.5', None])
+        self.assertEqual(series.dtype, numpy.float64)
+        self.assertTrue(numpy.isnan(series[1]))
+
+    def test_no_converter(self):
+        # non-NULL VARBINARY and INTERVAL values are not lost
+        series = self._series(_column(17), [b'\x00\xff', None])
+        self.assertEqual(series.dtype, object)
+        self.assertListEqual(series.tolist(), [b'\x00\xff', None])
+        self.assertListEqual(self._series(_column(14), [b'1 02:00']).tolist(), [b'1 02:00'])
+
+    def test_timestamp(self):
+        series = self._series(_column(12), [b'9999-01-01 00:00:01', None])
+        self.assertEqual(series.dtype, numpy.dtype('datetime64[us]'))
+        self.assertEqual(series[0].to_pydatetime(), datetime(9999, 1, 1, 0, 0, 1))
+        self.assertTrue(series.isna().tolist()[1])
+
+    def test_timestamptz(self):
+        series = self._series(_column(13), [b'2015-01-01 02:00:01+02'])
+        self.assertEqual(str(series.dt.tz), 'UTC')
+        self.assertEqual(series[0].to_pydatetime().replace(tzinfo=None),
+                         datetime(2015, 1, 1, 0, 0, 1))
+
+
+class ColumnBufferArrowTestCase(VerticaPythonUnitTestCase):
+    def setUp(self):
+        super(ColumnBufferArrowTestCase, self).setUp()
+        if pyarrow is None:
+            self.skipTest('pyarrow is not installed')
+
+    def _array(self, column, values):
+        return _buffer(column, values).to_arrow(pyarrow, numpy)
+
+    def test_schema(self):
+        columns = [_column(6), _column(16, type_modifier=(10 << 16) + 2 + 4),
+                   _column(16, type_modifier=(18 << 16) + 4), _column(16), _column(12, null_ok=False),
+                   _column(13), _column(117), _column(14)]
+        schema = arrow_schema(pyarrow, columns)
+        self.assertListEqual(schema.types, [
+            pyarrow.int64(), pyarrow.decimal128(10, 2), pyarrow.int64(), pyarrow.string(),
+            pyarrow.timestamp('us'), pyarrow.timestamp('us', tz='UTC'), pyarrow.binary(),
+            pyarrow.string()])
+        self.assertFalse(schema.field(4).nullable)
+
+    def test_typed(self):
+        array = self._array(_column(6, 1), [pack('!q', -5), None])
+        self.assertEqual(array.type, pyarrow.int64())
+        self.assertListEqual(array.to_pylist(), [-5, None])
+        array = self._array(_column(5), [b't', None, b'f'])
+        self.assertListEqual(array.to_pylist(), [True, None, False])
+
+    def test_converted(self):
+        array = self._array(_column(10), [b'2015-10-21', None])
+        self.assertEqual(array.type, pyarrow.date32())
+        self.assertListEqual(array.to_pylist(), [date(2015, 10, 21), None])
+        array = self._array(_column(16, type_modifier=(10 << 16) + 2 + 4), [b'1.25'])
+        self.assertEqual(str(array[0]), '1.25')
+
+    def test_text_fallback(self):
+        # NUMERIC wider than decimal128 and types without Arrow equivalent
+        self.assertListEqual(self._array(_column(16), [b'1.5', None]).to_pylist(), ['1.5', None])
+        self.assertListEqual(self._array(_column(14), [b'1 02:00']).to_pylist(), ['1 02:00'])
@@ -0,0 +1,103 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import print_function, division, absolute_import
+
+import bz2
+import zlib
+
+from six import BytesIO, StringIO
+
+from .base import VerticaPythonUnitTestCase
+from ...vertica.compression import CompressedStream, compressed_copy_statement
+
+
+class FailingStream(object):
+    def read(self, size=-1):
+        raise IOError('read failed')
+
+
+class CompressedCopyStatementTestCase(VerticaPythonUnitTestCase):
+    def test_keyword_added(self):
+        self.assertEqual(compressed_copy_statement(u"COPY t FROM STDIN DELIMITER ','", 'gzip'),
+                         u"COPY t FROM STDIN GZIP DELIMITER ','")
+        self.assertEqual(compressed_copy_statement(u"copy t from  stdin", 'bzip2'),
+                         u"copy t from  stdin BZIP")
+
+    def test_keyword_present(self):
+        sql = u"COPY t FROM STDIN gzip DELIMITER ','"
+        self.assertEqual(compressed_copy_statement(sql, 'gzip'), sql)
+        with self.assertRaises(ValueError):
+            compressed_copy_statement(sql, 'bzip2')
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            compressed_copy_statement(u"COPY t FROM STDIN", 'lzo')
+        with self.assertRaises(ValueError):
+            compressed_copy_statement(u"COPY t FROM '/tmp/file.csv'", 'gzip')
+
+
+class CompressedStreamTestCase(VerticaPythonUnitTestCase):
+    def _read(self, stream, size):
+        chunks = []
+        while True:
+            chunk = stream.read(size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        stream.close()
+        return b''.join(chunks)
+
+    def test_gzip(self):
+        data = b'1,foo\n2,bar\n' * 1000
+        stream = CompressedStream(BytesIO(data), 'gzip', buffer_size=1000)
+        compressed = self._read(stream, 100)
+        self.assertEqual(zlib.decompress(compressed, 16 + zlib.MAX_WBITS), data)
+        self.assertIsNone(stream.error)
+
+    def test_bzip2(self):
+        data = u'1,\xfc\n' * 1000
+        stream = CompressedStream(StringIO(data), 'bzip2')
+        self.assertEqual(bz2.decompress(self._read(stream, -1)), data.encode('utf-8'))
+
+    def test_error(self):
+        stream = CompressedStream(FailingStream(), 'gzip')
+        self._read(stream, 100)
+        self.assertIsInstance(stream.error, IOError)
+
+    def test_close_early(self):
+        stream = CompressedStream(BytesIO(b'x' * 1000000), 'gzip', buffer_size=10)
+        self.assertTrue(stream.read(1))
+        stream.close()
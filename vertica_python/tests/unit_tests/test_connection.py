@@ -0,0 +1,237 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+from __future__ import print_function, division, absolute_import
+
+import logging
+import socket
+import threading
+from struct import pack
+
+from .base import VerticaPythonUnitTestCase
+from ...vertica import messages
+from ...vertica.connection import Connection, DEFAULT_READ_BUFFER_SIZE, DEFAULT_WRITE_BUFFER_SIZE
+
+
+class CancelTestCase(VerticaPythonUnitTestCase):
+    def setUp(self):
+        super(CancelTestCase, self).setUp()
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(2)
+        self.received = []
+
+    def tearDown(self):
+        self.listener.close()
+        super(CancelTestCase, self).tearDown()
+
+    def _serve_cancel_request(self):
+        side, _ = self.listener.accept()
+        data = b''
+        while len(data) < 16:
+            chunk = side.recv(16 - len(data))
+            if not chunk:
+                break
+            data += chunk
+        self.received.append(data)
+        side.close()
+
+    def test_cancel_on_side_connection(self):
+        # a connection whose session socket is connected to the listener
+        conn = Connection.__new__(Connection)
+        conn._logger = logging.getLogger('unit_tests')
+        conn.options = {}
+        conn.backend_pid, conn.backend_key = 1234, 5678
+        conn.transaction_status = 'no_transaction'
+        conn.socket = socket.create_connection(self.listener.getsockname())
+        session, _ = self.listener.accept()
+        try:
+            server = threading.Thread(target=self._serve_cancel_request)
+            server.start()
+            conn.cancel()
+            server.join()
+            self.assertListEqual(self.received, [pack('!4I', 16, 80877102, 1234, 5678)])
+            # nothing was written on the session socket
+            session.setblocking(False)
+            self.assertRaises(socket.error, session.recv, 1)
+        finally:
+            session.close()
+            conn.socket.close()
+
+
+class RecordingSocket(object):
+    def __init__(self, response=b''):
+        self.sent = []
+        self.response = response
+
+    def sendall(self, data):
+        self.sent.append(bytes(data))
+
+    def recv_into(self, buf):
+        n = len(self.response)
+        buf[:n] = self.response
+        self.response = b''
+        return n
+
+
+class WriteCoalescingTestCase(VerticaPythonUnitTestCase):
+    def _connection(self, sock):
+        conn = Connection.__new__(Connection)
+        conn._logger = logging.getLogger('unit_tests')
+        conn.options = {}
+        conn.socket = sock
+        conn._reset_read_buffer()
+        conn._write_buffer = bytearray()
+        return conn
+
+    def test_extended_query_in_one_send(self):
+        sock = RecordingSocket()
+        conn = self._connection(sock)
+        conn.write(messages.Parse('', 'SELECT 1', ()))
+        conn.write(messages.Describe('prepared_statement', ''))
+        conn.write(messages.Bind('', '', [], [], False, None))
+        conn.write(messages.Execute('', 0))
+        self.assertListEqual(sock.sent, [])
+        conn.write(messages.Sync())
+        self.assertEqual(len(sock.sent), 1)
+        self.assertTrue(sock.sent[0].startswith(b'P'))
+        self.assertTrue(sock.sent[0].endswith(messages.Sync().get_message()))
+
+    def test_flush_before_read(self):
+        sock = RecordingSocket(response=b'Z' + pack('!I', 5) + b'I')
+        conn = self._connection(sock)
+        conn.write(messages.Close('portal', 'p0'))
+        message = conn.read_message()
+        self.assertIsInstance(message, messages.ReadyForQuery)
+        self.assertListEqual(sock.sent, [messages.Close('portal', 'p0').get_message()])
+
+    def test_full_buffer(self):
+        sock = RecordingSocket()
+        conn = self._connection(sock)
+        data = b'x' * (DEFAULT_WRITE_BUFFER_SIZE // 2)
+        conn.write(messages.CopyData(data))
+        conn.write(messages.CopyData(data))
+        self.assertEqual(len(sock.sent), 1)
+        conn.write(messages.CopyDone())
+        self.assertEqual(len(sock.sent), 2)
+        self.assertEqual(sum(len(d) for d in sock.sent), 2 * (len(data) + 5) + 5)
+
+
+class ChunkedSocket(object):
+    """Receives data at most chunk_size bytes at a time"""
+    def __init__(self, data, chunk_size):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self.max_buffer_size = 0
+
+    def recv_into(self, buf):
+        self.calls += 1
+        self.max_buffer_size = max(self.max_buffer_size, len(buf))
+        n = min(len(buf), self.chunk_size, len(self.data))
+        buf[:n] = self.data[:n]
+        self.data = self.data[n:]
+        return n
+
+
+def _data_row_message(value):
+    payload = pack('!HI', 1, len(value)) + value
+    return b'D' + pack('!I', len(payload) + 4) + payload
+
+
+def _ready_for_query_message():
+    return b'Z' + pack('!I', 5) + b'I'
+
+
+class ReadBufferTestCase(VerticaPythonUnitTestCase):
+    def _connection(self, sock):
+        conn = Connection.__new__(Connection)
+        conn._logger = logging.getLogger('unit_tests')
+        conn.options = {}
+        conn.socket = sock
+        conn._reset_read_buffer()
+        conn._write_buffer = bytearray()
+        return conn
+
+    def _read(self, conn, count):
+        return [conn.read_message() for _ in range(count)]
+
+    def test_small_chunks(self):
+        values = [b'a' * i for i in range(1, 20)]
+        data = b''.join(_data_row_message(value) for value in values) + _ready_for_query_message()
+        conn = self._connection(ChunkedSocket(data, 3))
+        messages_ = self._read(conn, len(values) + 1)
+        self.assertListEqual([message.values[0] for message in messages_[:-1]], values)
+        self.assertIsInstance(messages_[-1], messages.ReadyForQuery)
+
+    def test_messages_in_one_chunk(self):
+        data = _data_row_message(b'x') * 10 + _ready_for_query_message()
+        sock = ChunkedSocket(data, len(data))
+        conn = self._connection(sock)
+        messages_ = self._read(conn, 11)
+        self.assertListEqual([message.values[0] for message in messages_[:-1]], [b'x'] * 10)
+        self.assertIsInstance(messages_[-1], messages.ReadyForQuery)
+        self.assertEqual(sock.calls, 1)
+
+    def test_large_message(self):
+        value = b'y' * (3 * DEFAULT_READ_BUFFER_SIZE)
+        data = (_data_row_message(b'a') + _data_row_message(value) +
+                _data_row_message(b'b') * 2 + _ready_for_query_message())
+        sock = ChunkedSocket(data, DEFAULT_READ_BUFFER_SIZE // 2)
+        conn = self._connection(sock)
+        self.assertEqual(conn.read_message().values, [b'a'])
+        self.assertEqual(conn.read_message().values, [value])
+        self.assertGreater(sock.max_buffer_size, DEFAULT_READ_BUFFER_SIZE)
+        self.assertEqual(conn.read_message().values, [b'b'])
+        self.assertEqual(conn.read_message().values, [b'b'])
+        self.assertIsInstance(conn.read_message(), messages.ReadyForQuery)
+        # the buffer is back to its default size
+        self.assertEqual(len(conn._read_buffer), DEFAULT_READ_BUFFER_SIZE)
+
+    def test_shrink_with_pending_bytes(self):
+        value = b'y' * (DEFAULT_READ_BUFFER_SIZE + 1000)
+        rows = [_data_row_message(b'b' * 1000) for _ in range(200)]
+        data = _data_row_message(value) + b''.join(rows)
+        # the chunks do not end on message boundaries
+        sock = ChunkedSocket(data, 1003)
+        conn = self._connection(sock)
+        self.assertEqual(conn.read_message().values, [value])
+        self.assertGreater(len(conn._read_buffer), DEFAULT_READ_BUFFER_SIZE)
+        shrunk = False
+        for _ in rows:
+            self.assertEqual(conn.read_message().values, [b'b' * 1000])
+            # shrunk while the next message is partly received
+            shrunk = shrunk or (len(conn._read_buffer) == DEFAULT_READ_BUFFER_SIZE
+                                and conn._read_end > conn._read_start)
+        self.assertTrue(shrunk)
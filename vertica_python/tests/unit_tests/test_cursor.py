@@ -0,0 +1,711 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+from __future__ import print_function, division, absolute_import
+
+import datetime
+import logging
+from decimal import Decimal
+from struct import pack
+
+from .base import VerticaPythonUnitTestCase
+from ... import errors
+from ...vertica import cursor as cursor_module
+from ...vertica import messages
+from ...vertica.column import Column
+from ...vertica.cursor import (Cursor, _copy_encoder, _copy_lines, _copy_rows_lines, _IterStream,
+                               _named_template, _to_prepared_operation)
+from ...vertica.statement_cache import ExecutionCounter, PreparedStatement, StatementCache
+
+
+def _data_row(values):
+    return messages.DataRow(pack('!H', len(values)) + b''.join(
+        pack('!i', -1) if value is None else pack('!I', len(value)) + value for value in values))
+
+
+def _row_description(names):
+    # INTEGER columns
+    payload = pack('!HI', len(names), 0)
+    for name in names:
+        payload += name.encode() + b'\x00' + pack('!QHBIHHHiH', 0, 0, 0, 6, 8, 1, 0, -1, 0)
+    return messages.RowDescription(payload)
+
+
+class FakeConnection(object):
+    """
+    Stands in for a Connection: answers the extended query protocol messages
+    written by a cursor like a server executing a prepared statement whose
+    result is rows, and simple queries with the rows of queries[query]. The
+    next failing_executions Executes are answered with an ErrorResponse of
+    SQLSTATE execution_error.
+    """
+    def __init__(self, rows, honor_max_rows=True, queries=None):
+        self.options = {'use_prepared_statements': False, 'binary_transfer': False,
+                        'prepare_threshold': None}
+        self.parameters = {}
+        self.written = []
+        self.transaction_status = None
+        self._rows = list(rows)
+        self._honor_max_rows = honor_max_rows
+        self._responses = []
+        self.cancelled = False
+        self.queries = queries or {}
+        self.failing_executions = 0
+        self.execution_error = b'42V01'  # undefined relation
+        self._active_cursor = None
+        self._statement_cache = StatementCache()
+        self._execution_counter = ExecutionCounter()
+        # number of times messages were written after reading responses
+        self.flights = 0
+        self._reading = True
+
+    def _acquire(self, cursor):
+        if self._active_cursor is not None and self._active_cursor is not cursor:
+            self._active_cursor._detach()
+        self._active_cursor = cursor
+
+    def write(self, message):
+        self.written.append(message)
+        if self._reading:
+            self.flights += 1
+            self._reading = False
+        if isinstance(message, messages.Parse):
+            self._parsed = message._query
+            self._responses.append(messages.ParseComplete(b''))
+        elif isinstance(message, messages.Describe):
+            # INTEGER parameters
+            count = self._parsed.count('?')
+            self._responses.append(messages.ParameterDescription(
+                pack('!HI', count, 0) + pack('!BIiH', 0, 6, -1, 0) * count))
+            self._responses.append(_row_description(['a']))
+            tag = b'SELECT' if self._parsed.strip() else b''
+            self._responses.append(messages.CommandDescription(tag + b'\x00' + pack('!H', 0) + b'\x00'))
+        elif isinstance(message, messages.Bind):
+            self._responses.append(messages.BindComplete(b''))
+        elif isinstance(message, messages.Execute) and self.failing_executions:
+            self.failing_executions -= 1
+            self._responses.append(messages.ErrorResponse(
+                b'SERROR\x00C' + self.execution_error + b'\x00MExecution failed\x00\x00'))
+        elif isinstance(message, messages.Execute):
+            max_rows = message._max_rows if self._honor_max_rows else 0
+            count = max_rows or len(self._rows)
+            self._responses.extend(_data_row(row) for row in self._rows[:count])
+            self._rows = self._rows[count:]
+            if (max_rows and count == max_rows) or not self._honor_max_rows:
+                self._responses.append(messages.PortalSuspended(b''))
+            else:
+                self._responses.append(messages.CommandComplete(b'SELECT\x00'))
+        elif isinstance(message, messages.Query):
+            self._responses.append(_row_description(['a']))
+            self._responses.extend(_data_row(row) for row in self.queries[message._query_string])
+            self._responses.append(messages.CommandComplete(b'SELECT\x00'))
+            self._responses.append(messages.ReadyForQuery(b'T'))
+        elif isinstance(message, messages.Close):
+            self._responses.append(messages.CloseComplete(b''))
+        elif isinstance(message, messages.Sync):
+            self._responses.append(messages.ReadyForQuery(b'T'))
+
+    def cancel(self):
+        self.cancelled = True
+
+    def read_message(self):
+        self._reading = True
+        return self._responses.pop(0)
+
+    def read_expected_message(self, expected_types, error_handler=None):
+        message = self.read_message()
+        if isinstance(message, messages.ErrorResponse) and error_handler is not None:
+            error_handler(message)
+        assert isinstance(message, expected_types), message
+        return message
+
+    def closed(self):
+        return False
+
+    def sent(self, message_type):
+        return [message for message in self.written if isinstance(message, message_type)]
+
+
+def _server_side_cursor(connection, operation, arraysize):
+    cursor = Cursor(connection, logging.getLogger('unit_tests'), server_side=True)
+    cursor.arraysize = arraysize
+    # pretend the statement has been prepared
+    connection._statement_cache.add(PreparedStatement('s1', operation, [],
+                                                      _row_description(['a'])))
+    return cursor
+
+
+class ServerSideCursorTestCase(VerticaPythonUnitTestCase):
+    def test_bounded_fetch(self):
+        rows = [[str(i).encode()] for i in range(7)]
+        connection = FakeConnection(rows)
+        cursor = _server_side_cursor(connection, 'SELECT a FROM t', 3)
+        cursor.execute('SELECT a FROM t')
+        # only the first arraysize rows have been requested
+        self.assertEqual([m._max_rows for m in connection.sent(messages.Execute)], [3])
+        self.assertListEqual(cursor.fetchmany(), [[0], [1], [2]])
+        self.assertListEqual(cursor.fetchall(), [[i] for i in range(3, 7)])
+        self.assertEqual(len(connection.sent(messages.Execute)), 3)
+        self.assertEqual(cursor.rowcount, 7)
+        self.assertFalse(cursor.nextset())
+        self.assertEqual(len(connection.sent(messages.Sync)), 1)
+
+    def test_discard_rows(self):
+        connection = FakeConnection([[b'1'], [b'2'], [b'3']])
+        cursor = _server_side_cursor(connection, 'SELECT a FROM t', 1)
+        cursor.execute('SELECT a FROM t')
+        self.assertListEqual(cursor.fetchone(), [1])
+        cursor.flush_to_query_ready()
+        self.assertIsInstance(cursor._message, messages.ReadyForQuery)
+        self.assertEqual(len(connection.sent(messages.Close)), 1)
+        self.assertEqual(len(connection.sent(messages.Execute)), 1)
+
+    def test_max_rows_ignored(self):
+        # a server sending all rows at once and then PortalSuspended
+        connection = FakeConnection([[b'1'], [b'2'], [b'3']], honor_max_rows=False)
+        cursor = _server_side_cursor(connection, 'SELECT a FROM t', 2)
+        cursor.execute('SELECT a FROM t')
+        self.assertListEqual(cursor.fetchall(), [[1], [2], [3]])
+        self.assertEqual(len(connection.sent(messages.Execute)), 1)
+
+
+class CancelTestCase(VerticaPythonUnitTestCase):
+    def test_cancel_discards_results(self):
+        connection = FakeConnection([[b'1'], [b'2'], [b'3']])
+        cursor = _server_side_cursor(connection, 'SELECT a FROM t', 2)
+        cursor.execute('SELECT a FROM t')
+        self.assertListEqual(cursor.fetchone(), [1])
+        cursor.cancel()
+        self.assertTrue(connection.cancelled)
+        self.assertIsInstance(cursor._message, messages.ReadyForQuery)
+        self.assertIsNone(cursor.fetchone())
+
+
+class MultipleCursorsTestCase(VerticaPythonUnitTestCase):
+    def _cursor(self, connection):
+        return Cursor(connection, logging.getLogger('unit_tests'))
+
+    def test_buffered_results(self):
+        connection = FakeConnection([], queries={'SELECT 1': [[b'1'], [b'2'], [b'3']],
+                                                 'SELECT 2': [[b'4']]})
+        cursor1 = self._cursor(connection)
+        cursor2 = self._cursor(connection)
+        cursor1.execute('SELECT 1')
+        self.assertListEqual(cursor1.fetchone(), [1])
+        cursor2.execute('SELECT 2')
+        self.assertListEqual(cursor2.fetchall(), [[4]])
+        # the rest of the first result was buffered before the second query
+        self.assertListEqual(cursor1.fetchall(), [[2], [3]])
+        self.assertFalse(cursor1.nextset())
+        cursor1.execute('SELECT 2')
+        self.assertListEqual(cursor1.fetchall(), [[4]])
+
+    def test_interleave_with_server_side_cursor(self):
+        rows = [[str(i).encode()] for i in range(5)]
+        connection = FakeConnection(rows, queries={'SELECT 2': [[b'9']]})
+        # the portal survives the end of the exchange in a transaction
+        connection.parameters['auto_commit'] = 'off'
+        streaming = _server_side_cursor(connection, 'SELECT a FROM t', 2)
+        lookup = self._cursor(connection)
+        streaming.execute('SELECT a FROM t')
+        self.assertListEqual(streaming.fetchone(), [0])
+        lookup.execute('SELECT 2')
+        # only the end of the current Execute was buffered, the portal is kept open
+        self.assertIsInstance(streaming._buffer[-1], messages.PortalSuspended)
+        self.assertListEqual(lookup.fetchall(), [[9]])
+        self.assertListEqual(streaming.fetchall(), [[i] for i in range(1, 5)])
+        self.assertEqual(len(connection.sent(messages.Execute)), 3)
+        self.assertEqual(streaming.rowcount, 5)
+        self.assertFalse(streaming.nextset())
+        self.assertEqual(len(connection.sent(messages.Close)), 1)
+
+    def test_server_side_cursor_autocommit(self):
+        rows = [[str(i).encode()] for i in range(5)]
+        for fetched in (1, 2):
+            connection = FakeConnection(rows, queries={'SELECT 2': [[b'9']]})
+            connection.parameters['auto_commit'] = 'on'
+            streaming = _server_side_cursor(connection, 'SELECT a FROM t', 2)
+            lookup = self._cursor(connection)
+            streaming.execute('SELECT a FROM t')
+            self.assertEqual(len(streaming.fetchmany(fetched)), fetched)
+            lookup.execute('SELECT 2')
+            # the Sync ends the transaction and the portal: its rows were all buffered
+            self.assertEqual(connection.sent(messages.Execute)[-1]._max_rows, 0)
+            self.assertListEqual(lookup.fetchall(), [[9]])
+            self.assertListEqual(streaming.fetchall(), [[i] for i in range(fetched, 5)])
+            self.assertEqual(streaming.rowcount, 5)
+            self.assertFalse(streaming.nextset())
+            self.assertEqual(len(connection.sent(messages.Execute)), 2)
+            self.assertEqual(len(connection.sent(messages.Close)), 1)
+
+
+class FakeBatchConnection(FakeConnection):
+    """
+    Answers each Execute of the unnamed portal with the row count of an
+    INSERT, or with an ErrorResponse for the parameter sets in fail, after
+    which the messages are ignored until a Sync.
+    """
+    def __init__(self, fail=()):
+        FakeConnection.__init__(self, [])
+        self.fail = fail
+        self.executed = 0
+        self.answered = 0
+        self.max_in_flight = 0
+        self._skip = False
+
+    def write(self, message):
+        self.written.append(message)
+        if isinstance(message, messages.Sync):
+            self._skip = False
+            self._responses.append(messages.ReadyForQuery(b'T'))
+        elif self._skip:
+            return
+        elif isinstance(message, messages.Bind):
+            self._responses.append(messages.BindComplete(b''))
+        elif isinstance(message, messages.Execute):
+            if self.executed in self.fail:
+                self._skip = True
+                self._responses.append(messages.ErrorResponse(
+                    b'SERROR\x00C22V02\x00MInvalid input\x00\x00'))
+            else:
+                self._responses.append(_data_row([b'1']))
+                self._responses.append(messages.CommandComplete(b'INSERT\x00'))
+            self.executed += 1
+            self.max_in_flight = max(self.max_in_flight, self.executed - self.answered)
+
+    def read_message(self):
+        message = FakeConnection.read_message(self)
+        if isinstance(message, (messages.CommandComplete, messages.ErrorResponse)):
+            self.answered += 1
+        return message
+
+
+class ExecuteManyTestCase(VerticaPythonUnitTestCase):
+    def setUp(self):
+        super(ExecuteManyTestCase, self).setUp()
+        self._window = cursor_module.DEFAULT_EXECUTEMANY_WINDOW
+        cursor_module.DEFAULT_EXECUTEMANY_WINDOW = 4
+
+    def tearDown(self):
+        cursor_module.DEFAULT_EXECUTEMANY_WINDOW = self._window
+        super(ExecuteManyTestCase, self).tearDown()
+
+    def _cursor(self, connection):
+        # pretend the statement has been prepared
+        connection._statement_cache.add(PreparedStatement(
+            's1', 'INSERT INTO t VALUES (?)', [{'data_type_oid': 6}],
+            _row_description(['OUTPUT'])))
+        return Cursor(connection, logging.getLogger('unit_tests'))
+
+    def test_pipelined(self):
+        connection = FakeBatchConnection()
+        cursor = self._cursor(connection)
+        cursor.executemany('INSERT INTO t VALUES (?)', [[i] for i in range(10)],
+                           use_prepared_statements=True)
+        self.assertListEqual(cursor.batch_rowcounts, [1] * 10)
+        self.assertEqual(cursor.rowcount, 10)
+        self.assertEqual(connection.max_in_flight, 8)
+        self.assertEqual(len(connection.sent(messages.Flush)), 2)
+        self.assertEqual(len(connection.sent(messages.Sync)), 1)
+        self.assertIsInstance(cursor._message, messages.ReadyForQuery)
+        self.assertIsNone(cursor.fetchone())
+
+    def test_failing_parameter_set(self):
+        connection = FakeBatchConnection(fail=(5,))
+        cursor = self._cursor(connection)
+        with self.assertRaises(errors.QueryError) as context:
+            cursor.executemany('INSERT INTO t VALUES (?)', [[i] for i in range(10)],
+                               use_prepared_statements=True)
+        self.assertEqual(context.exception.batch_index, 5)
+        self.assertIn('parameter set: 5', str(context.exception))
+        self.assertListEqual(cursor.batch_rowcounts, [1] * 5)
+        # a data error does not mean that the statement is stale
+        self.assertIn('INSERT INTO t VALUES (?)', connection._statement_cache)
+        # the connection is ready for the next query
+        self.assertIsInstance(cursor._message, messages.ReadyForQuery)
+        self.assertListEqual(connection._responses, [])
+
+    def test_failing_iterable(self):
+        def parameter_sets():
+            for i in range(6):
+                yield [i]
+            raise RuntimeError('bad parameter set')
+        connection = FakeBatchConnection()
+        cursor = self._cursor(connection)
+        self.assertRaises(RuntimeError, cursor.executemany, 'INSERT INTO t VALUES (?)',
+                          parameter_sets(), use_prepared_statements=True)
+        # the parameter sets sent are synced and their responses discarded
+        self.assertEqual(len(connection.sent(messages.Sync)), 1)
+        self.assertIsInstance(cursor._message, messages.ReadyForQuery)
+        self.assertListEqual(connection._responses, [])
+        cursor.executemany('INSERT INTO t VALUES (?)', [[1]], use_prepared_statements=True)
+        self.assertListEqual(cursor.batch_rowcounts, [1])
+
+    def test_invalid_parameter_count(self):
+        connection = FakeBatchConnection()
+        cursor = self._cursor(connection)
+        self.assertRaises(ValueError, cursor.executemany, 'INSERT INTO t VALUES (?)',
+                          [[1], [2], [3, 4]], use_prepared_statements=True)
+        self.assertIsInstance(cursor._message, messages.ReadyForQuery)
+        self.assertListEqual(connection._responses, [])
+
+
+class StatementCacheTestCase(VerticaPythonUnitTestCase):
+    def test_reuse_prepared_statements(self):
+        connection = FakeConnection([])
+        connection._statement_cache = StatementCache(2)
+        cursor1 = Cursor(connection, logging.getLogger('unit_tests'))
+        cursor2 = Cursor(connection, logging.getLogger('unit_tests'))
+        for cursor, sql in ((cursor1, 'SELECT a FROM t'), (cursor2, 'SELECT b FROM t'),
+                            (cursor1, 'SELECT a FROM t'), (cursor2, 'SELECT a FROM t'),
+                            (cursor1, 'SELECT b FROM t')):
+            cursor.execute(sql, use_prepared_statements=True)
+        self.assertListEqual([m._query for m in connection.sent(messages.Parse)],
+                             ['SELECT a FROM t', 'SELECT b FROM t'])
+        self.assertEqual(len(connection.sent(messages.Close)), 0)
+
+        # the least recently used statement is closed to make room
+        cursor1.execute('SELECT c FROM t', use_prepared_statements=True)
+        self.assertListEqual([m._close_name for m in connection.sent(messages.Close)], ['s1'])
+        self.assertNotIn('SELECT a FROM t', connection._statement_cache)
+        self.assertListEqual([m._name for m in connection.sent(messages.Parse)], ['s1', 's2', 's3'])
+        self.assertListEqual([m._prepared_statement_name for m in connection.sent(messages.Bind)],
+                             ['s1', 's2', 's1', 's1', 's2', 's3'])
+
+    def test_failed_execution(self):
+        connection = FakeConnection([[b'1']])
+        cursor = Cursor(connection, logging.getLogger('unit_tests'))
+        cursor.execute('SELECT a FROM t', use_prepared_statements=True)
+        self.assertListEqual(cursor.fetchall(), [[1]])
+
+        # e.g. the table has been dropped since the statement was prepared
+        connection.failing_executions = 1
+        self.assertRaises(errors.QueryError, cursor.execute, 'SELECT a FROM t',
+                          use_prepared_statements=True)
+        self.assertNotIn('SELECT a FROM t', connection._statement_cache)
+
+        # the statement is prepared again, the old one is closed in the same round trip
+        connection._rows = [[b'2']]
+        cursor.execute('SELECT a FROM t', use_prepared_statements=True)
+        self.assertListEqual(cursor.fetchall(), [[2]])
+        self.assertListEqual([m._name for m in connection.sent(messages.Parse)], ['s1', 's2'])
+        self.assertListEqual([m._close_name for m in connection.sent(messages.Close)], ['s1'])
+        self.assertIn('SELECT a FROM t', connection._statement_cache)
+
+    def test_data_error(self):
+        connection = FakeConnection([[b'1']])
+        connection.execution_error = b'22012'  # division by zero
+        cursor = Cursor(connection, logging.getLogger('unit_tests'))
+        cursor.execute('SELECT 1 / a FROM t', use_prepared_statements=True)
+        cursor.fetchall()
+        connection.failing_executions = 1
+        self.assertRaises(errors.QueryError, cursor.execute, 'SELECT 1 / a FROM t',
+                          use_prepared_statements=True)
+        # the statement is still cached
+        self.assertIn('SELECT 1 / a FROM t', connection._statement_cache)
+        connection._rows = [[b'2']]
+        cursor.execute('SELECT 1 / a FROM t', use_prepared_statements=True)
+        self.assertListEqual(cursor.fetchall(), [[2]])
+        self.assertEqual(len(connection.sent(messages.Parse)), 1)
+        self.assertEqual(len(connection.sent(messages.Close)), 0)
+
+
+class PreparedOperationTestCase(VerticaPythonUnitTestCase):
+    def test_positional(self):
+        self.assertEqual(
+            _to_prepared_operation(u"SELECT a FROM t WHERE b = %s AND c LIKE 'x%%' AND d = %s",
+                                   [1, 2]),
+            (u"SELECT a FROM t WHERE b = ? AND c LIKE 'x%' AND d = ?", [None, None]))
+        # no % formatting without parameters
+        self.assertEqual(_to_prepared_operation(u"SELECT 5 %% 3", None),
+                         (u"SELECT 5 %% 3", []))
+
+    def test_named(self):
+        self.assertEqual(
+            _to_prepared_operation(u"SELECT a::int FROM t WHERE b = :b AND c = :bc OR d = :b",
+                                   {'b': 1, 'bc': 2}),
+            (u"SELECT a::int FROM t WHERE b = ? AND c = ? OR d = ?", ['b', 'bc', 'b']))
+
+    def test_not_preparable(self):
+        for operation, parameters in ((u"SELECT 1; SELECT 2", None),
+                                      (u"COPY t FROM STDIN", None),
+                                      (u"SELECT a FROM t WHERE b = ?", None),
+                                      (u"SELECT a FROM t WHERE b = '%s'", [1]),
+                                      (u"SELECT a FROM t WHERE b = ':b'", {'b': 1}),
+                                      (u"SELECT a FROM t WHERE b = E'\\n' OR b = %s", [1]),
+                                      (u"SELECT a FROM t WHERE b = %d", [1])):
+            self.assertIsNone(_to_prepared_operation(operation, parameters), operation)
+
+
+class PrepareThresholdTestCase(VerticaPythonUnitTestCase):
+    def test_promotion(self):
+        connection = FakeConnection([[b'1']], queries={'SELECT a FROM t WHERE a = 1': [[b'1']]})
+        connection.options['prepare_threshold'] = 3
+        cursor = Cursor(connection, logging.getLogger('unit_tests'))
+        for _ in range(3):
+            cursor.execute('SELECT a FROM t WHERE a = %s', [1])
+            self.assertListEqual(cursor.fetchall(), [[1]])
+        self.assertEqual(len(connection.sent(messages.Query)), 2)
+        self.assertListEqual([m._query for m in connection.sent(messages.Parse)],
+                             ['SELECT a FROM t WHERE a = ?'])
+        self.assertListEqual([m._parameter_values for m in connection.sent(messages.Bind)], [[1]])
+
+        # values without a server-side equivalent keep the client-side bindings
+        connection.queries['SELECT a FROM t WHERE a = [1]'] = []
+        cursor.execute('SELECT a FROM t WHERE a = %s', [[1]])
+        self.assertEqual(len(connection.sent(messages.Query)), 3)
+
+    def test_whitespace_in_literals(self):
+        # statements that only differ inside a string literal are distinct
+        connection = FakeConnection([], queries={"SELECT a FROM t WHERE b = 'x  y' AND a = 1": [],
+                                                 "SELECT a FROM t WHERE b = 'x y' AND a = 1": []})
+        connection.options['prepare_threshold'] = 2
+        cursor = Cursor(connection, logging.getLogger('unit_tests'))
+        for operation in ("SELECT a FROM t WHERE b = 'x  y' AND a = %s",
+                          "SELECT a FROM t WHERE b = 'x y' AND a = %s") * 2:
+            cursor.execute(operation, [1])
+            cursor.fetchall()
+        self.assertListEqual([m._query for m in connection.sent(messages.Parse)],
+                             ["SELECT a FROM t WHERE b = 'x  y' AND a = ?",
+                              "SELECT a FROM t WHERE b = 'x y' AND a = ?"])
+
+    def test_missing_named_parameter(self):
+        connection = FakeConnection([], queries={'SELECT a FROM t WHERE a = :a': []})
+        connection.options['prepare_threshold'] = 1
+        cursor = Cursor(connection, logging.getLogger('unit_tests'))
+        cursor.execute('SELECT a FROM t WHERE a = :a', {'a': 1})
+        cursor.fetchall()
+        self.assertEqual(len(connection.sent(messages.Parse)), 1)
+        # executed with client-side bindings, which leave the placeholder as is
+        cursor.execute('SELECT a FROM t WHERE a = :a', {'b': 1})
+        cursor.fetchall()
+        self.assertEqual(len(connection.sent(messages.Parse)), 1)
+        self.assertListEqual([m._query_string for m in connection.sent(messages.Query)],
+                             ['SELECT a FROM t WHERE a = :a'])
+
+
+class SingleRoundTripTestCase(VerticaPythonUnitTestCase):
+    def test_inferred_parameter_types(self):
+        connection = FakeConnection([[b'1'], [b'2']])
+        cursor = Cursor(connection, logging.getLogger('unit_tests'))
+        cursor.execute('SELECT a FROM t WHERE b = ? AND c = ?', [1, 'x'],
+                       use_prepared_statements=True)
+        self.assertListEqual(cursor.fetchall(), [[1], [2]])
+        self.assertEqual(connection.flights, 1)
+        # the server chooses the parameter types of the statement
+        self.assertListEqual([m._param_types for m in connection.sent(messages.Parse)], [()])
+        bind = connection.sent(messages.Bind)[0]
+        self.assertListEqual(bind._parameter_type_oids, [6, 9])
+        self.assertFalse(bind._binary_parameters)
+        self.assertIn('SELECT a FROM t WHERE b = ? AND c = ?', connection._statement_cache)
+
+    def test_empty_statement(self):
+        connection = FakeConnection([], queries={'SELECT 2': [[b'9']]})
+        cursor = Cursor(connection, logging.getLogger('unit_tests'))
+        self.assertRaises(errors.EmptyQueryError, cursor.execute, ' ', use_prepared_statements=True)
+        self.assertNotIn(' ', connection._statement_cache)
+        # the responses to the whole round trip were read
+        self.assertIsInstance(cursor._message, messages.ReadyForQuery)
+        self.assertListEqual(connection._responses, [])
+        cursor.execute('SELECT 2')
+        self.assertListEqual(cursor.fetchall(), [[9]])
+        # the statement is closed with the next one prepared
+        cursor.execute('SELECT a FROM t', use_prepared_statements=True)
+        self.assertListEqual([m._close_name for m in connection.sent(messages.Close)], ['s1'])
+
+    def test_other_parameter_types(self):
+        # a statement first executed with an int is executed with a float later
+        connection = FakeConnection([[b'1'], [b'2']])
+        connection.options['binary_transfer'] = True
+        cursor = Cursor(connection, logging.getLogger('unit_tests'))
+        cursor.execute('SELECT a FROM t WHERE b = ?', [1], use_prepared_statements=True)
+        self.assertListEqual(cursor.fetchall(), [[1], [2]])
+        connection._rows = [[pack('!q', 3)]]  # binary results from now on
+        cursor.execute('SELECT a FROM t WHERE b = ?', [1.5], use_prepared_statements=True)
+        self.assertListEqual(cursor.fetchall(), [[3]])
+        self.assertListEqual([m._param_types for m in connection.sent(messages.Parse)], [()])
+        # the second Bind uses the types of the ParameterDescription (INTEGER here)
+        self.assertListEqual([(m._parameter_type_oids, m._parameter_values, m._binary_parameters)
+                              for m in connection.sent(messages.Bind)],
+                             [([6], [1], False), ([6], [1.5], True)])
+
+    def test_unknown_parameter_type(self):
+        # the type of NULL is read from the ParameterDescription
+        connection = FakeConnection([[b'1']])
+        cursor = Cursor(connection, logging.getLogger('unit_tests'))
+        cursor.execute('SELECT a FROM t WHERE b = ?', [None], use_prepared_statements=True)
+        self.assertListEqual(cursor.fetchall(), [[1]])
+        self.assertEqual(connection.flights, 2)
+        self.assertListEqual([m._param_types for m in connection.sent(messages.Parse)], [()])
+
+
+class ClientSideBindingTestCase(VerticaPythonUnitTestCase):
+    def setUp(self):
+        super(ClientSideBindingTestCase, self).setUp()
+        self.cursor = Cursor(None, logging.getLogger('unit_tests'))
+
+    def test_named(self):
+        operation = u"SELECT :s, :start, :s2, a::s, :start FROM t WHERE b = :s"
+        self.assertEqual(
+            self.cursor.format_operation_with_parameters(operation, {'s': "it's", 'start': None}),
+            u"SELECT 'it''s', NULL, :s2, a:'it''s', NULL FROM t WHERE b = 'it''s'")
+        # the template of the operation is reused
+        self.assertIs(_named_template(operation), _named_template(operation))
+
+    def test_named_values_not_substituted(self):
+        self.assertEqual(
+            self.cursor.format_operation_with_parameters(u"SELECT :a, :b", {'a': ':b', 'b': 1}),
+            u"SELECT ':b', 1")
+
+    def test_backslashes(self):
+        self.assertEqual(
+            self.cursor.format_operation_with_parameters(u"SELECT :a", {'a': u'\\x'}),
+            u"SELECT '\\x'")
+        self.assertEqual(
+            self.cursor.format_operation_with_parameters(u"SELECT %s", [u'\\x']),
+            u"SELECT '\\\\x'")
+
+
+class CopyEncodingTestCase(VerticaPythonUnitTestCase):
+    def test_lines(self):
+        rows = ((i, u'a"b\\c' if i else None) for i in range(2))
+        self.assertListEqual(list(_copy_lines(u'%s,%s', rows)),
+                             [u'0,\n', u'1,"a\\"b\\\\c"\n'])
+
+    def test_multiline_values(self):
+        self.assertListEqual(list(_copy_lines(u'%s,%s', [(u'a\nb', u'c\r\nd')])),
+                             [u'"a\\\nb","c\\\r\\\nd"\n'])
+
+    def test_named_lines(self):
+        self.assertListEqual(list(_copy_lines(u':b,:a', [{'a': 1, 'b': u'x'}])),
+                             [u'"x",1\n'])
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(TypeError):
+            list(_copy_lines(u'%s', [1]))
+
+    def test_stream(self):
+        stream = _IterStream(iter([u'ab\n', u'cde\n']))
+        self.assertEqual(stream.read(2), u'ab')
+        self.assertEqual(stream.read(4), u'\ncde')
+        self.assertEqual(stream.read(), u'\n')
+        self.assertEqual(stream.read(4), u'')
+        self.assertIsNone(stream.error)
+
+    def test_binary_stream(self):
+        stream = _IterStream(iter([b'\x00\x01', b'\x02']), binary=True)
+        self.assertEqual(stream.read(1), b'\x00')
+        self.assertEqual(stream.read(), b'\x01\x02')
+
+    def test_stream_error(self):
+        def lines():
+            yield u'1\n'
+            raise ValueError('bad row')
+        stream = _IterStream(lines())
+        self.assertEqual(stream.read(10), u'1\n')
+        self.assertIsInstance(stream.error, ValueError)
+        self.assertEqual(stream.read(10), u'')
+
+
+class CopyRowsTestCase(VerticaPythonUnitTestCase):
+    def _encode(self, value):
+        return _copy_encoder(value)(value)
+
+    def test_encoders(self):
+        self.assertEqual(self._encode(True), u't')
+        self.assertEqual(self._encode(-12), u'-12')
+        self.assertEqual(self._encode(0.1), u'0.1')
+        self.assertEqual(self._encode(float('-inf')), u'-Infinity')
+        self.assertEqual(self._encode(float('nan')), u'NaN')
+        self.assertEqual(self._encode(Decimal('1E+3')), u'1000')
+        self.assertEqual(self._encode(datetime.datetime(2020, 1, 2, 3, 4, 5, 6)),
+                         u'2020-01-02 03:04:05.000006')
+        self.assertEqual(self._encode(datetime.date(2020, 1, 2)), u'2020-01-02')
+        self.assertEqual(self._encode(datetime.time(3, 4)), u'03:04:00')
+        self.assertEqual(self._encode(bytearray(b'\x00\xff')), u'00ff')
+        self.assertEqual(self._encode(u'a"b'), u'"a\\"b"')
+
+    def test_lines(self):
+        encoders = [_copy_encoder(1), _copy_encoder(u'')]
+        rows = iter([(1, u'x'), (None, None)])
+        self.assertListEqual(list(_copy_rows_lines(encoders, rows)), [u'1,"x"\n', u',\n'])
+
+    def test_mixed_numbers(self):
+        rows = [(0,), (1.5,), (Decimal('2.25'),), (float('inf'),)]
+        self.assertListEqual(list(_copy_rows_lines([_copy_encoder(0)], rows)),
+                             [u'0\n', u'1.5\n', u'2.25\n', u'Infinity\n'])
+
+    def test_column_type_mismatch(self):
+        with self.assertRaises(TypeError):
+            list(_copy_rows_lines([_copy_encoder(1)], [(u'x',)]))
+
+    def _copy_rows(self, columns, rows, type_oids):
+        # Returns the COPY statement and input of copy_rows(), type_oids are
+        # the types of the columns if they are looked up
+        cursor = Cursor(FakeConnection([]), logging.getLogger('unit_tests'))
+        copied = []
+        described = []
+
+        def describe_columns(table, names):
+            described.append(names)
+            return [Column({'name': name, 'data_type_oid': oid, 'data_type_name': 'type',
+                            'type_modifier': -1, 'data_type_size': 8, 'null_ok': True,
+                            'is_identity': False, 'format_code': 0})
+                    for name, oid in zip(names, type_oids)]
+        cursor._describe_columns = describe_columns
+        cursor._copy = lambda sql, stream, **kwargs: copied.append((sql, stream.read()))
+        cursor.copy_rows('t', columns, rows)
+        return copied[0] + (len(described),)
+
+    def test_copy_rows_numbers(self):
+        sql, data, lookups = self._copy_rows(['a'], iter([(0,), (1.5,)]), [])
+        self.assertEqual(data, u'0\n1.5\n')
+        self.assertEqual(lookups, 0)
+
+    def test_copy_rows_multiline(self):
+        # a line break in a value does not end the record
+        sql, data, lookups = self._copy_rows(['a', 'b'], [(1, u'a\nb'), (2, u'c\rd')], [])
+        self.assertEqual(data, u'1,"a\\\nb"\n2,"c\\\rd"\n')
+
+    def test_copy_rows_null_sample(self):
+        # the columns without values in the first rows are looked up
+        rows = [(None, None)] * cursor_module.COPY_ROWS_SAMPLE_SIZE + [(b'\x01', b'x')]
+        sql, data, lookups = self._copy_rows(['a', 'b'], iter(rows), [17, 9])
+        self.assertEqual(lookups, 1)
+        self.assertIn(u"(a FORMAT 'hex',b)", sql)
+        self.assertTrue(data.endswith(u',\n01,"x"\n'))
+
+    def test_invalid_number_of_values(self):
+        with self.assertRaises(ValueError):
+            list(_copy_rows_lines([_copy_encoder(1)], [(1, 2)]))
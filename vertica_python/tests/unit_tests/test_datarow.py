@@ -0,0 +1,72 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import print_function, division, absolute_import
+
+from struct import pack
+
+from .base import VerticaPythonUnitTestCase
+from ...vertica.messages import DataRow
+
+
+def _data_row_payload(values):
+    payload = pack('!H', len(values))
+    for value in values:
+        if value is None:
+            payload += pack('!i', -1)
+        else:
+            payload += pack('!I', len(value)) + value
+    return payload
+
+
+class DataRowTestCase(VerticaPythonUnitTestCase):
+    def test_values(self):
+        values = [b'1', None, b'', b'some text', None]
+        row = DataRow(_data_row_payload(values))
+        self.assertEqual(len(row), 5)
+        self.assertEqual(row.values, values)
+
+    def test_value_access(self):
+        values = [b'a' * 70000, b'2', None]
+        row = DataRow(_data_row_payload(values))
+        self.assertEqual(row.value(2), None)
+        self.assertEqual(row.value(1), b'2')
+        self.assertEqual(row.value(0), values[0])
+        self.assertIsInstance(row.value(1), bytes)
+
+    def test_no_fields(self):
+        row = DataRow(_data_row_payload([]))
+        self.assertEqual(len(row), 0)
+        self.assertEqual(row.values, [])
@@ -0,0 +1,123 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from __future__ import print_function, division, absolute_import
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from struct import pack
+
+import pytz
+
+from .base import VerticaPythonUnitTestCase
+from ... import errors
+from ...datatypes import VerticaType
+from ...vertica.column import Column
+from ...vertica.native import NativeEncoder, column_encoder
+
+
+def _column(data_type_oid, type_modifier=-1):
+    return Column({'name': 'col', 'data_type_oid': data_type_oid, 'data_type_name': 'type',
+                   'type_modifier': type_modifier, 'data_type_size': 8, 'null_ok': True,
+                   'is_identity': False, 'format_code': 0})
+
+
+def _encode(data_type_oid, value, type_modifier=-1):
+    return column_encoder(_column(data_type_oid, type_modifier))[1](value)
+
+
+class NativeEncoderTestCase(VerticaPythonUnitTestCase):
+    def test_header(self):
+        encoder = NativeEncoder([_column(VerticaType.INT8), _column(VerticaType.VARCHAR),
+                                 _column(VerticaType.CHAR, 10 + 4)])
+        self.assertEqual(encoder.header,
+                         b'NATIVE\n\xff\r\n\x00' + pack('<I', 17) + b'\x01\x00\x00\x03\x00' +
+                         pack('<3I', 8, 0xFFFFFFFF, 10))
+
+    def test_row(self):
+        encoder = NativeEncoder([_column(VerticaType.INT8), _column(VerticaType.VARCHAR),
+                                 _column(VerticaType.BOOL)])
+        self.assertEqual(encoder.encode_row((1, None, True)),
+                         pack('<I', 9) + b'\x40' + pack('<q', 1) + b'\x01')
+        self.assertEqual(encoder.encode_row((None, u'\xfc', None)),
+                         pack('<I', 6) + b'\xa0' + pack('<I', 2) + b'\xc3\xbc')
+        with self.assertRaises(ValueError):
+            encoder.encode_row((1, u'a'))
+
+    def test_null_bit_field(self):
+        encoder = NativeEncoder([_column(VerticaType.BOOL)] * 9)
+        self.assertEqual(encoder.encode_row([None] * 8 + [False]),
+                         pack('<I', 1) + b'\xff\x00' + b'\x00')
+        self.assertEqual(encoder.encode_row([True] * 8 + [None]),
+                         pack('<I', 8) + b'\x00\x80' + b'\x01' * 8)
+
+    def test_fixed_width(self):
+        self.assertEqual(_encode(VerticaType.CHAR, u'one', 10 + 4), b'one       ')
+        self.assertEqual(_encode(VerticaType.BINARY, b'\x01', 3 + 4), b'\x01\x00\x00')
+        with self.assertRaises(ValueError):
+            _encode(VerticaType.CHAR, u'four', 3 + 4)
+        with self.assertRaises(TypeError):
+            _encode(VerticaType.VARBINARY, 5)
+
+    def test_numbers(self):
+        self.assertEqual(_encode(VerticaType.INT8, -2), pack('<q', -2))
+        self.assertEqual(_encode(VerticaType.FLOAT8, 1.5), pack('<d', 1.5))
+        with self.assertRaises(TypeError):
+            _encode(VerticaType.INT8, 1.5)
+
+    def test_numeric(self):
+        numeric_38_0 = (38 << 16) + 4
+        self.assertEqual(_encode(VerticaType.NUMERIC, Decimal(1234532), numeric_38_0),
+                         b'\x00' * 16 + b'\x64\xd6\x12\x00\x00\x00\x00\x00')
+        self.assertEqual(_encode(VerticaType.NUMERIC, -1, numeric_38_0), b'\xff' * 24)
+        numeric_10_2 = ((10 << 16) | 2) + 4
+        self.assertEqual(_encode(VerticaType.NUMERIC, Decimal('-12.345'), numeric_10_2),
+                         pack('<q', -1235))
+        with self.assertRaises(ValueError):
+            _encode(VerticaType.NUMERIC, Decimal('1E8'), numeric_10_2)
+
+    def test_datetimes(self):
+        self.assertEqual(_encode(VerticaType.DATE, date(1999, 12, 31)), pack('<q', -1))
+        self.assertEqual(_encode(VerticaType.TIME, time(0, 0, 1, 5)), pack('<q', 1000005))
+        self.assertEqual(_encode(VerticaType.TIMESTAMP, datetime(2000, 1, 2, 0, 0, 0, 1)),
+                         pack('<q', 86400000001))
+        eastern = pytz.timezone('US/Eastern').localize(datetime(2000, 1, 1))
+        self.assertEqual(_encode(VerticaType.TIMESTAMPTZ, eastern), pack('<q', 5 * 3600000000))
+        self.assertEqual(_encode(VerticaType.INTERVAL, timedelta(days=-1, microseconds=1)),
+                         pack('<q', -86399999999))
+
+    def test_not_supported(self):
+        with self.assertRaises(errors.NotSupportedError):
+            NativeEncoder([_column(VerticaType.TIMETZ)])
@@ -0,0 +1,203 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+from __future__ import print_function, division, absolute_import
+
+import threading
+
+from .base import VerticaPythonUnitTestCase
+from ... import errors
+from ... import pool as pool_module
+from ...pool import ConnectionPool
+
+
+class FakeCursor(object):
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, operation):
+        if not self.connection.alive:
+            raise errors.ConnectionError('Connection is broken')
+        self.connection.executed.append(operation)
+
+    def fetchall(self):
+        return [[1]]
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.alive = True
+        self.is_closed = False
+        self.transaction_status = 'no_transaction'
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def _discard_results(self):
+        pass
+
+    def rollback(self):
+        self.executed.append('ROLLBACK')
+        self.transaction_status = 'no_transaction'
+
+    def closed(self):
+        return self.is_closed
+
+    def close(self):
+        self.is_closed = True
+
+
+class FakeConnectionPool(ConnectionPool):
+    def __init__(self, *args, **kwargs):
+        self.opened = []
+        super(FakeConnectionPool, self).__init__({}, *args, **kwargs)
+
+    def _connect(self):
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ConnectionPoolTestCase(VerticaPythonUnitTestCase):
+    def setUp(self):
+        super(ConnectionPoolTestCase, self).setUp()
+        self.clock = FakeClock()
+        self._real_now = pool_module._now
+        pool_module._now = self.clock
+
+    def tearDown(self):
+        pool_module._now = self._real_now
+        super(ConnectionPoolTestCase, self).tearDown()
+
+    def test_reuse(self):
+        pool = FakeConnectionPool(min_size=1, max_size=2)
+        self.assertEqual(pool.size, 1)
+        with pool.connection() as conn:
+            self.assertIs(conn, pool.opened[0])
+        with pool.connection() as conn:
+            self.assertIs(conn, pool.opened[0])
+        self.assertEqual(len(pool.opened), 1)
+        self.assertEqual(pool.idle, 1)
+
+    def test_max_size(self):
+        pool = FakeConnectionPool(max_size=2, timeout=0)
+        conn1 = pool.getconn()
+        conn2 = pool.getconn()
+        self.assertRaises(errors.PoolTimeoutError, pool.getconn)
+        pool.putconn(conn1)
+        self.assertIs(pool.getconn(), conn1)
+        pool.putconn(conn2)
+        pool.putconn(conn1)
+        self.assertEqual(pool.size, 2)
+
+    def test_wait_for_connection(self):
+        pool = FakeConnectionPool(max_size=1)
+        conn = pool.getconn()
+        checked_out = []
+        waiter = threading.Thread(target=lambda: checked_out.append(pool.getconn(timeout=10)))
+        waiter.start()
+        pool.putconn(conn)
+        waiter.join()
+        self.assertListEqual(checked_out, [conn])
+
+    def test_reset_on_checkin(self):
+        pool = FakeConnectionPool()
+        with pool.connection() as conn:
+            conn.transaction_status = 'in_transaction'
+        self.assertListEqual(conn.executed, ['ROLLBACK'])
+        with pool.connection() as conn:
+            pass
+        self.assertListEqual(conn.executed, ['ROLLBACK'])
+
+    def test_idle_timeout(self):
+        pool = FakeConnectionPool(min_size=1, idle_timeout=60)
+        conn1 = pool.getconn()
+        conn2 = pool.getconn()
+        pool.putconn(conn1)
+        pool.putconn(conn2)
+        self.clock.now += 61
+        # conn1 expires, conn2 is kept to honor min_size
+        self.assertIs(pool.getconn(), conn2)
+        self.assertTrue(conn1.closed())
+        self.assertEqual(pool.size, 1)
+
+    def test_max_lifetime(self):
+        pool = FakeConnectionPool(max_lifetime=3600, check_interval=None)
+        conn = pool.getconn()
+        self.clock.now += 3601
+        pool.putconn(conn)
+        self.assertTrue(conn.closed())
+        self.assertEqual(pool.size, 0)
+        self.assertIsNot(pool.getconn(), conn)
+
+    def test_liveness_check(self):
+        pool = FakeConnectionPool(check_interval=30)
+        with pool.connection() as conn:
+            pass
+        self.clock.now += 10
+        with pool.connection() as conn:
+            self.assertListEqual(conn.executed, [])
+        conn.alive = False
+        self.clock.now += 31
+        with pool.connection() as new_conn:
+            self.assertIsNot(new_conn, conn)
+        self.assertTrue(conn.closed())
+        self.assertEqual(pool.size, 1)
+
+    def test_close(self):
+        pool = FakeConnectionPool()
+        conn1 = pool.getconn()
+        conn2 = pool.getconn()
+        pool.putconn(conn1)
+        pool.close()
+        self.assertTrue(conn1.closed())
+        self.assertRaises(errors.PoolError, pool.getconn)
+        # a connection in use is closed when it is returned
+        self.assertFalse(conn2.closed())
+        pool.putconn(conn2)
+        self.assertTrue(conn2.closed())
+        self.assertEqual(pool.size, 0)
+
+    def test_foreign_connection(self):
+        pool = FakeConnectionPool()
+        self.assertRaises(errors.PoolError, pool.putconn, FakeConnection())
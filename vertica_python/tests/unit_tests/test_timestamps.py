@@ -36,10 +36,13 @@
 from __future__ import print_function, division, absolute_import
 
 from collections import namedtuple
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
+
+import pytz
 
 from .base import VerticaPythonUnitTestCase
-from ...vertica.column import timestamp_parse
+from ... import errors
+from ...vertica.column import date_parse, time_parse, timestamp_parse, timestamp_tz_parse
 
 TimestampTestingCase = namedtuple("TimestampTestingCase", ["string", "timestamp"])
 
@@ -160,3 +163,75 @@ class TimestampParsingTestCase(VerticaPythonUnitTestCase):
         ]
         self._test_timestamps(test_cases=test_cases,
                               msg='timestamp past 9999 microsecond resolution')
+
+    def test_timestamp_bytes(self):
+        test_cases = [
+            TimestampTestingCase(
+                b'1985-10-26 01:25:01',
+                datetime(year=1985, month=10, day=26, hour=1, minute=25, second=1)
+            ),
+            TimestampTestingCase(
+                b'18850-09-02 02:03:05.002343',
+                datetime(year=9999, month=9, day=2, hour=2, minute=3, second=5,
+                         microsecond=2343)
+            ),
+        ]
+        self._test_timestamps(test_cases=test_cases, msg='timestamp from bytes')
+
+    def test_timestamp_invalid(self):
+        for value in ('1985-10-26 01:25', '1985-10-26 01:25:01.1234567', '1985-13-26 01:25:01'):
+            with self.assertRaises(ValueError, msg=value):
+                timestamp_parse(value)
+
+
+class TimestampTzParsingTestCase(VerticaPythonUnitTestCase):
+    def _test_offset(self, string, naive, offset):
+        ts = timestamp_tz_parse(string)
+        self.assertEqual(ts.replace(tzinfo=None), naive, msg=string)
+        self.assertEqual(ts.utcoffset(), offset, msg=string)
+
+    def test_utc(self):
+        ts = timestamp_tz_parse(b'2013-01-01 00:00:00.01+00')
+        self.assertEqual(ts, datetime(2013, 1, 1, 0, 0, 0, 10000, tzinfo=pytz.utc))
+        self.assertIs(ts.tzinfo, pytz.utc)
+
+    def test_hour_offset(self):
+        self._test_offset('2013-01-01 00:00:00-05', datetime(2013, 1, 1),
+                          timedelta(hours=-5))
+        self._test_offset(b'2013-01-01 00:00:00.00001+09', datetime(2013, 1, 1, 0, 0, 0, 10),
+                          timedelta(hours=9))
+
+    def test_minute_and_second_offset(self):
+        self._test_offset('2013-01-01 10:20:30.5+05:30', datetime(2013, 1, 1, 10, 20, 30, 500000),
+                          timedelta(hours=5, minutes=30))
+        self._test_offset('1883-11-18 12:00:00-04:56:02', datetime(1883, 11, 18, 12),
+                          -timedelta(hours=4, minutes=56, seconds=2))
+
+    def test_year_over_9999(self):
+        self._test_offset('19850-10-26 01:25:01-03', datetime(9999, 10, 26, 1, 25, 1),
+                          timedelta(hours=-3))
+
+
+class TimeParsingTestCase(VerticaPythonUnitTestCase):
+    def test_time(self):
+        self.assertEqual(time_parse('01:25:01'), time(1, 25, 1))
+        self.assertEqual(time_parse(b'22:55:02.01'), time(22, 55, 2, 10000))
+        self.assertEqual(time_parse('11:12:03.000001'), time(11, 12, 3, 1))
+
+    def test_time_invalid(self):
+        for value in ('24:00:00', '1:2:3', '01:02:03.'):
+            with self.assertRaises(ValueError, msg=value):
+                time_parse(value)
+
+
+class DateParsingTestCase(VerticaPythonUnitTestCase):
+    def test_date(self):
+        self.assertEqual(date_parse('1985-10-26'), date(1985, 10, 26))
+        self.assertEqual(date_parse(b'0001-01-01'), date(1, 1, 1))
+
+    def test_date_year_over_9999(self):
+        self.assertEqual(date_parse('19850-10-26'), date(9999, 10, 26))
+
+    def test_date_bc(self):
+        with self.assertRaises(errors.NotSupportedError):
+            date_parse('0044-03-15 BC')
@@ -0,0 +1,425 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+asyncio connection
+
+AsyncConnection talks to Vertica over asyncio streams, so that one event loop
+can run many queries concurrently without a thread per connection. It speaks
+the same protocol as Connection and reuses its frontend and backend message
+classes; only the I/O is awaitable:
+
+>> conn = await async_connect(**conn_info)
+>> cur = conn.cursor()
+>> await cur.execute("SELECT * FROM a_table")
+>> async for row in cur:
+>>     print(row)
+>> await conn.close()
+
+This module requires Python 3.5 or later (SSL requires Python 3.11 or later).
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import asyncio
+import logging
+import ssl
+import uuid
+from struct import unpack
+
+from .. import errors
+from ..vertica import messages
+from ..vertica.async_cursor import AsyncCursor
+from ..vertica.connection import (Connection, _AddressList, _generate_session_label,
+                                  DEFAULT_HOST, DEFAULT_PORT, DEFAULT_USER, DEFAULT_PASSWORD,
+                                  DEFAULT_LOG_LEVEL, DEFAULT_LOG_PATH, ASCII)
+from ..vertica.messages.message import BackendMessage, FrontendMessage
+from ..vertica.messages.frontend_messages import CancelRequest
+from ..vertica.log import VerticaLogging
+from ..vertica.statement_cache import DEFAULT_STATEMENT_CACHE_SIZE, StatementCache
+
+
+async def async_connect(**kwargs):
+    """Opens a new asyncio connection to a Vertica database."""
+    conn = AsyncConnection(kwargs)
+    await conn.startup_connection()
+    return conn
+
+
+class AsyncConnection(object):
+    def __init__(self, options=None):
+        self.parameters = {}
+        self.session_id = None
+        self.backend_pid = None
+        self.backend_key = None
+        self.transaction_status = None
+        self._reader = None
+        self._writer = None
+
+        options = options or {}
+        self.options = {key: value for key, value in options.items() if value is not None}
+
+        self.options.setdefault('host', DEFAULT_HOST)
+        self.options.setdefault('port', DEFAULT_PORT)
+        self.options.setdefault('user', DEFAULT_USER)
+        self.options.setdefault('database', self.options['user'])
+        self.options.setdefault('password', DEFAULT_PASSWORD)
+        self.options.setdefault('session_label', _generate_session_label())
+
+        # Set up connection logger
+        logger_name = 'vertica_{0}_{1}'.format(id(self), str(uuid.uuid4())) # must be a unique value
+        self._logger = logging.getLogger(logger_name)
+
+        if 'log_level' not in self.options and 'log_path' not in self.options:
+            # logger is disabled by default
+            self._logger.disabled = True
+        else:
+            self.options.setdefault('log_level', DEFAULT_LOG_LEVEL)
+            self.options.setdefault('log_path', DEFAULT_LOG_PATH)
+            VerticaLogging.setup_file_logging(logger_name, self.options['log_path'],
+                                              self.options['log_level'], id(self))
+
+        self.address_list = _AddressList(self.options['host'], self.options['port'],
+                                         self.options.get('backup_server_node', []), self._logger)
+
+        # cursors share the connection: the active cursor is the one whose
+        # exchange with the server is in progress (see _acquire)
+        self.options.setdefault('unicode_error', None)
+        self._active_cursor = None
+        # cursor used by commit() and rollback()
+        self._cursor = AsyncCursor(self, self._logger, cursor_type=None,
+                                   unicode_error=self.options['unicode_error'])
+
+        self.options.setdefault('use_prepared_statements', False)
+        self.options.setdefault('prepared_statement_cache_size', DEFAULT_STATEMENT_CACHE_SIZE)
+        self._statement_cache = StatementCache(self.options['prepared_statement_cache_size'])
+        self.options.setdefault('binary_transfer', False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type_, value, traceback):
+        try:
+            # if there's no outstanding transaction, we can simply close the connection
+            if self.transaction_status in (None, 'in_transaction'):
+                return
+
+            if type_ is not None:
+                await self.rollback()
+            else:
+                await self.commit()
+        finally:
+            await self.close()
+
+    #############################################
+    # dbapi methods
+    #############################################
+    async def close(self):
+        self._logger.info('Close the connection')
+        try:
+            if self._writer is not None:
+                await self.write(messages.Terminate())
+        finally:
+            self.close_socket()
+
+    async def cancel(self):
+        """
+        Cancels the query running on this connection, by sending a
+        CancelRequest on a short-lived side connection (see Connection.cancel).
+        """
+        if self.closed():
+            raise errors.ConnectionError('Connection is closed')
+
+        host, port = self._writer.get_extra_info('peername')[:2]
+        self._logger.info('Cancel the running query via host "{0}" on port {1}'.format(host, port))
+        reader, writer = await self._open_stream(host, port)
+        try:
+            ssl_options = self.options.get('ssl')
+            if ssl_options:
+                await self._enable_ssl(reader, writer, host, ssl_options)
+            writer.write(CancelRequest(self.backend_pid, self.backend_key).get_message())
+            await writer.drain()
+            # the server closes the side connection once it has handled the request
+            await reader.read(1)
+        finally:
+            writer.close()
+
+    async def commit(self):
+        if self.closed():
+            raise errors.ConnectionError('Connection is closed')
+
+        await self._cursor.execute('COMMIT;')
+
+    async def rollback(self):
+        if self.closed():
+            raise errors.ConnectionError('Connection is closed')
+
+        await self._cursor.execute('ROLLBACK;')
+
+    def cursor(self, cursor_type=None):
+        """
+        Returns a new cursor of this connection. Like the cursors of a
+        Connection, the cursors have their own results and share the
+        prepared statements of the connection (see Connection.cursor).
+        """
+        if self.closed():
+            raise errors.ConnectionError('Connection is closed')
+
+        return AsyncCursor(self, self._logger, cursor_type=cursor_type,
+                           unicode_error=self.options['unicode_error'])
+
+    #############################################
+    # internal
+    #############################################
+    # message handling that does no I/O is shared with Connection
+    is_asynchronous_message = Connection.is_asynchronous_message
+    handle_asynchronous_message = Connection.handle_asynchronous_message
+    process_message = Connection.process_message
+
+    def opened(self):
+        return (self._writer is not None
+                and self.backend_pid is not None
+                and self.transaction_status is not None)
+
+    def closed(self):
+        return not self.opened()
+
+    def close_socket(self):
+        try:
+            if self._writer is not None:
+                self._writer.close()
+        finally:
+            self._reader = self._writer = None
+            self._active_cursor = None
+            # prepared statements do not outlive the session
+            self._statement_cache.clear()
+            self.parameters = {}
+            self.backend_pid = None
+            self.backend_key = None
+            self.transaction_status = None
+
+    async def write(self, message):
+        if not isinstance(message, FrontendMessage):
+            raise TypeError("invalid message: ({0})".format(message))
+
+        self._logger.debug('=> %s', message)
+        try:
+            for data in message.fetch_message():
+                self._writer.write(data)
+            await self._writer.drain()
+        except Exception as e:
+            self.close_socket()
+            self._logger.error(str(e))
+            raise
+
+    async def read_message(self):
+        while True:
+            try:
+                type_, size = unpack('!cI', await self._reader.readexactly(5))
+                if size < 4:
+                    raise errors.MessageError("Bad message size: {0}".format(size))
+                message = BackendMessage.from_type(type_, await self._reader.readexactly(size - 4))
+                self._logger.debug('<= %s', message)
+                self.handle_asynchronous_message(message)
+            except asyncio.IncompleteReadError as e:
+                self.close_socket()
+                self._logger.error(e)
+                raise errors.ConnectionError("Connection closed by Vertica")
+            except (SystemError, IOError) as e:
+                self.close_socket()
+                self._logger.error(e)
+                raise errors.ConnectionError(str(e))
+            if not self.is_asynchronous_message(message):
+                break
+        return message
+
+    async def read_expected_message(self, expected_types, error_handler=None):
+        # Reads a message and does some basic error handling.
+        # expected_types must be a class (e.g. messages.BindComplete) or a tuple of classes
+        message = await self.read_message()
+        if isinstance(message, expected_types):
+            return message
+        elif isinstance(message, messages.ErrorResponse):
+            if error_handler is not None:
+                await error_handler(message)
+            raise errors.DatabaseError(message.error_message())
+        else:
+            msg = 'Received unexpected message type: {}. '.format(type(message).__name__)
+            if isinstance(expected_types, tuple):
+                msg += 'Expected types: {}'.format(", ".join([t.__name__ for t in expected_types]))
+            else:
+                msg += 'Expected type: {}'.format(expected_types.__name__)
+            self._logger.error(msg)
+            raise errors.MessageError(msg)
+
+    async def _acquire(self, cursor):
+        """
+        Gives cursor the use of the connection, reading the results still
+        pending for the previous cursor into its buffer first.
+        """
+        active = self._active_cursor
+        if active is not None and active is not cursor:
+            await active._detach()
+        self._active_cursor = cursor
+
+    async def _open_stream(self, host, port):
+        return await asyncio.wait_for(asyncio.open_connection(host, port),
+                                      self.options.get('connection_timeout'))
+
+    async def _establish_connection(self):
+        addr = self.address_list.peek()
+        last_exception = None
+
+        # Failover: loop to try all addresses
+        while addr:
+            host, port = addr
+            self._logger.info('Establishing connection to host "{0}" on port {1}'.format(host, port))
+            try:
+                reader, writer = await self._open_stream(host, port)
+                return reader, writer, host
+            except Exception as e:
+                self._logger.info('Failed to connect to host "{0}" on port {1}: {2}'.format(host, port, e))
+                last_exception = e
+                self.address_list.pop()
+                addr = self.address_list.peek()
+
+        err_msg = 'Failed to establish a connection to the primary server or any backup address.'
+        self._logger.error(err_msg)
+        raise errors.ConnectionError(err_msg) from last_exception
+
+    async def _balance_load(self, reader, writer, host):
+        self._logger.debug('=> %s', messages.LoadBalanceRequest())
+        writer.write(messages.LoadBalanceRequest().get_message())
+        await writer.drain()
+        response = await reader.readexactly(1)
+
+        if response == b'Y':
+            size = unpack('!I', await reader.readexactly(4))[0]
+            if size < 4:
+                err_msg = "Bad message size: {0}".format(size)
+                self._logger.error(err_msg)
+                raise errors.MessageError(err_msg)
+            res = BackendMessage.from_type(type_=response, data=await reader.readexactly(size - 4))
+            self._logger.debug('<= %s', res)
+            lb_host, lb_port = res.get_host(), res.get_port()
+            self._logger.info('Load balancing to host "{0}" on port {1}'.format(lb_host, lb_port))
+
+            peer_host, peer_port = writer.get_extra_info('peername')[:2]
+            if lb_host == peer_host and lb_port == peer_port:
+                self._logger.info('Already connecting to host "{0}" on port {1}. Ignore load balancing.'
+                                  .format(lb_host, lb_port))
+                return reader, writer, host
+
+            # Push the new host onto the address list before connecting again. Note that this
+            # will leave the originally-specified host as the first failover possibility.
+            self.address_list.push(lb_host, lb_port)
+            writer.close()
+            return await self._establish_connection()
+
+        self._logger.debug('<= LoadBalanceResponse: %s', response)
+        self._logger.warning("Load balancing requested but not supported by server")
+        return reader, writer, host
+
+    async def _enable_ssl(self, reader, writer, host, ssl_options):
+        self._logger.debug('=> %s', messages.SslRequest())
+        writer.write(messages.SslRequest().get_message())
+        await writer.drain()
+        response = await reader.readexactly(1)
+        self._logger.debug('<= SslResponse: %s', response)
+        if response != b'S':
+            err_msg = "SSL requested but not supported by server"
+            self._logger.error(err_msg)
+            raise errors.SSLNotSupported(err_msg)
+        if not hasattr(writer, 'start_tls'):
+            raise errors.NotSupportedError('SSL connections require Python 3.11 or later')
+
+        self._logger.info('Enabling SSL')
+        if isinstance(ssl_options, ssl.SSLContext):
+            context = ssl_options
+        else:
+            # like ssl.wrap_socket(), do not verify the server certificate
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        try:
+            await writer.start_tls(context, server_hostname=host)
+        except (ssl.CertificateError, ssl.SSLError) as e:
+            raise errors.ConnectionError(str(e)) from e
+
+    async def startup_connection(self):
+        reader, writer, host = await self._establish_connection()
+        try:
+            if self.options.get('connection_load_balance'):
+                reader, writer, host = await self._balance_load(reader, writer, host)
+            ssl_options = self.options.get('ssl')
+            if ssl_options:
+                await self._enable_ssl(reader, writer, host, ssl_options)
+        except Exception:
+            writer.close()
+            raise
+        self._reader, self._writer = reader, writer
+
+        # This doesn't handle Unicode usernames or passwords
+        user = self.options['user'].encode(ASCII)
+        database = self.options['database'].encode(ASCII)
+        password = self.options['password'].encode(ASCII)
+        session_label = self.options['session_label'].encode(ASCII)
+
+        await self.write(messages.Startup(user, database, session_label))
+
+        while True:
+            message = await self.read_message()
+
+            if isinstance(message, messages.Authentication):
+                if message.code == messages.Authentication.OK:
+                    self._logger.info("User {} successfully authenticated"
+                        .format(self.options['user']))
+                elif message.code == messages.Authentication.CHANGE_PASSWORD:
+                    msg = "The password for user {} has expired".format(self.options['user'])
+                    self._logger.error(msg)
+                    raise errors.ConnectionError(msg)
+                elif message.code == messages.Authentication.PASSWORD_GRACE:
+                    self._logger.warning('The password for user {} will expire soon.'
+                        ' Please consider changing it.'.format(self.options['user']))
+                else:
+                    await self.write(messages.Password(password, message.code,
+                                                       {'user': user,
+                                                        'salt': getattr(message, 'salt', None),
+                                                        'usersalt': getattr(message, 'usersalt', None)}))
+            else:
+                self.process_message(message)
+
+            if isinstance(message, messages.ReadyForQuery):
+                break
+        self._logger.info('Connection is ready')
@@ -0,0 +1,620 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+asyncio cursor
+
+AsyncCursor is the cursor of an AsyncConnection. Its methods that talk to the
+server are coroutines; parameter formatting, row decoding, the encoding of
+executemany() parameter sets and the bookkeeping of the statement cache and of
+the results of a batch are shared with Cursor. Rows can be consumed with an
+async for loop:
+
+>> await cur.execute("SELECT * FROM a_table")
+>> async for row in cur:
+>>     print(row)
+
+Like the cursors of a Connection, the cursors of an AsyncConnection share it:
+the results still pending for a cursor are buffered when another one executes
+a query. A connection and its cursors must not be used by concurrent tasks.
+
+This module requires Python 3.5 or later.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from collections import deque
+from itertools import chain
+
+from six import binary_type, string_types, text_type, BytesIO, StringIO
+
+from .. import errors
+from ..compat import as_text
+from ..vertica import messages
+from ..vertica.cursor import (Cursor, DEFAULT_EXECUTEMANY_WINDOW, END_OF_RESULT_RESPONSES,
+                              _NOTHING, _batch_response, file_type)
+from ..vertica.statement_cache import PreparedStatement
+
+
+class AsyncCursor(object):
+    _insert_statement = Cursor._insert_statement
+
+    def __init__(self, connection, logger, cursor_type=None, unicode_error=None):
+        self.connection = connection
+        self._logger = logger
+        self.cursor_type = cursor_type
+        self.unicode_error = unicode_error if unicode_error is not None else 'strict'
+        self._closed = False
+        self._message = None
+        self.operation = None
+        self.prepared_sql = None  # last statement been prepared
+        self.prepared_name = None
+
+        #
+        # dbapi properties
+        #
+        self.description = None
+        self.rowcount = -1
+        self.arraysize = 1
+        # affected row count of each parameter set of the last executemany()
+        self.batch_rowcounts = None
+
+        self._column_names = ()
+        self._row_decoder = None
+        self._result_format_codes = None
+        # messages read for this cursor while another cursor took over the connection
+        self._buffer = deque()
+
+    #############################################
+    # supporting `async with` and `async for` statements
+    #############################################
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type_, value, traceback):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        row = await self.fetchone()
+        if row is None:
+            raise StopAsyncIteration
+        return row
+
+    #############################################
+    # dbapi methods
+    #############################################
+    async def close(self):
+        self._logger.info('Close the cursor')
+        if not self.closed():
+            # the prepared statements are kept by the connection
+            await self.flush_to_query_ready()
+        self._buffer.clear()
+        self._closed = True
+
+    def closed(self):
+        return self._closed or self.connection.closed()
+
+    async def cancel(self):
+        """
+        Cancels the query running on this cursor and discards its remaining
+        results, leaving the connection ready for the next query.
+        """
+        if self.closed():
+            raise errors.InterfaceError('Cursor is closed')
+
+        if self.connection._active_cursor is self:
+            # otherwise, the results of this cursor have been fully received
+            await self.connection.cancel()
+        await self.flush_to_query_ready()
+
+    async def execute(self, operation, parameters=None, use_prepared_statements=None):
+        operation = as_text(operation)
+        self.operation = operation
+
+        if self.closed():
+            raise errors.InterfaceError('Cursor is closed')
+
+        await self.flush_to_query_ready()
+        await self.connection._acquire(self)
+
+        self.rowcount = -1
+        self.batch_rowcounts = None
+
+        use_prepared = bool(self.connection.options['use_prepared_statements']
+                if use_prepared_statements is None else use_prepared_statements)
+        if use_prepared:
+            # Execute the SQL as prepared statement (server-side bindings)
+            if parameters and not isinstance(parameters, (list, tuple)):
+                raise TypeError("Execute parameters should be a list/tuple")
+
+            # Prepare the SQL, unless it is in the statement cache
+            await self._prepare(operation)
+            self.prepared_sql = operation
+
+            # Bind the parameters and execute
+            await self._execute_prepared_statement([parameters])
+        else:
+            # Execute the SQL directly (client-side bindings)
+            if parameters:
+                operation = self.format_operation_with_parameters(operation, parameters)
+            await self._execute_simple_query(operation)
+
+        return self
+
+    async def executemany(self, operation, seq_of_parameters, use_prepared_statements=None):
+        operation = as_text(operation)
+        self.operation = operation
+
+        if (isinstance(seq_of_parameters, (string_types, bytes, dict))
+                or not hasattr(seq_of_parameters, '__iter__')):
+            raise TypeError("seq_of_parameters should be an iterable of parameter sets")
+
+        if self.closed():
+            raise errors.InterfaceError('Cursor is closed')
+
+        await self.flush_to_query_ready()
+        await self.connection._acquire(self)
+        self.rowcount = -1
+        self.batch_rowcounts = None
+        use_prepared = bool(self.connection.options['use_prepared_statements']
+                if use_prepared_statements is None else use_prepared_statements)
+
+        if use_prepared:
+            # Execute the SQL as prepared statement (server-side bindings)
+            seq_of_parameters = iter(seq_of_parameters)
+            first = next(seq_of_parameters, _NOTHING)
+            if first is _NOTHING:
+                raise ValueError("seq_of_parameters should not be empty")
+            # Prepare the SQL, unless it is in the statement cache
+            await self._prepare(operation)
+            self.prepared_sql = operation
+
+            # Bind the parameters and execute
+            await self._execute_prepared_batch(chain([first], seq_of_parameters))
+        else:
+            copy_statement, stream = self._insert_as_copy(operation, seq_of_parameters)
+            await self._copy(copy_statement, stream)
+
+    async def fetchone(self):
+        row_data = await self._fetch_data_row()
+        if row_data is None:
+            return None
+        return self.row_formatter(row_data)
+
+    async def fetchmany(self, size=None):
+        if not size:
+            size = self.arraysize
+        results = []
+        while len(results) < size:
+            row = await self.fetchone()
+            if row is None:
+                break
+            results.append(row)
+        return results
+
+    async def fetchall(self):
+        results = []
+        while True:
+            row = await self.fetchone()
+            if row is None:
+                return results
+            results.append(row)
+
+    async def nextset(self):
+        """
+        Skip to the next available result set, discarding any remaining rows
+        from the current result set (see Cursor.nextset).
+        """
+        # skip any data for this set if exists
+        await self.flush_to_end_of_result()
+
+        if self._message is None:
+            return False
+        elif isinstance(self._message, END_OF_RESULT_RESPONSES):
+            # there might be another set, read next message to find out
+            self._message = await self._read_message()
+            if isinstance(self._message, messages.RowDescription):
+                self._set_description(self._message)
+                self._message = await self._read_message()
+                return True
+            elif isinstance(self._message, messages.BindComplete):
+                self._message = await self._read_message()
+                return True
+            elif isinstance(self._message, messages.ReadyForQuery):
+                return False
+            elif isinstance(self._message, END_OF_RESULT_RESPONSES):
+                # result of a DDL/transaction
+                return True
+            elif isinstance(self._message, messages.ErrorResponse):
+                raise errors.QueryError.from_error_response(self._message, self.operation)
+            else:
+                raise errors.MessageError(
+                    'Unexpected nextset() state after END_OF_RESULT_RESPONSES: {0}'.format(self._message))
+        elif isinstance(self._message, messages.ReadyForQuery):
+            # no more sets left to be read
+            return False
+        else:
+            raise errors.MessageError('Unexpected nextset() state: {0}'.format(self._message))
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def setoutputsize(self, size, column=None):
+        pass
+
+    #############################################
+    # non-dbapi methods
+    #############################################
+    async def flush_to_query_ready(self):
+        # if the last message isn't empty or ReadyForQuery, read all remaining messages
+        if self._message is None \
+                or isinstance(self._message, messages.ReadyForQuery):
+            return
+
+        while True:
+            message = await self._read_message()
+            if isinstance(message, messages.ReadyForQuery):
+                self.connection.transaction_status = message.transaction_status
+                self._message = message
+                break
+
+    async def flush_to_end_of_result(self):
+        # if the last message isn't empty or END_OF_RESULT_RESPONSES,
+        # read messages until it is
+        if (self._message is None or
+            isinstance(self._message, messages.ReadyForQuery) or
+            isinstance(self._message, END_OF_RESULT_RESPONSES)):
+            return
+
+        while True:
+            message = await self._read_message()
+            if isinstance(message, END_OF_RESULT_RESPONSES):
+                self._message = message
+                break
+
+    async def copy(self, sql, data, **kwargs):
+        """
+        Runs a COPY ... FROM STDIN statement. data is a string, bytes, a file
+        object, or an async iterable of string or bytes chunks:
+
+        >> async def chunks():
+        >>     yield b'1,a\\n'
+        >>     yield b'2,b\\n'
+        >> await cursor.copy("COPY table(field1,field2) FROM STDIN DELIMITER ','", chunks())
+        """
+        sql = as_text(sql)
+
+        if self.closed():
+            raise errors.InterfaceError('Cursor is closed')
+
+        await self.flush_to_query_ready()
+        await self.connection._acquire(self)
+
+        if isinstance(data, binary_type):
+            stream = BytesIO(data)
+        elif isinstance(data, text_type):
+            stream = StringIO(data)
+        elif isinstance(data, file_type) or hasattr(data, '__aiter__'):
+            stream = data
+        else:
+            raise TypeError("Not valid type of data {0}".format(type(data)))
+
+        await self._copy(sql, stream, **kwargs)
+
+    async def _copy(self, sql, stream, **kwargs):
+        # Executes a COPY FROM STDIN statement, sending the content of stream
+        self._logger.info(u'Execute COPY statement: [{}]'.format(sql))
+        await self.connection.write(messages.Query(sql))
+
+        while True:
+            message = await self._read_message()
+
+            self._message = message
+            if isinstance(message, messages.ErrorResponse):
+                if getattr(stream, 'error', None) is not None:
+                    # the COPY was aborted because the data could not be encoded
+                    await self.flush_to_query_ready()
+                    raise stream.error
+                raise errors.QueryError.from_error_response(message, sql)
+
+            self.connection.process_message(message=message)
+
+            if isinstance(message, messages.ReadyForQuery):
+                break
+            elif isinstance(message, messages.CopyInResponse):
+                if hasattr(stream, '__aiter__'):
+                    async for chunk in stream:
+                        if chunk:
+                            await self.connection.write(
+                                messages.CopyData(chunk, self.unicode_error))
+                else:
+                    await self.connection.write(messages.CopyStream(stream, **kwargs))
+                if getattr(stream, 'error', None) is not None:
+                    await self.connection.write(messages.CopyFail(str(stream.error)))
+                else:
+                    await self.connection.write(messages.CopyDone())
+
+    #############################################
+    # internal
+    #############################################
+    # helpers that do no I/O are shared with Cursor
+    format_operation_with_parameters = Cursor.format_operation_with_parameters
+    _format_parameter = Cursor._format_parameter
+    format_quote = Cursor.format_quote
+    row_formatter = Cursor.row_formatter
+    format_row_as_dict = Cursor.format_row_as_dict
+    format_row_as_array = Cursor.format_row_as_array
+    _set_description = Cursor._set_description
+    _insert_as_copy = Cursor._insert_as_copy
+    _use_statement = Cursor._use_statement
+    _discard_stale_statement = Cursor._discard_stale_statement
+    _batch_bind = Cursor._batch_bind
+    _add_batch_result = Cursor._add_batch_result
+    _end_batch = Cursor._end_batch
+
+    async def _read_message(self):
+        # Returns the next message of this cursor, from its buffer first
+        if self._buffer:
+            return self._buffer.popleft()
+        if self.connection._active_cursor is not self:
+            raise errors.InterfaceError('Cursor has no pending results on the connection')
+        return await self.connection.read_message()
+
+    async def _detach(self):
+        """
+        Reads the rest of the current exchange of this cursor with the server
+        into its buffer, so that another cursor can use the connection (see
+        Cursor._detach).
+        """
+        message = self._buffer[-1] if self._buffer else self._message
+        if message is None or isinstance(message, messages.ReadyForQuery):
+            return
+
+        while not isinstance(message, messages.ReadyForQuery):
+            message = await self.connection.read_message()
+            self._buffer.append(message)
+        self.connection.transaction_status = message.transaction_status
+
+    async def _fetch_data_row(self):
+        # Returns the next DataRow message of the current result set, or None
+        while True:
+            if isinstance(self._message, messages.DataRow):
+                if self.rowcount == -1:
+                    self.rowcount = 1
+                else:
+                    self.rowcount += 1
+                row_data = self._message
+                # fetch next message
+                self._message = await self._read_message()
+                return row_data
+            elif isinstance(self._message, messages.RowDescription):
+                self._set_description(self._message)
+            elif isinstance(self._message, messages.ReadyForQuery):
+                return None
+            elif isinstance(self._message, END_OF_RESULT_RESPONSES):
+                return None
+            elif isinstance(self._message, messages.EmptyQueryResponse):
+                pass
+            elif isinstance(self._message, messages.ErrorResponse):
+                raise errors.QueryError.from_error_response(self._message, self.operation)
+            else:
+                raise errors.MessageError('Unexpected fetchone() state: {}'.format(
+                                    type(self._message).__name__))
+
+            self._message = await self._read_message()
+
+    async def _execute_simple_query(self, query):
+        """
+        Send the query to the server using the simple query protocol.
+        """
+        self._logger.info(u'Execute simple query: [{}]'.format(query))
+
+        # All of the statements in the query are sent here in a single message
+        await self.connection.write(messages.Query(query))
+
+        self._message = await self._read_message()
+        if isinstance(self._message, messages.ErrorResponse):
+            raise errors.QueryError.from_error_response(self._message, query)
+        elif isinstance(self._message, messages.RowDescription):
+            self._set_description(self._message)
+            self._message = await self._read_message()
+            if isinstance(self._message, messages.ErrorResponse):
+                raise errors.QueryError.from_error_response(self._message, query)
+
+    async def _error_handler(self, msg):
+        self._message = msg
+        await self.connection.write(messages.Sync())
+        raise errors.QueryError.from_error_response(msg, self.operation)
+
+    async def _prepare(self, query):
+        """
+        Send the query to be prepared to the server, unless it is in the
+        statement cache of the connection (see Cursor._prepare).
+        """
+        cache = self.connection._statement_cache
+        statement = cache.get(query)
+        if statement is not None:
+            self._use_statement(statement)
+            return
+
+        self._logger.info(u'Prepare a statement: [{}]'.format(query))
+
+        # Close the least recently used statements if the cache is full, in
+        # the same round trip
+        evicted = cache.make_room()
+        for old in evicted:
+            self._logger.info(u'Close the prepared statement {}'.format(old.name))
+            await self.connection.write(messages.Close('prepared_statement', old.name))
+
+        self.prepared_name = cache.next_name()
+        await self.connection.write(messages.Parse(self.prepared_name, query, param_types=()))
+        await self.connection.write(messages.Describe('prepared_statement', self.prepared_name))
+        await self.connection.write(messages.Flush())
+
+        for _ in evicted:
+            await self.connection.read_expected_message(messages.CloseComplete, self._error_handler)
+
+        self._message = await self.connection.read_expected_message(
+            messages.ParseComplete, self._error_handler)
+
+        self._message = await self.connection.read_expected_message(
+            messages.ParameterDescription, self._error_handler)
+        parameters = self._message.parameters
+
+        self._message = await self.connection.read_expected_message(
+            (messages.RowDescription, messages.NoData), self._error_handler)
+        row_description = self._message if isinstance(self._message, messages.RowDescription) else None
+
+        self._message = await self.connection.read_expected_message(
+            messages.CommandDescription, self._error_handler)
+        if len(self._message.command_tag) == 0:
+            msg = 'The statement being prepared is empty'
+            self._logger.error(msg)
+            await self.connection.write(messages.Sync())
+            raise errors.EmptyQueryError(msg)
+
+        statement = PreparedStatement(self.prepared_name, query, parameters, row_description)
+        cache.add(statement)
+        self._use_statement(statement)
+        self._logger.info('Finish preparing the statement')
+
+    async def _execute_prepared_statement(self, list_of_parameter_values):
+        """
+        Bind and execute each set of parameter values of the prepared
+        statement (see Cursor._execute_prepared_statement).
+        """
+        portal_name = ""
+        parameter_type_oids = [metadata['data_type_oid'] for metadata in self._param_metadata]
+        parameter_count = len(self._param_metadata)
+        binary_transfer = self.connection.options['binary_transfer']
+
+        try:
+            if len(list_of_parameter_values) == 0:
+                raise ValueError("Empty list/tuple, nothing to execute")
+            for parameter_values in list_of_parameter_values:
+                if parameter_values is None:
+                    parameter_values = ()
+                self._logger.info(u'Bind parameters: {}'.format(parameter_values))
+                if len(parameter_values) != parameter_count:
+                    msg = ("Invalid number of parameters for {}: {} given, {} expected"
+                           .format(parameter_values, len(parameter_values), parameter_count))
+                    raise ValueError(msg)
+                await self.connection.write(messages.Bind(portal_name, self.prepared_name,
+                                                          parameter_values, parameter_type_oids,
+                                                          self._result_format_codes, binary_transfer))
+                await self.connection.write(messages.Execute(portal_name, 0))
+            await self.connection.write(messages.Sync())
+        except Exception as e:
+            self._logger.error(str(e))
+            # the server will not send anything until we issue a sync
+            await self.connection.write(messages.Sync())
+            self._message = await self._read_message()
+            raise
+
+        await self.connection.write(messages.Flush())
+
+        # Read expected message: BindComplete
+        await self.connection.read_expected_message(messages.BindComplete,
+                                                    self._statement_error_handler)
+
+        self._message = await self._read_message()
+        if isinstance(self._message, messages.ErrorResponse):
+            await self._statement_error_handler(self._message)
+
+    async def _statement_error_handler(self, msg):
+        # The execution of a cached statement failed. The Sync has already
+        # been sent.
+        self._discard_stale_statement(msg)
+        self._message = msg
+        raise errors.QueryError.from_error_response(msg, self.prepared_sql)
+
+    async def _execute_prepared_batch(self, seq_of_parameters):
+        """
+        Executes the prepared statement once per parameter set, pipelined
+        DEFAULT_EXECUTEMANY_WINDOW parameter sets at a time, and collects the
+        affected row counts in batch_rowcounts (see
+        Cursor._execute_prepared_batch).
+        """
+        window = DEFAULT_EXECUTEMANY_WINDOW
+
+        self.batch_rowcounts = []
+        results = []  # messages of the parameter sets whose result is not a row count
+        sent = 0
+        try:
+            for parameter_values in seq_of_parameters:
+                await self.connection.write(self._batch_bind(parameter_values))
+                await self.connection.write(messages.Execute("", 0))
+                sent += 1
+                if sent % window == 0:
+                    await self.connection.write(messages.Flush())
+                    # keep at most two windows in flight
+                    while sent - len(self.batch_rowcounts) > window:
+                        await self._read_batch_result(results)
+        except BaseException as e:
+            # e.g. an invalid parameter set, a failed one, or an error raised
+            # by seq_of_parameters itself: the server will not send anything
+            # until we issue a sync
+            if not isinstance(e, errors.QueryError):
+                self._logger.error(str(e))
+            await self.connection.write(messages.Sync())
+            await self._discard_batch()
+            raise
+
+        await self.connection.write(messages.Sync())
+        try:
+            while len(self.batch_rowcounts) < sent:
+                await self._read_batch_result(results)
+        finally:
+            message = await self._discard_batch()
+        self._end_batch(results, message)
+
+    async def _read_batch_result(self, results):
+        # Reads the response to the next parameter set of _execute_prepared_batch()
+        rows = []
+        message = await self.connection.read_message()
+        while not _batch_response(message, rows):
+            message = await self.connection.read_message()
+        self._add_batch_result(rows, message, results)
+
+    async def _discard_batch(self):
+        # Discards the responses of _execute_prepared_batch() up to ReadyForQuery
+        message = await self.connection.read_message()
+        while not isinstance(message, messages.ReadyForQuery):
+            message = await self.connection.read_message()
+        self.connection.transaction_status = message.transaction_status
+        self._message = message
+        return message
@@ -38,13 +38,15 @@ from __future__ import print_function, division, absolute_import
 
 import re
 from collections import namedtuple
-from datetime import date, datetime
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
+from struct import unpack
 
 import pytz
 # noinspection PyCompatibility,PyUnresolvedReferences
 from builtins import str
 from dateutil import parser
+from dateutil.tz import tzoffset
 
 from .. import errors
 from .. import datatypes
@@ -53,6 +55,9 @@ from ..compat import as_str, as_text
 
 YEARS_RE = re.compile(r"^([0-9]+)-")
 
+FORMAT_TEXT = 0
+FORMAT_BINARY = 1
+
 UTF_8 = 'utf-8'
 
 
@@ -76,6 +81,12 @@ UTF_8 = 'utf-8'
 #       select t AT TIMEZONE 'America/New_York' returns: 2012-12-31 19:00:00.01
 def timestamp_parse(s):
     s = as_str(s)
+    try:
+        return _timestamp_parse_fast(s)
+    except ValueError:
+        # not in the canonical layout, fall back to strptime
+        pass
+
     try:
         dt = _timestamp_parse(s)
     except ValueError:
@@ -91,6 +102,37 @@ def timestamp_parse(s):
     return dt
 
 
+def _timestamp_parse_fast(s, tzinfo=None):
+    # Slices 'YYYY-MM-DD HH:MM:SS[.ffffff]' into integers. Years over 9999 are
+    # truncated to 9999. Raises ValueError for any other layout.
+    ypos = s.find('-')
+    tpos = ypos + 7
+    if ypos < 4 or len(s) < tpos or s[ypos + 3] != '-' or s[tpos - 1] != ' ':
+        raise ValueError(s)
+    year = min(int(s[:ypos]), 9999)
+    hour, minute, second, microsecond = _time_fields(s, tpos)
+    return datetime(year, int(s[ypos + 1:ypos + 3]), int(s[ypos + 4:ypos + 6]),
+                    hour, minute, second, microsecond, tzinfo)
+
+
+def _time_fields(s, pos):
+    # Slices 'HH:MM:SS[.ffffff]' starting at pos into
+    # (hour, minute, second, microsecond). Raises ValueError for any other layout.
+    end = pos + 8
+    if len(s) < end or s[pos + 2] != ':' or s[pos + 5] != ':':
+        raise ValueError(s)
+    microsecond = 0
+    if len(s) > end:
+        fraction = s[end + 1:]
+        if s[end] != '.' or not 0 < len(fraction) <= 6 or not fraction.isdigit():
+            raise ValueError(s)
+        microsecond = int(fraction) * _FRACTION_SCALE[len(fraction)]
+    return int(s[pos:pos + 2]), int(s[pos + 3:pos + 5]), int(s[pos + 6:end]), microsecond
+
+
+_FRACTION_SCALE = (None, 100000, 10000, 1000, 100, 10, 1)
+
+
 def _timestamp_parse(s):
     if len(s) == 19:
         return datetime.strptime(s, '%Y-%m-%d %H:%M:%S')
@@ -105,16 +147,47 @@ def _timestamp_parse_without_year(s):
 
 def timestamp_tz_parse(s):
     s = as_str(s)
-    # if timezone is simply UTC...
-    if s.endswith('+00'):
-        # remove time zone
-        ts = timestamp_parse(s[:-3].encode(encoding=UTF_8, errors='strict'))
-        ts = ts.replace(tzinfo=pytz.UTC)
-        return ts
+    # the UTC offset follows the time, e.g. '2013-01-01 00:00:00.01-05'
+    pos = max(s.rfind('+'), s.rfind('-'))
+    if pos > s.find(' ') > 0:
+        try:
+            tz = _offset_tzinfo(s[pos:])
+        except ValueError:
+            tz = None
+        if tz is not None:
+            try:
+                return _timestamp_parse_fast(s[:pos], tz)
+            except ValueError:
+                return timestamp_parse(s[:pos]).replace(tzinfo=tz)
     # other wise do a real parse (slower)
     return parser.parse(s)
 
 
+# fixed-offset tzinfo objects, keyed by the offset as sent by the server
+_OFFSET_TZINFOS = {'+00': pytz.UTC}
+
+
+def _offset_tzinfo(offset):
+    """
+    Returns a tzinfo for a UTC offset of the form +HH, +HH:MM or +HH:MM:SS.
+    :raises ValueError for any other form
+    """
+    tz = _OFFSET_TZINFOS.get(offset)
+    if tz is not None:
+        return tz
+
+    fields = offset[1:].split(':')
+    if len(fields) > 3 or not all(len(f) == 2 and f.isdigit() for f in fields):
+        raise ValueError('Invalid UTC offset: {0}'.format(offset))
+    seconds = sum(int(f) * unit for f, unit in zip(fields, (3600, 60, 1)))
+    if offset[0] == '-':
+        seconds = -seconds
+
+    tz = pytz.UTC if seconds == 0 else tzoffset(None, seconds)
+    _OFFSET_TZINFOS[offset] = tz
+    return tz
+
+
 def date_parse(s):
     """
     Parses value of a DATE type.
@@ -126,23 +199,88 @@ def date_parse(s):
     if s.endswith(' BC'):
         raise errors.NotSupportedError('Dates Before Christ are not supported. Got: {0}'.format(s))
 
+    ypos = s.find('-')
+    if ypos >= 4 and len(s) == ypos + 6 and s[ypos + 3] == '-':
+        # years over 9999 are truncated to 9999
+        return date(min(int(s[:ypos]), 9999), int(s[ypos + 1:ypos + 3]), int(s[ypos + 4:]))
+
     # Value error, year might be over 9999
     return date(*map(lambda x: min(int(x), 9999), s.split('-')))
 
 
 def time_parse(s):
     s = as_str(s)
+    try:
+        return time(*_time_fields(s, 0))
+    except ValueError:
+        # not in the canonical layout, fall back to strptime
+        pass
     if len(s) == 8:
         return datetime.strptime(s, '%H:%M:%S').time()
     return datetime.strptime(s, '%H:%M:%S.%f').time()
 
 
+# Binary transfer format
+#
+# BOOL is sent as a single byte, INT8 and FLOAT8 as 8-byte big-endian values.
+# Date/time types are sent as 64-bit integers: DATE as days since 2000-01-01,
+# TIME as microseconds since midnight, TIMESTAMP and TIMESTAMPTZ (in UTC) as
+# microseconds since 2000-01-01 00:00:00.
+EPOCH_ORDINAL = date(2000, 1, 1).toordinal()
+MAX_DATE_ORDINAL = date.max.toordinal()
+DAYS_PER_400_YEARS = 146097
+USECS_PER_DAY = 86400000000
+
+
+def _binary_date(days):
+    ordinal = EPOCH_ORDINAL + days
+    if ordinal < 1:
+        raise errors.NotSupportedError('Dates Before Christ are not supported. '
+                                       'Got: {0} days since 2000-01-01'.format(days))
+    if ordinal > MAX_DATE_ORDINAL:
+        # Value error, year might be over 9999: truncate the year to 9999,
+        # the calendar repeats every 400 years
+        cycles = (ordinal - MAX_DATE_ORDINAL - 1) // DAYS_PER_400_YEARS + 1
+        return date.fromordinal(ordinal - cycles * DAYS_PER_400_YEARS).replace(year=9999)
+    return date.fromordinal(ordinal)
+
+
+def binary_bool_parse(s):
+    return s != b'\x00'
+
+
+def binary_int_parse(s):
+    return unpack('!q', s)[0]
+
+
+def binary_float_parse(s):
+    return unpack('!d', s)[0]
+
+
+def binary_date_parse(s):
+    return _binary_date(unpack('!q', s)[0])
+
+
+def binary_time_parse(s):
+    usecs = unpack('!q', s)[0]
+    return (datetime.min + timedelta(microseconds=usecs)).time()
+
+
+def binary_timestamp_parse(s):
+    days, usecs = divmod(unpack('!q', s)[0], USECS_PER_DAY)
+    return datetime.combine(_binary_date(days), time()) + timedelta(microseconds=usecs)
+
+
+def binary_timestamp_tz_parse(s):
+    return binary_timestamp_parse(s).replace(tzinfo=pytz.UTC)
+
+
 ColumnTuple = namedtuple('Column', ['name', 'type_code', 'display_size', 'internal_size',
                                     'precision', 'scale', 'null_ok'])
 
 
 class Column(object):
-    def __init__(self, col, unicode_error=None):
+    def __init__(self, col, unicode_error=None, binary_transfer=False):
         self.name = col['name']
         self.type_code = col['data_type_oid']
         self.type_name = col['data_type_name']
@@ -152,6 +290,7 @@ class Column(object):
         self.scale = datatypes.getScale(col['data_type_oid'], col['type_modifier'])
         self.null_ok = col['null_ok']
         self.is_identity = col['is_identity']
+        self.format_code = col['format_code']
         self.unicode_error = unicode_error
         self.data_type_conversions = Column._data_type_conversions(unicode_error=self.unicode_error)
 
@@ -166,14 +305,21 @@ class Column(object):
         if self.type_code >= len(self.data_type_conversions):
             self.type_code = 0
 
+        # Request the binary transfer format for the types that support it
+        binary_conversions = Column._binary_data_type_conversions()
+        if binary_transfer and self.type_code in binary_conversions:
+            self.format_code = FORMAT_BINARY
+
         # self.converter = self.data_type_conversions[col['data_type_oid']][1]
-        self.converter = self.data_type_conversions[self.type_code][1]
+        if self.format_code == FORMAT_BINARY:
+            self.converter = binary_conversions.get(self.type_code)
+        else:
+            self.converter = self.data_type_conversions[self.type_code][1]
 
         # things that are actually sent
         # self.name = col['name']
         # self.data_type = self.data_type_conversions[col['data_type_oid']][0]
         # self.type_modifier = col['type_modifier']
-        # self.format = 'text' if col['format_code'] == 0 else 'binary'
         # self.table_oid = col['table_oid']
         # self.attribute_number = col['attribute_number']
         # self.size = col['data_type_size']
@@ -205,6 +351,18 @@ class Column(object):
             ('rle_tuple', None),
         ]
 
+    @classmethod
+    def _binary_data_type_conversions(cls):
+        return {
+            5: binary_bool_parse,
+            6: binary_int_parse,
+            7: binary_float_parse,
+            10: binary_date_parse,
+            11: binary_time_parse,
+            12: binary_timestamp_parse,
+            13: binary_timestamp_tz_parse,
+        }
+
     @classmethod
     def data_types(cls):
         return tuple([name for name, value in cls._data_type_conversions()])
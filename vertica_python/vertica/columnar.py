@@ -0,0 +1,267 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Column-oriented buffers for query results
+
+A ColumnBuffer collects the values of one result column directly from DataRow
+messages, without building a Python list per row. BOOL, INT8, FLOAT8 and
+NUMERIC(p<=18, 0) values are stored in typed array buffers together with a NULL
+mask; values of other types are converted by the column's converter and kept in
+a list.
+
+The buffers are turned into NumPy arrays by Cursor.fetchnumpy(), into pandas
+columns by Cursor.fetch_dataframe() and into Arrow arrays by
+Cursor.fetch_arrow_batches().
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from array import array
+from importlib import import_module
+
+from ..datatypes import VerticaType
+from .column import FORMAT_BINARY
+
+
+def _int64_typecode():
+    # 'q' is not available on Python 2, where 'l' is 64-bit on most platforms
+    for typecode in ('q', 'l'):
+        try:
+            if array(typecode).itemsize == 8:
+                return typecode
+        except ValueError:
+            pass
+    raise ImportError('No 64-bit integer array typecode available')
+
+
+# array typecode and NumPy dtype of the column types stored in typed buffers
+TYPED_BUFFERS = {
+    VerticaType.BOOL: ('b', 'bool'),
+    VerticaType.INT8: (_int64_typecode(), 'int64'),
+    VerticaType.FLOAT8: ('d', 'float64'),
+}
+
+# the largest NUMERIC precision whose values always fit in an int64
+MAX_INT64_PRECISION = 18
+
+
+def _typed_buffer(column):
+    """Returns (typecode, dtype, text converter) for a column stored in a typed buffer, or None"""
+    if (column.type_code == VerticaType.NUMERIC and column.scale == 0
+            and column.precision <= MAX_INT64_PRECISION):
+        return TYPED_BUFFERS[VerticaType.INT8] + (int,)
+    typed = TYPED_BUFFERS.get(column.type_code)
+    if typed is None:
+        return None
+    return typed + (column.converter,)
+
+
+# the largest NUMERIC precision that fits in an Arrow decimal128
+MAX_DECIMAL128_PRECISION = 38
+
+BINARY_TYPES = (VerticaType.BINARY, VerticaType.VARBINARY, VerticaType.LONGVARBINARY)
+
+
+def arrow_type(pyarrow, column):
+    """
+    Returns the Arrow type of a result column, derived from its RowDescription
+    field. Types without an Arrow equivalent (INTERVAL, TIMETZ, UUID, ...) are
+    returned as strings in the text format sent by the server.
+    """
+    typed = _typed_buffer(column)
+    if typed is not None:
+        return {'bool': pyarrow.bool_, 'int64': pyarrow.int64, 'float64': pyarrow.float64}[typed[1]]()
+
+    type_code = column.props.type_code
+    if type_code == VerticaType.NUMERIC and column.precision <= MAX_DECIMAL128_PRECISION:
+        return pyarrow.decimal128(column.precision, column.scale)
+    elif type_code == VerticaType.DATE:
+        return pyarrow.date32()
+    elif type_code == VerticaType.TIME:
+        return pyarrow.time64('us')
+    elif type_code == VerticaType.TIMESTAMP:
+        return pyarrow.timestamp('us')
+    elif type_code == VerticaType.TIMESTAMPTZ:
+        return pyarrow.timestamp('us', tz='UTC')
+    elif type_code in BINARY_TYPES:
+        return pyarrow.binary()
+    return pyarrow.string()
+
+
+def arrow_schema(pyarrow, columns):
+    """Returns the Arrow schema of a result set described by columns"""
+    return pyarrow.schema([pyarrow.field(column.name, arrow_type(pyarrow, column),
+                                         nullable=bool(column.null_ok))
+                           for column in columns])
+
+
+def import_optional(module_name, feature):
+    """Imports an optional dependency required by feature"""
+    try:
+        return import_module(module_name)
+    except ImportError:
+        raise ImportError('{0} requires the "{1}" package, which is not installed'
+                          .format(feature, module_name))
+
+
+class ColumnBuffer(object):
+    def __init__(self, column):
+        self.column = column
+        self.null_count = 0
+        typed = _typed_buffer(column)
+        if typed is not None:
+            typecode, self.dtype, self.converter = typed
+            self.values = array(typecode)
+            self.mask = bytearray()
+        else:
+            self.dtype = None
+            self.converter = column.converter
+            self.values = []
+            self.mask = None
+
+        # Binary INT8 and FLOAT8 values are kept in their wire format and
+        # byte-swapped in one step when the array is built
+        self.raw = (column.format_code == FORMAT_BINARY and
+                    column.type_code in (VerticaType.INT8, VerticaType.FLOAT8))
+        if self.raw:
+            self.values = bytearray()
+            self.null_value = b'\x00' * 8
+
+    def __len__(self):
+        if self.mask is not None:
+            return len(self.mask)
+        return len(self.values)
+
+    def append(self, value):
+        """Appends a value as received in a DataRow (bytes, or None for NULL)"""
+        if self.mask is None:
+            self.values.append(value if value is None or self.converter is None
+                               else self.converter(value))
+        elif value is None:
+            self.null_count += 1
+            self.mask.append(1)
+            if self.raw:
+                self.values += self.null_value
+            else:
+                self.values.append(0)
+        else:
+            self.mask.append(0)
+            if self.raw:
+                self.values += value
+            else:
+                self.values.append(self.converter(value))
+
+    def _typed_arrays(self, numpy):
+        # Returns the (values, NULL mask) arrays of a typed buffer
+        if self.raw:
+            # big-endian, as sent by the server
+            wire_dtype = numpy.dtype(self.dtype).newbyteorder('>')
+        else:
+            wire_dtype = numpy.dtype(self.values.typecode)
+        data = numpy.frombuffer(self.values, dtype=wire_dtype).astype(self.dtype, copy=False)
+        mask = numpy.frombuffer(self.mask, dtype=numpy.uint8).astype(bool)
+        return data, mask
+
+    def _object_array(self, numpy):
+        data = numpy.empty(len(self.values), dtype=object)
+        data[:] = self.values
+        return data
+
+    def to_numpy(self, numpy):
+        """
+        Returns the values as a numpy.ndarray. Columns stored in typed buffers
+        are returned as a numpy.ma.MaskedArray if they contain NULLs.
+        """
+        if self.dtype is None:
+            return self._object_array(numpy)
+
+        data, mask = self._typed_arrays(numpy)
+        if self.null_count:
+            return numpy.ma.MaskedArray(data, mask=mask)
+        return data
+
+    def to_pandas(self, pandas, numpy):
+        """
+        Returns the values as an array for a pandas.DataFrame column. The dtype
+        is chosen from the column metadata rather than from the values, so all
+        chunks of a result set get the same dtype:
+          - BOOL, INT8 and NUMERIC(p<=18, 0) use the nullable 'boolean' and
+            'Int64' dtypes if the column is nullable, 'bool' and 'int64' if not
+          - FLOAT8 uses 'float64', with NaN for NULL
+          - TIMESTAMP uses 'datetime64[us]', TIMESTAMPTZ uses a UTC
+            datetime64 dtype if all values are within its range
+          - other types are kept as Python objects, with None for NULL
+        """
+        if self.dtype is None:
+            data = self._object_array(numpy)
+            if self.column.type_code == VerticaType.TIMESTAMP:
+                return data.astype('datetime64[us]')
+            elif self.column.type_code == VerticaType.TIMESTAMPTZ:
+                try:
+                    data = pandas.to_datetime(data, utc=True)
+                except (ValueError, OverflowError):
+                    # out of the datetime64 range
+                    return data
+                return data.as_unit('us') if hasattr(data, 'as_unit') else data
+            return data
+
+        data, mask = self._typed_arrays(numpy)
+        if self.dtype == 'float64':
+            return numpy.where(mask, numpy.nan, data) if self.null_count else data
+        if self.column.null_ok or self.null_count:
+            if self.dtype == 'bool':
+                return pandas.arrays.BooleanArray(data, mask)
+            return pandas.arrays.IntegerArray(data, mask)
+        return data
+
+    def to_arrow(self, pyarrow, numpy, type_=None):
+        """
+        Returns the values as a pyarrow.Array of type type_ (default: the
+        type returned by arrow_type() for the column)
+        """
+        if type_ is None:
+            type_ = arrow_type(pyarrow, self.column)
+        if self.dtype is not None:
+            data, mask = self._typed_arrays(numpy)
+            return pyarrow.array(data, mask=mask if self.null_count else None, type=type_)
+
+        values = self.values
+        if pyarrow.types.is_string(type_) and self.converter is None:
+            errors = self.column.unicode_error or 'strict'
+            values = [None if v is None else v.decode('utf-8', errors) for v in values]
+        elif pyarrow.types.is_string(type_) and self.column.type_code == VerticaType.NUMERIC:
+            values = [None if v is None else str(v) for v in values]
+        return pyarrow.array(values, type=type_)
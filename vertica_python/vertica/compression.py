@@ -0,0 +1,177 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Client-side compression of the input of COPY FROM STDIN
+
+A CompressedStream reads a file-like object in chunks and returns its content
+compressed in the format named by the compression argument of Cursor.copy(),
+so that the COPY statement can load it with the matching keyword (GZIP or
+BZIP). The compression runs in a background thread, a few chunks ahead of the
+reader, so that it overlaps with sending the previous chunks to the server;
+zlib and bz2 release the GIL while they compress.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import bz2
+import re
+import threading
+import zlib
+
+from six import text_type
+from six.moves import queue
+
+from .messages.frontend_messages.copy_stream import DEFAULT_BUFFER_SIZE
+
+UTF_8 = 'utf-8'
+
+# number of compressed chunks kept ahead of the reader
+QUEUE_SIZE = 4
+
+
+def _gzip_compressor():
+    # a gzip member, rather than a raw zlib stream
+    return zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+# compression argument -> (COPY keyword, compressor factory)
+COMPRESSIONS = {
+    'gzip': ('GZIP', _gzip_compressor),
+    'bzip2': ('BZIP', bz2.BZ2Compressor),
+}
+
+RE_FROM_STDIN = re.compile(u"\\bFROM\\s+STDIN\\b(\\s+(GZIP|BZIP|LZO|ZSTD|UNCOMPRESSED)\\b)?",
+                           re.I | re.U)
+
+
+def _compression_keyword(compression):
+    try:
+        return COMPRESSIONS[compression][0]
+    except KeyError:
+        raise ValueError('Unsupported compression: {0!r}, expected one of {1}'.format(
+            compression, ', '.join(sorted(COMPRESSIONS))))
+
+
+def compressed_copy_statement(sql, compression):
+    """
+    Returns the COPY FROM STDIN statement sql loading input compressed with
+    the given compression, adding its keyword after STDIN if it is missing.
+    """
+    keyword = _compression_keyword(compression)
+    m = RE_FROM_STDIN.search(sql)
+    if m is None:
+        raise ValueError('Compression is only supported by COPY ... FROM STDIN statements')
+    if m.group(2) is not None:
+        if m.group(2).upper() != keyword:
+            raise ValueError('The statement loads {0} input, not {1}'.format(
+                m.group(2).upper(), keyword))
+        return sql
+    return u'{0} {1}{2}'.format(sql[:m.end()], keyword, sql[m.end():])
+
+
+class CompressedStream(object):
+    """
+    File-like object returning the content of stream, compressed in a
+    background thread. An exception raised while reading or compressing
+    stream ends the content; it is kept in the error attribute, as well as
+    the error of stream itself if it has one.
+    """
+    def __init__(self, stream, compression, buffer_size=DEFAULT_BUFFER_SIZE,
+                 unicode_error='strict'):
+        _compression_keyword(compression)
+        self._stream = stream
+        self._compressor = COMPRESSIONS[compression][1]()
+        self._buffer_size = buffer_size
+        self._unicode_error = unicode_error
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._closed = threading.Event()
+        self._pending = b''
+        self._done = False
+        self.error = None
+
+        self._thread = threading.Thread(target=self._compress)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _compress(self):
+        try:
+            while not self._closed.is_set():
+                chunk = self._stream.read(self._buffer_size)
+                if not chunk:
+                    break
+                if isinstance(chunk, text_type):
+                    chunk = chunk.encode(UTF_8, self._unicode_error)
+                data = self._compressor.compress(chunk)
+                if data:
+                    self._put(data)
+            self._put(self._compressor.flush())
+            self.error = getattr(self._stream, 'error', None)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._put(None)
+
+    def _put(self, item):
+        # gives up once the reader is closed, so that the thread ends
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def read(self, size=-1):
+        chunks = [self._pending]
+        length = len(self._pending)
+        while (size is None or size < 0 or length < size) and not self._done:
+            data = self._queue.get()
+            if data is None:
+                self._done = True
+                break
+            chunks.append(data)
+            length += len(data)
+        data = b''.join(chunks)
+        if size is None or size < 0:
+            self._pending = b''
+            return data
+        self._pending = data[size:]
+        return data[:size]
+
+    def close(self):
+        """Stops the background thread"""
+        self._closed.set()
+        self._thread.join()
@@ -55,6 +55,8 @@ from ..vertica.cursor import Cursor
 from ..vertica.messages.message import BackendMessage, FrontendMessage
 from ..vertica.messages.frontend_messages import CancelRequest
 from ..vertica.log import VerticaLogging
+from ..vertica.statement_cache import (StatementCache, ExecutionCounter,
+                                       DEFAULT_STATEMENT_CACHE_SIZE)
 
 DEFAULT_HOST = 'localhost'
 DEFAULT_USER = getpass.getuser()
@@ -62,8 +64,15 @@ DEFAULT_PORT = 5433
 DEFAULT_PASSWORD = ''
 DEFAULT_LOG_LEVEL = logging.WARNING
 DEFAULT_LOG_PATH = 'vertica_python.log'
+DEFAULT_READ_BUFFER_SIZE = 65536
+# outgoing messages are sent once this many bytes are buffered
+DEFAULT_WRITE_BUFFER_SIZE = 65536
 ASCII = 'ascii'
 
+# frontend messages the server responds to: the outgoing buffer is sent after them
+SYNC_MESSAGES = (messages.Flush, messages.Sync, messages.Query, messages.CopyDone,
+                 messages.CopyFail, messages.Terminate, messages.Startup, messages.Password)
+
 
 def connect(**kwargs):
     """Opens a new connection to a Vertica database."""
@@ -179,6 +188,8 @@ class Connection(object):
         self.backend_key = None
         self.transaction_status = None
         self.socket = None
+        self._reset_read_buffer()
+        self._write_buffer = bytearray()
 
         options = options or {}
         self.options = {key: value for key, value in options.items() if value is not None}
@@ -206,8 +217,12 @@ class Connection(object):
         self.address_list = _AddressList(self.options['host'], self.options['port'],
                                          self.options.get('backup_server_node', []), self._logger)
 
-        # we only support one cursor per connection
+        # cursors share the connection: the active cursor is the one whose
+        # exchange with the server is in progress (see _acquire)
         self.options.setdefault('unicode_error', None)
+        self._active_cursor = None
+        self._cursor_count = 0
+        # cursor used by commit() and rollback()
         self._cursor = Cursor(self, self._logger, cursor_type=None,
                               unicode_error=self.options['unicode_error'])
 
@@ -216,6 +231,20 @@ class Connection(object):
         self._logger.debug('Connection prepared statements is {}'.format(
                      'enabled' if self.options['use_prepared_statements'] else 'disabled'))
 
+        # number of prepared statements kept on the server for reuse
+        self.options.setdefault('prepared_statement_cache_size', DEFAULT_STATEMENT_CACHE_SIZE)
+        self._statement_cache = StatementCache(self.options['prepared_statement_cache_size'])
+
+        # knob for preparing the statements executed at least this many times
+        # with client-side bindings (disabled by default)
+        self.options.setdefault('prepare_threshold', None)
+        self._execution_counter = ExecutionCounter()
+
+        # knob for receiving prepared statement results in binary format
+        self.options.setdefault('binary_transfer', False)
+        self._logger.debug('Connection binary transfer is {}'.format(
+                     'enabled' if self.options['binary_transfer'] else 'disabled'))
+
         self._logger.info('Connecting as user "{}" to database "{}" on host "{}" with port {}'.format(
                      self.options['user'], self.options['database'],
                      self.options['host'], self.options['port']))
@@ -249,46 +278,87 @@ class Connection(object):
             self.close_socket()
 
     def cancel(self):
+        """
+        Cancels the query running on this connection.
+
+        The CancelRequest is sent on a short-lived side connection to the
+        server this session is attached to, so this can be called from another
+        thread while a query is running. The session stays open: the running
+        query fails with a QueryError and the connection can be used again.
+        """
         if self.closed():
             raise errors.ConnectionError('Connection is closed')
 
-        self.write(CancelRequest(backend_pid=self.backend_pid, backend_key=self.backend_key))
+        host, port = self.socket.getpeername()[:2]
+        self._logger.info('Cancel the running query via host "{0}" on port {1}'.format(host, port))
+        raw_socket = self.create_socket()
+        try:
+            raw_socket.connect((host, port))
+            ssl_options = self.options.get('ssl')
+            if ssl_options:
+                raw_socket = self.enable_ssl(raw_socket, ssl_options)
+            message = CancelRequest(backend_pid=self.backend_pid, backend_key=self.backend_key)
+            self._logger.debug('=> %s', message)
+            raw_socket.sendall(message.get_message())
+            # the server closes the side connection once it has handled the request
+            raw_socket.recv(1)
+        except socket.error as e:
+            self._logger.error('Failed to send the cancel request: {0}'.format(e))
+            raise_from(errors.ConnectionError, e)
+        finally:
+            raw_socket.close()
 
     def commit(self):
         if self.closed():
             raise errors.ConnectionError('Connection is closed')
 
-        cur = self.cursor()
-        cur.execute('COMMIT;')
+        self._cursor.execute('COMMIT;')
 
     def rollback(self):
         if self.closed():
             raise errors.ConnectionError('Connection is closed')
 
-        cur = self.cursor()
-        cur.execute('ROLLBACK;')
+        self._cursor.execute('ROLLBACK;')
 
-    def cursor(self, cursor_type=None):
+    def cursor(self, cursor_type=None, server_side=False):
+        """
+        Returns a new cursor of this connection.
+
+        The cursors of a connection are independent: each one has its own
+        result. Prepared statements are shared through the statement cache of
+        the connection. When a cursor executes a query while
+        another one has not fetched all of its results yet, the remaining
+        results of the other cursor are buffered in memory (or, for a
+        server-side cursor, left on the server) first.
+
+        If server_side is True, queries are executed as prepared statements
+        and their results are kept on the server, and fetched arraysize rows
+        at a time as they are consumed.
+        """
         if self.closed():
             raise errors.ConnectionError('Connection is closed')
 
-        if self._cursor.closed():
-            self._cursor._closed = False
-
-        # let user change type if they want?
-        self._cursor.cursor_type = cursor_type
-        return self._cursor
+        self._cursor_count += 1
+        cursor = Cursor(self, self._logger, cursor_type=cursor_type,
+                        unicode_error=self.options['unicode_error'], server_side=server_side)
+        cursor.portal_name = 'p{0}'.format(self._cursor_count)
+        return cursor
 
     #############################################
     # internal
     #############################################
     def reset_values(self):
         self.parameters = {}
+        self._active_cursor = None
+        # prepared statements do not outlive the session
+        self._statement_cache.clear()
         self.session_id = None
         self.backend_pid = None
         self.backend_key = None
         self.transaction_status = None
         self.socket = None
+        self._reset_read_buffer()
+        self._write_buffer = bytearray()
         self.address_list = _AddressList(self.options['host'], self.options['port'],
                                          self.options.get('backup_server_node', []), self._logger)
 
@@ -426,24 +496,48 @@ class Connection(object):
         return not self.opened()
 
     def write(self, message):
+        """
+        Writes a frontend message. Messages are gathered in an outgoing buffer
+        and sent together, in one sendall() call, when a message the server
+        answers is written (see SYNC_MESSAGES), when the buffer is full, or
+        before waiting for a backend message.
+        """
         if not isinstance(message, FrontendMessage):
             raise TypeError("invalid message: ({0})".format(message))
 
-        sock = self._socket()
         self._logger.debug('=> %s', message)
         try:
             for data in message.fetch_message():
-                try:
-                    sock.sendall(data)
-                except Exception:
-                    self._logger.error("couldn't send message")
-                    raise
+                self._write_buffer += data
+                if len(self._write_buffer) >= DEFAULT_WRITE_BUFFER_SIZE:
+                    self._flush_write_buffer()
+        except Exception as e:
+            self.close_socket()
+            self._logger.error(str(e))
+            raise
 
+        if isinstance(message, SYNC_MESSAGES):
+            self.flush_writes()
+
+    def flush_writes(self):
+        """Sends the buffered frontend messages"""
+        if not self._write_buffer:
+            return
+        try:
+            self._flush_write_buffer()
         except Exception as e:
             self.close_socket()
             self._logger.error(str(e))
             raise
 
+    def _flush_write_buffer(self):
+        try:
+            self._socket().sendall(self._write_buffer)
+        except Exception:
+            self._logger.error("couldn't send message")
+            raise
+        self._write_buffer = bytearray()
+
     def close_socket(self):
         try:
             if self.socket is not None:
@@ -475,8 +569,7 @@ class Connection(object):
     def read_message(self):
         while True:
             try:
-                type_ = self.read_bytes(1)
-                size = unpack('!I', self.read_bytes(4))[0]
+                type_, size = unpack('!cI', self.read_bytes(5))
                 if size < 4:
                     raise errors.MessageError("Bad message size: {0}".format(size))
                 message = BackendMessage.from_type(type_, self.read_bytes(size - 4))
@@ -532,8 +625,21 @@ class Connection(object):
         else:
             raise errors.MessageError("Unhandled message: {0}".format(message))
 
-        # set last message
-        self._cursor._message = message
+    def _acquire(self, cursor):
+        """
+        Gives cursor the use of the connection. Only one cursor at a time can
+        exchange messages with the server: the results still pending for the
+        previous cursor are read into its buffer first.
+        """
+        active = self._active_cursor
+        if active is not None and active is not cursor:
+            active._detach()
+        self._active_cursor = cursor
+
+    def _discard_results(self):
+        # Discards the results pending on the connection
+        if self._active_cursor is not None:
+            self._active_cursor.flush_to_query_ready()
 
     def __str__(self):
         safe_options = {key: value for key, value in self.options.items() if key != 'password'}
@@ -544,14 +650,58 @@ class Connection(object):
             self.backend_key, self.transaction_status, self.socket, safe_options)
         return ''.join([s1, s2])
 
-    def read_bytes(self, n):
-        results = bytes()
-        while len(results) < n:
-            bytes_ = self._socket().recv(n - len(results))
-            if not bytes_:
+    def _reset_read_buffer(self):
+        # Receive buffer shared by all backend messages. Bytes in
+        # [_read_start, _read_end) have been received but not consumed yet.
+        self._read_buffer = bytearray(DEFAULT_READ_BUFFER_SIZE)
+        self._read_view = memoryview(self._read_buffer)
+        self._read_start = 0
+        self._read_end = 0
+
+    def _fill_read_buffer(self, n):
+        """Receives from the socket until at least n unconsumed bytes are buffered"""
+        available = self._read_end - self._read_start
+        if len(self._read_buffer) - self._read_start < n:
+            # Not enough room after the unconsumed bytes: move them to the
+            # front, growing the buffer if a single message exceeds it, or
+            # shrinking it back once such a message has been consumed
+            size = len(self._read_buffer)
+            if size < n:
+                size = max(n, 2 * size)
+            elif size > DEFAULT_READ_BUFFER_SIZE and n <= DEFAULT_READ_BUFFER_SIZE:
+                size = DEFAULT_READ_BUFFER_SIZE
+            if size != len(self._read_buffer):
+                new_buffer = bytearray(size)
+                new_buffer[:available] = self._read_view[self._read_start:self._read_end]
+                self._read_buffer = new_buffer
+                self._read_view = memoryview(self._read_buffer)
+            else:
+                self._read_view[:available] = self._read_view[self._read_start:self._read_end]
+            self._read_start = 0
+            self._read_end = available
+
+        # the server may be waiting for the buffered messages
+        self.flush_writes()
+        sock = self._socket()
+        while self._read_end - self._read_start < n:
+            received = sock.recv_into(self._read_view[self._read_end:])
+            if not received:
                 raise errors.ConnectionError("Connection closed by Vertica")
-            results += bytes_
-        return results
+            self._read_end += received
+
+    def read_bytes(self, n):
+        if self._read_end - self._read_start < n:
+            self._fill_read_buffer(n)
+        start = self._read_start
+        data = self._read_view[start:start + n].tobytes()
+        self._read_start += n
+        if self._read_start == self._read_end:
+            if len(self._read_buffer) > DEFAULT_READ_BUFFER_SIZE:
+                # an oversized message has been consumed
+                self._reset_read_buffer()
+            else:
+                self._read_start = self._read_end = 0
+        return data
 
     def startup_connection(self):
         # This doesn't handle Unicode usernames or passwords
@@ -37,7 +37,14 @@
 from __future__ import print_function, division, absolute_import
 
 import datetime
+import math
+import numbers
+import operator
 import re
+from binascii import hexlify
+from collections import deque
+from itertools import chain, islice
+from decimal import Decimal
 from uuid import UUID
 
 try:
@@ -54,8 +61,13 @@ from six import binary_type, text_type, string_types, BytesIO, StringIO
 
 from .. import errors
 from ..compat import as_text
+from ..datatypes import VerticaType
 from ..vertica import messages
 from ..vertica.column import Column
+from ..vertica.columnar import ColumnBuffer, arrow_schema, import_optional
+from ..vertica.compression import CompressedStream, compressed_copy_statement
+from ..vertica.native import NativeEncoder
+from ..vertica.statement_cache import PreparedStatement, STALE_STATEMENT_SQLSTATES
 
 
 UTF_8 = 'utf-8'
@@ -75,21 +87,361 @@ RE_BASIC_INSERT_STAT = (
     u"\\s*\\(\\s*(?P<variables>{0}(\\s*,\\s*{0})*)\\s*\\)"
     u"\\s+VALUES\\s*\\(\\s*(?P<values>(.|\\s)*)\\s*\\)").format(RE_NAME)
 END_OF_RESULT_RESPONSES = (messages.CommandComplete, messages.PortalSuspended)
+DEFAULT_ARROW_BATCH_SIZE = 65536
+# number of parameter sets of executemany() sent before their responses are read
+DEFAULT_EXECUTEMANY_WINDOW = 1000
+# statements whose result is the number of affected rows
+DML_COMMANDS = ('INSERT', 'UPDATE', 'DELETE', 'MERGE')
+
+# statements that prepare_threshold can turn into prepared statements
+PREPARABLE_COMMANDS = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'MERGE')
+# parameter types bound the same way by the client and the server
+PREPARABLE_VALUE_TYPES = string_types + (bytes, numbers.Number, datetime.date, datetime.time, UUID)
+# string literals, quoted identifiers and comments
+RE_SQL_QUOTED = re.compile(u"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\\*.*?\\*/", re.U | re.S)
+RE_CLIENT_PLACEHOLDER = re.compile(u"%(.)|(?<!:):(\\w+)|(\\?)", re.U | re.S)
+
+
+def _to_prepared_operation(operation, parameters):
+    """
+    Rewrites an operation with the placeholders of client-side bindings
+    (%s for a list/tuple of parameters, :name for a dict) into an operation
+    with the ? placeholders of prepared statements.
+
+    Returns (operation, names), where names are the keys of the parameters in
+    placeholder order (None for a list/tuple), or None if the operation cannot
+    be executed as a single prepared statement with the same meaning.
+    """
+    named = isinstance(parameters, dict)
+    keys = {}
+    if named:
+        keys = dict((as_text(key if isinstance(key, string_types) else str(key)), key)
+                    for key in parameters)
+    names = []
+
+    def substitute(match):
+        percent, name, qmark = match.groups()
+        if qmark:
+            raise ValueError('placeholder of prepared statements')
+        elif percent is not None:
+            if named or not parameters:
+                return match.group(0)
+            elif percent == u's':
+                names.append(None)
+                return u'?'
+            elif percent == u'%':
+                return u'%'
+            raise ValueError('unsupported format')
+        elif named and name in keys:
+            names.append(keys[name])
+            return u'?'
+        return match.group(0)
+
+    parts = []
+    code = []
+    pos = 0
+    try:
+        for match in RE_SQL_QUOTED.finditer(operation):
+            text = operation[pos:match.start()]
+            if match.group(0)[0] == u"'" and text[-1:] in (u'e', u'E'):
+                return None  # escape string literal
+            code.append(RE_CLIENT_PLACEHOLDER.sub(substitute, text))
+            parts.append(code[-1])
+
+            # client-side bindings would substitute the placeholders found here too
+            quoted = match.group(0)
+            if named:
+                if any(re.search(u":{0}\\b".format(re.escape(key)), quoted, re.U) for key in keys):
+                    return None
+            elif parameters:
+                if u'%' in quoted.replace(u'%%', u''):
+                    return None
+                quoted = quoted.replace(u'%%', u'%')
+            parts.append(quoted)
+            pos = match.end()
+        code.append(RE_CLIENT_PLACEHOLDER.sub(substitute, operation[pos:]))
+        parts.append(code[-1])
+    except ValueError:
+        return None
+
+    code = u' '.join(code)
+    words = code.split(None, 1)
+    if u';' in code or not words or words[0].upper() not in PREPARABLE_COMMANDS:
+        return None
+    return u''.join(parts), names
+
+
+MAX_INT8 = 2 ** 63 - 1
+_NOTHING = object()
+
+
+def _parameter_type_oid(value):
+    """
+    Returns the type OID of a parameter value inferred from its Python type,
+    or None if the type cannot be inferred (e.g. for None)
+    """
+    if isinstance(value, bool):
+        return VerticaType.BOOL
+    elif isinstance(value, six.integer_types):
+        return VerticaType.INT8 if -MAX_INT8 <= value <= MAX_INT8 else None
+    elif isinstance(value, float):
+        return VerticaType.FLOAT8
+    elif isinstance(value, Decimal):
+        return VerticaType.NUMERIC
+    elif isinstance(value, string_types):
+        return VerticaType.VARCHAR
+    elif isinstance(value, datetime.datetime):
+        return VerticaType.TIMESTAMP if value.tzinfo is None else VerticaType.TIMESTAMPTZ
+    elif isinstance(value, datetime.date):
+        return VerticaType.DATE
+    elif isinstance(value, datetime.time):
+        return VerticaType.TIME if value.tzinfo is None else None
+    elif isinstance(value, UUID):
+        return VerticaType.UUID
+    return None
+
+
+RE_NAMED_PLACEHOLDER = re.compile(u":(\\w+)", re.U)
+RE_WORD = re.compile(u"\\w+$", re.U)
+RE_EMPTY_STRING = re.compile(u"^$", re.U)
+# operation -> template of client-side bindings with named parameters
+_named_templates = {}
+NAMED_TEMPLATE_CACHE_SIZE = 512
+
+
+def _named_template(operation):
+    """
+    Returns the operation split at its :name placeholders, as (texts, names)
+    with len(texts) == len(names) + 1. The result is cached, so an operation
+    is only tokenized once.
+    """
+    template = _named_templates.get(operation)
+    if template is None:
+        pieces = RE_NAMED_PLACEHOLDER.split(operation)
+        template = (pieces[0::2], pieces[1::2])
+        if len(_named_templates) >= NAMED_TEMPLATE_CACHE_SIZE:
+            _named_templates.clear()
+        _named_templates[operation] = template
+    return template
+
+
+def _copy_value(param):
+    # Returns a parameter of executemany() in the COPY input format: enclosed
+    # by double quotes, with the default escape character (backslash), which
+    # also keeps embedded line breaks from ending the record
+    if param is None:
+        return u''
+    elif isinstance(param, (string_types, bytes)):
+        text = as_text(param)
+    elif isinstance(param, (datetime.datetime, datetime.date, datetime.time, UUID)):
+        text = as_text(str(param))
+    else:
+        return as_text(str(param))
+    text = text.replace(u'\\', u'\\\\').replace(u'"', u'\\"')
+    return u'"' + text.replace(u'\n', u'\\\n').replace(u'\r', u'\\\r') + u'"'
+
+
+def _copy_lines(values, seq_of_parameters):
+    """
+    Yields the lines of COPY input of executemany() for a simple INSERT, one
+    per parameter set. values is the VALUES list of the INSERT, which is
+    formatted like the operation of client-side bindings.
+    """
+    count = values.count(u'%s')
+    # plain list of %s placeholders
+    positional = values == u','.join([u'%s'] * count)
+    for parameters in seq_of_parameters:
+        if isinstance(parameters, dict):
+            mapping = dict((as_text(key if isinstance(key, string_types) else str(key)),
+                            _copy_value(param)) for key, param in six.iteritems(parameters))
+            texts, names = _named_template(values)
+            parts = [texts[0]]
+            for name, text in zip(names, texts[1:]):
+                parts.append(mapping.get(name, u':' + name))
+                parts.append(text)
+            line = u''.join(parts)
+        elif isinstance(parameters, (list, tuple)):
+            if positional and len(parameters) == count:
+                line = u','.join([_copy_value(param) for param in parameters])
+            else:
+                line = values % tuple(_copy_value(param) for param in parameters)
+        else:
+            raise TypeError("Argument 'parameters' must be dict or tuple/list")
+        yield line + u'\n'
+
+
+# number of rows of copy_rows() looked at to pick the encoders of the columns
+COPY_ROWS_SAMPLE_SIZE = 100
+
+if six.PY2:
+    COPY_BINARY_TYPES = (bytearray, memoryview)
+else:
+    COPY_BINARY_TYPES = (bytes, bytearray, memoryview)
+COPY_BINARY_TYPE_OIDS = (VerticaType.BINARY, VerticaType.VARBINARY, VerticaType.LONGVARBINARY)
+
+
+def _copy_bool(value):
+    return u't' if value else u'f'
+
+
+def _copy_int(value):
+    return str(operator.index(value))
+
+
+def _copy_float(value):
+    value = float(value)
+    if math.isnan(value):
+        return u'NaN'
+    elif math.isinf(value):
+        return u'Infinity' if value > 0 else u'-Infinity'
+    return u'{0!r}'.format(value)
+
+
+def _copy_decimal(value):
+    return u'{0:f}'.format(value)
+
+
+def _copy_datetime(value):
+    return as_text(value.isoformat(' '))
+
+
+def _copy_isoformat(value):
+    return as_text(value.isoformat())
+
+
+def _copy_number(value):
+    # the values of a numeric column can mix int, float and Decimal
+    if isinstance(value, float):
+        return _copy_float(value)
+    elif isinstance(value, Decimal):
+        return _copy_decimal(value)
+    return _copy_int(value)
+
+
+def _copy_binary(value):
+    # loaded with FORMAT 'hex'
+    return hexlify(value).decode('ascii')
+
+
+def _copy_any(value):
+    # encodes the values of a column whose type is unknown, not binary
+    encode = _copy_encoder(value)
+    return _copy_value(value) if encode is _copy_binary else encode(value)
+
+
+def _copy_encoder(value):
+    """
+    Returns the function encoding the values of a column of copy_rows() in
+    the COPY input format, picked from the type of a value of the column.
+    """
+    if isinstance(value, bool):
+        return _copy_bool
+    elif isinstance(value, (numbers.Integral, float, Decimal)):
+        return _copy_number
+    elif isinstance(value, datetime.datetime):
+        return _copy_datetime
+    elif isinstance(value, (datetime.date, datetime.time)):
+        return _copy_isoformat
+    elif isinstance(value, COPY_BINARY_TYPES):
+        return _copy_binary
+    return _copy_value
+
+
+def _copy_rows_lines(encoders, rows):
+    # Yields the lines of COPY input of copy_rows(), one per row
+    count = len(encoders)
+    for row in rows:
+        if len(row) != count:
+            raise ValueError("Invalid number of values for {}: {} given, {} expected"
+                             .format(row, len(row), count))
+        yield u','.join([u'' if value is None else encode(value)
+                         for encode, value in zip(encoders, row)]) + u'\n'
+
+
+class _IterStream(object):
+    """
+    File-like object whose content is the text (or bytes, if binary is True)
+    produced by an iterable, which is consumed as the object is read. An
+    exception raised by the iterable ends the content; it is kept in the error
+    attribute.
+    """
+    def __init__(self, iterable, binary=False):
+        self._iterator = iter(iterable)
+        self._pending = b'' if binary else u''
+        self.error = None
+
+    def read(self, size=-1):
+        chunks = [self._pending]
+        length = len(self._pending)
+        while (size is None or size < 0 or length < size) and self.error is None:
+            try:
+                chunk = next(self._iterator)
+            except StopIteration:
+                break
+            except Exception as e:
+                self.error = e
+                break
+            chunks.append(chunk)
+            length += len(chunk)
+        data = self._pending[:0].join(chunks)
+        if size is None or size < 0:
+            self._pending = data[:0]
+            return data
+        self._pending = data[size:]
+        return data[:size]
+
+
+def _batch_response(message, rows):
+    # Returns True if message ends the response to a parameter set,
+    # collects it in rows if it is a DataRow
+    if isinstance(message, (messages.CommandComplete, messages.EmptyQueryResponse,
+                            messages.ErrorResponse)):
+        return True
+    if isinstance(message, messages.DataRow):
+        rows.append(message)
+    elif not isinstance(message, messages.BindComplete):
+        raise errors.MessageError('Unexpected executemany() response: {}'.format(
+            type(message).__name__))
+    return False
+
+
+def _make_row_decoder(columns):
+    """
+    Returns a function that converts a DataRow into a list of Python values.
+
+    The converters are looked up once per result set; columns without a
+    converter are returned as received and skipped by the conversion loop.
+    """
+    conversions = tuple((idx, column.converter) for idx, column in enumerate(columns)
+                        if column.converter is not None)
+
+    def decode(row_data):
+        values = row_data.values
+        for idx, converter in conversions:
+            value = values[idx]
+            if value is not None:
+                values[idx] = converter(value)
+        return values
+
+    return decode
+
 
 class Cursor(object):
     # NOTE: this is used in executemany and is here for pandas compatibility
     _insert_statement = re.compile(RE_BASIC_INSERT_STAT, re.U | re.I)
 
-    def __init__(self, connection, logger, cursor_type=None, unicode_error=None):
+    def __init__(self, connection, logger, cursor_type=None, unicode_error=None, server_side=False):
         self.connection = connection
         self._logger = logger
         self.cursor_type = cursor_type
+        self.server_side = server_side
         self.unicode_error = unicode_error if unicode_error is not None else 'strict'
         self._closed = False
         self._message = None
         self.operation = None
         self.prepared_sql = None  # last statement been prepared
         self.prepared_name = "s0"
+        self.portal_name = "p0"
         self.error = None
 
         #
@@ -98,6 +450,16 @@ class Cursor(object):
         self.description = None
         self.rowcount = -1
         self.arraysize = 1
+        # affected row count of each parameter set of the last executemany()
+        self.batch_rowcounts = None
+
+        self._column_names = ()
+        self._row_decoder = None
+        self._result_format_codes = None
+        self._portal_open = False  # a server-side cursor portal has not been run to completion
+        self._portal_rows_left = 0  # rows still expected from the last Execute of the portal
+        # messages read for this cursor while another cursor took over the connection
+        self._buffer = deque()
 
     #############################################
     # supporting `with` statements
@@ -118,14 +480,26 @@ class Cursor(object):
     def close(self):
         self._logger.info('Close the cursor')
         if not self.closed():
-            self._close_prepared_statement()
+            # the prepared statements are kept by the connection
+            self.flush_to_query_ready()
+        self._buffer.clear()
         self._closed = True
 
     def cancel(self):
+        """
+        Cancels the query running on this cursor and discards its remaining
+        results, leaving the connection ready for the next query.
+
+        To cancel a query from another thread than the one executing it, use
+        Connection.cancel() instead.
+        """
         if self.closed():
             raise errors.InterfaceError('Cursor is closed')
 
-        self.connection.close()
+        if self.connection._active_cursor is self:
+            # otherwise, the results of this cursor have been fully received
+            self.connection.cancel()
+        self.flush_to_query_ready()
 
     def execute(self, operation, parameters=None, use_prepared_statements=None):
         operation = as_text(operation)
@@ -135,23 +509,35 @@ class Cursor(object):
             raise errors.InterfaceError('Cursor is closed')
 
         self.flush_to_query_ready()
+        self.connection._acquire(self)
 
         self.rowcount = -1
+        self.batch_rowcounts = None
 
         use_prepared = bool(self.connection.options['use_prepared_statements']
                 if use_prepared_statements is None else use_prepared_statements)
-        if use_prepared:
+        if (use_prepared_statements is None and not use_prepared and not self.server_side
+                and self.connection.options['prepare_threshold'] is not None):
+            if self._execute_hot_statement(operation, parameters):
+                return self
+
+        if use_prepared or self.server_side:
             # Execute the SQL as prepared statement (server-side bindings)
             if parameters and not isinstance(parameters, (list, tuple)):
                 raise TypeError("Execute parameters should be a list/tuple")
 
-            # If the SQL has not been prepared, prepare the SQL
-            if operation != self.prepared_sql:
-                self._prepare(operation)
-                self.prepared_sql = operation # the prepared statement is kept
+            if not self.server_side and self._prepare_and_execute(operation, parameters):
+                return self
+
+            # Prepare the SQL, unless it is in the statement cache
+            self._prepare(operation)
+            self.prepared_sql = operation
 
             # Bind the parameters and execute
-            self._execute_prepared_statement([parameters])
+            if self.server_side:
+                self._execute_portal(parameters)
+            else:
+                self._execute_prepared_statement([parameters])
         else:
             # Execute the SQL directly (client-side bindings)
             if parameters:
@@ -161,84 +547,86 @@ class Cursor(object):
         return self
 
     def executemany(self, operation, seq_of_parameters, use_prepared_statements=None):
+        """
+        Executes operation once per parameter set of seq_of_parameters.
+
+        With prepared statements, the parameter sets are pipelined (see
+        _execute_prepared_batch()). The result of each parameter set of an
+        INSERT, UPDATE, DELETE or MERGE is its affected row count, which is
+        collected in batch_rowcounts instead of being kept as a result set:
+        unlike in previous versions, fetch*() and nextset() do not return
+        these counts. The results of other statements are fetched one
+        parameter set at a time with nextset().
+
+        Without prepared statements, only simple INSERT statements are
+        supported: they are run as a COPY statement.
+        """
         operation = as_text(operation)
         self.operation = operation
 
-        if not isinstance(seq_of_parameters, (list, tuple)):
-            raise TypeError("seq_of_parameters should be list/tuple")
+        if (isinstance(seq_of_parameters, (string_types, bytes, dict))
+                or not hasattr(seq_of_parameters, '__iter__')):
+            raise TypeError("seq_of_parameters should be an iterable of parameter sets")
 
         if self.closed():
             raise errors.InterfaceError('Cursor is closed')
 
         self.flush_to_query_ready()
+        self.connection._acquire(self)
+        self.rowcount = -1
+        self.batch_rowcounts = None
         use_prepared = bool(self.connection.options['use_prepared_statements']
                 if use_prepared_statements is None else use_prepared_statements)
 
         if use_prepared:
             # Execute the SQL as prepared statement (server-side bindings)
-            if len(seq_of_parameters) == 0:
+            seq_of_parameters = iter(seq_of_parameters)
+            first = next(seq_of_parameters, _NOTHING)
+            if first is _NOTHING:
                 raise ValueError("seq_of_parameters should not be empty")
-            if not all(isinstance(elem, (list, tuple)) for elem in seq_of_parameters):
-                raise TypeError("Each seq_of_parameters element should be a list/tuple")
-            # If the SQL has not been prepared, prepare the SQL
-            if operation != self.prepared_sql:
-                self._prepare(operation)
-                self.prepared_sql = operation # the prepared statement is kept
+            # Prepare the SQL, unless it is in the statement cache
+            self._prepare(operation)
+            self.prepared_sql = operation
 
             # Bind the parameters and execute
-            self._execute_prepared_statement(seq_of_parameters)
+            self._execute_prepared_batch(chain([first], seq_of_parameters))
         else:
-            m = self._insert_statement.match(operation)
-            if m:
-                target = as_text(m.group('target'))
+            copy_statement, stream = self._insert_as_copy(operation, seq_of_parameters)
+            self._copy(copy_statement, stream)
 
-                variables = as_text(m.group('variables'))
-                variables = ",".join([variable.strip().strip('"') for variable in variables.split(",")])
+    def _insert_as_copy(self, operation, seq_of_parameters):
+        """
+        Returns the COPY statement and the input stream that executemany()
+        runs for a simple INSERT statement without prepared statements. The
+        parameter sets are encoded as the stream is read.
+        """
+        m = self._insert_statement.match(operation)
+        if not m:
+            raise NotImplementedError(
+                "executemany is implemented for simple INSERT statements only")
 
-                values = as_text(m.group('values'))
-                values = ",".join([value.strip().strip('"') for value in values.split(",")])
-                seq_of_values = [self.format_operation_with_parameters(values, parameters, is_csv=True)
-                                 for parameters in seq_of_parameters]
-                data = "\n".join(seq_of_values)
+        target = as_text(m.group('target'))
 
-                copy_autocommit = self.connection.parameters.get('auto_commit', 'on')
+        variables = as_text(m.group('variables'))
+        variables = ",".join([variable.strip().strip('"') for variable in variables.split(",")])
 
-                copy_statement = (
-                    u"COPY {0} ({1}) FROM STDIN DELIMITER ',' ENCLOSED BY '\"' "
-                    u"ENFORCELENGTH ABORT ON ERROR{2}").format(target, variables,
-                    " NO COMMIT" if copy_autocommit == 'off' else '')
+        values = as_text(m.group('values'))
+        values = ",".join([value.strip().strip('"') for value in values.split(",")])
+        stream = _IterStream(_copy_lines(values, seq_of_parameters))
 
-                self.copy(copy_statement, data)
-            else:
-                raise NotImplementedError(
-                    "executemany is implemented for simple INSERT statements only")
+        copy_autocommit = self.connection.parameters.get('auto_commit', 'on')
 
-    def fetchone(self):
-        while True:
-            if isinstance(self._message, messages.DataRow):
-                if self.rowcount == -1:
-                    self.rowcount = 1
-                else:
-                    self.rowcount += 1
-                row = self.row_formatter(self._message)
-                # fetch next message
-                self._message = self.connection.read_message()
-                return row
-            elif isinstance(self._message, messages.RowDescription):
-                self.description = [Column(fd, self.unicode_error) for fd in self._message.fields]
-            elif isinstance(self._message, messages.ReadyForQuery):
-                return None
-            elif isinstance(self._message, END_OF_RESULT_RESPONSES):
-                return None
-            elif isinstance(self._message, messages.EmptyQueryResponse):
-                pass
-            elif isinstance(self._message, messages.ErrorResponse):
-                raise errors.QueryError.from_error_response(self._message, self.operation)
-            else:
-                raise errors.MessageError('Unexpected fetchone() state: {}'.format(
-                                    type(self._message).__name__))
+        copy_statement = (
+            u"COPY {0} ({1}) FROM STDIN DELIMITER ',' ENCLOSED BY '\"' "
+            u"ENFORCELENGTH ABORT ON ERROR{2}").format(target, variables,
+            " NO COMMIT" if copy_autocommit == 'off' else '')
+        return copy_statement, stream
 
-            self._message = self.connection.read_message()
+    def fetchone(self):
+        row_data = self._fetch_data_row()
+        if row_data is None:
+            return None
+        return self.row_formatter(row_data)
 
     def iterate(self):
         row = self.fetchone()
@@ -262,6 +650,75 @@ class Cursor(object):
     def fetchall(self):
         return list(self.iterate())
 
+    def fetchnumpy(self):
+        """
+        Fetches all remaining rows of the current result set as NumPy arrays.
+
+        Returns an OrderedDict that maps each column name to a numpy.ndarray.
+        BOOLEAN, INTEGER, FLOAT and NUMERIC(p<=18, 0) columns are filled
+        directly from the received rows into arrays of dtype bool, int64 and
+        float64; such a column is returned as a numpy.ma.MaskedArray if it
+        contains NULLs.
+        Other columns are returned as arrays of objects, with None for NULL.
+        """
+        numpy = import_optional('numpy', 'Cursor.fetchnumpy()')
+        buffers = self._fetch_column_buffers()
+        return OrderedDict((buf.column.name, buf.to_numpy(numpy)) for buf in buffers)
+
+    def fetch_dataframe(self, chunk_size=None):
+        """
+        Fetches rows of the current result set into a pandas.DataFrame.
+
+        The DataFrame is built column by column from the received rows, with
+        dtypes chosen from the column metadata (see ColumnBuffer.to_pandas).
+        If chunk_size is given, at most chunk_size rows are fetched and an
+        empty DataFrame is returned once the result set is exhausted, so a
+        large result can be streamed chunk by chunk:
+
+        >> df = cursor.fetch_dataframe(chunk_size=100000)
+        >> while len(df):
+        >>     process(df)
+        >>     df = cursor.fetch_dataframe(chunk_size=100000)
+        """
+        pandas = import_optional('pandas', 'Cursor.fetch_dataframe()')
+        numpy = import_optional('numpy', 'Cursor.fetch_dataframe()')
+        buffers = self._fetch_column_buffers(chunk_size)
+        frame = pandas.DataFrame(OrderedDict(
+            (idx, buf.to_pandas(pandas, numpy)) for idx, buf in enumerate(buffers)))
+        # column names are not necessarily unique
+        frame.columns = [buf.column.name for buf in buffers]
+        return frame
+
+    def fetch_arrow_batches(self, batch_size=DEFAULT_ARROW_BATCH_SIZE):
+        """
+        Returns a generator of pyarrow.RecordBatch objects holding the
+        remaining rows of the current result set, at most batch_size rows each.
+
+        The schema of the batches is derived from the RowDescription of the
+        result set (see columnar.arrow_type), so all batches share the same
+        schema. The batches are built column by column from the received rows.
+
+        >> writer = None
+        >> for batch in cursor.fetch_arrow_batches(100000):
+        >>     if writer is None:
+        >>         writer = pyarrow.parquet.ParquetWriter(path, batch.schema)
+        >>     writer.write_batch(batch)
+        """
+        if batch_size < 1:
+            raise ValueError('batch_size must be a positive integer')
+        pyarrow = import_optional('pyarrow', 'Cursor.fetch_arrow_batches()')
+        numpy = import_optional('numpy', 'Cursor.fetch_arrow_batches()')
+        schema = None
+        while True:
+            buffers = self._fetch_column_buffers(batch_size)
+            if not buffers or not len(buffers[0]):
+                return
+            if schema is None:
+                schema = arrow_schema(pyarrow, self.description)
+            yield pyarrow.RecordBatch.from_arrays(
+                [buf.to_arrow(pyarrow, numpy, field.type) for buf, field in zip(buffers, schema)],
+                schema=schema)
+
     def nextset(self):
         """
         Skip to the next available result set, discarding any remaining rows
@@ -278,13 +735,16 @@ class Cursor(object):
             return False
         elif isinstance(self._message, END_OF_RESULT_RESPONSES):
             # there might be another set, read next message to find out
-            self._message = self.connection.read_message()
+            self._message = self._read_message()
+            if isinstance(self._message, messages.CloseComplete):
+                # the portal of a server-side cursor has been closed
+                self._message = self._read_message()
             if isinstance(self._message, messages.RowDescription):
-                self.description = [Column(fd, self.unicode_error) for fd in self._message.fields]
-                self._message = self.connection.read_message()
+                self._set_description(self._message)
+                self._message = self._read_message()
                 return True
             elif isinstance(self._message, messages.BindComplete):
-                self._message = self.connection.read_message()
+                self._message = self._read_message()
                 return True
             elif isinstance(self._message, messages.ReadyForQuery):
                 return False
@@ -317,14 +777,23 @@ class Cursor(object):
                 or isinstance(self._message, messages.ReadyForQuery):
             return
 
+        if self._portal_open:
+            # discard the remaining rows of a server-side cursor
+            self._close_portal()
+
         while True:
-            message = self.connection.read_message()
+            message = self._read_message()
             if isinstance(message, messages.ReadyForQuery):
                 self.connection.transaction_status = message.transaction_status
                 self._message = message
                 break
 
     def flush_to_end_of_result(self):
+        if self._portal_open:
+            # a server-side cursor has a single result set
+            self.flush_to_query_ready()
+            return
+
         # if the last message isn't empty or END_OF_RESULT_RESPONSES,
         # read messages until it is
         if (self._message is None or
@@ -333,7 +802,7 @@ class Cursor(object):
             return
 
         while True:
-            message = self.connection.read_message()
+            message = self._read_message()
             if isinstance(message, END_OF_RESULT_RESPONSES):
                 self._message = message
                 break
@@ -346,6 +815,11 @@ class Cursor(object):
         >>     cursor.copy("COPY table(field1,field2) FROM STDIN DELIMITER ',' ENCLOSED BY ''''",
         >>                 fs, buffer_size=65536)
 
+        With compression='gzip' or 'bzip2', the data is compressed in a
+        background thread while it is sent, and the statement loads it with
+        the GZIP or BZIP keyword, which is added after STDIN if missing:
+        >> cursor.copy("COPY table FROM STDIN DELIMITER ','", fs, compression='gzip')
+
         """
         sql = as_text(sql)
 
@@ -353,6 +827,7 @@ class Cursor(object):
             raise errors.InterfaceError('Cursor is closed')
 
         self.flush_to_query_ready()
+        self.connection._acquire(self)
 
         if isinstance(data, binary_type):
             stream = BytesIO(data)
@@ -363,26 +838,120 @@ class Cursor(object):
         else:
             raise TypeError("Not valid type of data {0}".format(type(data)))
 
-        self._logger.info(u'Execute COPY statement: [{}]'.format(sql))
-        self.connection.write(messages.Query(sql))
+        self._copy(sql, stream, **kwargs)
 
-        while True:
-            message = self.connection.read_message()
+    def copy_rows(self, table, columns, rows, native=False, **kwargs):
+        """
+        Loads rows into the given columns of a table with a COPY statement.
 
-            self._message = message
-            if isinstance(message, messages.ErrorResponse):
-                raise errors.QueryError.from_error_response(message, sql)
+        rows can be any iterable of tuples/lists, such as a generator: the
+        rows are encoded as the COPY reads them. The values of a column are
+        encoded according to their Python type (None is loaded as NULL),
+        which is picked from the first rows; int, float and Decimal values
+        can be mixed in a column. bytes are loaded into binary columns. The
+        types of the columns that are NULL in all the first rows are looked
+        up first.
 
-            self.connection.process_message(message=message)
+        If native is True, the rows are encoded in the NATIVE binary format
+        according to the types of the columns of the table, which are looked
+        up first, so that the server does not parse them. Naive datetimes are
+        loaded into TIMESTAMPTZ columns as UTC.
 
-            if isinstance(message, messages.ReadyForQuery):
-                break
-            elif isinstance(message, messages.CopyInResponse):
-                self.connection.write(messages.CopyStream(stream, **kwargs))
-                self.connection.write(messages.CopyDone())
+        The keyword arguments of copy(), such as compression, are accepted.
+
+        EXAMPLE:
+        >> cursor.copy_rows("tbl", ["a", "b"], ((i, str(i)) for i in range(1000000)))
+        """
+        table = as_text(table)
+        columns = [as_text(column) for column in columns]
 
-        if self.error is not None:
-            raise self.error
+        if self.closed():
+            raise errors.InterfaceError('Cursor is closed')
+
+        if native:
+            # the RowDescription of the target columns drives the encoding
+            encoder = NativeEncoder(self._describe_columns(table, columns))
+        else:
+            rows = iter(rows)
+            sample = list(islice(rows, COPY_ROWS_SAMPLE_SIZE))
+            encoders = []
+            for index in range(len(columns)):
+                values = (row[index] for row in sample
+                          if len(row) > index and row[index] is not None)
+                value = next(values, None)
+                encoders.append(None if value is None else _copy_encoder(value))
+            if None in encoders:
+                # binary columns need FORMAT 'hex', whatever their values are
+                description = self._describe_columns(table, columns)
+                encoders = [
+                    encoder or (_copy_binary if column.type_code in COPY_BINARY_TYPE_OIDS
+                                else _copy_any)
+                    for encoder, column in zip(encoders, description)]
+
+        self.flush_to_query_ready()
+        self.connection._acquire(self)
+
+        copy_autocommit = self.connection.parameters.get('auto_commit', 'on')
+        no_commit = " NO COMMIT" if copy_autocommit == 'off' else ''
+
+        if native:
+            sql = u"COPY {0} ({1}) FROM STDIN NATIVE ABORT ON ERROR{2}".format(
+                table, u','.join(columns), no_commit)
+            stream = _IterStream(encoder.encode(rows), binary=True)
+            self._copy(sql, stream, **kwargs)
+            return
+
+        column_list = u','.join([
+            column + u" FORMAT 'hex'" if encoder is _copy_binary else column
+            for column, encoder in zip(columns, encoders)])
+        sql = (u"COPY {0} ({1}) FROM STDIN DELIMITER ',' ENCLOSED BY '\"' "
+               u"ENFORCELENGTH ABORT ON ERROR{2}").format(table, column_list, no_commit)
+
+        stream = _IterStream(_copy_rows_lines(encoders, chain(sample, rows)))
+        self._copy(sql, stream, **kwargs)
+
+    def _describe_columns(self, table, columns):
+        # Returns the description of the given columns of a table
+        self.execute(u"SELECT {0} FROM {1} LIMIT 0".format(u','.join(columns), table),
+                     use_prepared_statements=False)
+        return self.description
+
+    def _copy(self, sql, stream, compression=None, **kwargs):
+        # Executes a COPY FROM STDIN statement, sending the content of stream
+        if compression is not None:
+            sql = compressed_copy_statement(sql, compression)
+            stream = CompressedStream(stream, compression, **kwargs)
+        try:
+            self._logger.info(u'Execute COPY statement: [{}]'.format(sql))
+            self.connection.write(messages.Query(sql))
+
+            while True:
+                message = self._read_message()
+
+                self._message = message
+                if isinstance(message, messages.ErrorResponse):
+                    if getattr(stream, 'error', None) is not None:
+                        # the COPY was aborted because the data could not be encoded
+                        self.flush_to_query_ready()
+                        raise stream.error
+                    raise errors.QueryError.from_error_response(message, sql)
+
+                self.connection.process_message(message=message)
+
+                if isinstance(message, messages.ReadyForQuery):
+                    break
+                elif isinstance(message, messages.CopyInResponse):
+                    self.connection.write(messages.CopyStream(stream, **kwargs))
+                    if getattr(stream, 'error', None) is not None:
+                        self.connection.write(messages.CopyFail(str(stream.error)))
+                    else:
+                        self.connection.write(messages.CopyDone())
+
+            if self.error is not None:
+                raise self.error
+        finally:
+            if compression is not None:
+                stream.close()
 
     def closed(self):
         return self._closed or self.connection.closed()
@@ -390,6 +959,145 @@ class Cursor(object):
     #############################################
     # internal
     #############################################
+    def _read_message(self):
+        # Returns the next message of this cursor, from its buffer first
+        if self._buffer:
+            return self._buffer.popleft()
+        if self.connection._active_cursor is not self:
+            raise errors.InterfaceError('Cursor has no pending results on the connection')
+        return self.connection.read_message()
+
+    def _detach(self):
+        """
+        Reads the rest of the current exchange of this cursor with the server
+        into its buffer, so that another cursor can use the connection. The
+        buffered results are then fetched as if they were read from the
+        connection.
+
+        The portal of a server-side cursor is kept open if the session is not
+        in autocommit mode: only the rows requested by the last Execute are
+        buffered, and the portal is resumed later, once this cursor takes the
+        connection back. In autocommit mode, the Sync that ends the exchange
+        also ends the transaction, which closes the portal: its remaining rows
+        are all fetched into the buffer first.
+        """
+        message = self._buffer[-1] if self._buffer else self._message
+        if message is None or isinstance(message, messages.ReadyForQuery):
+            return
+
+        if self._portal_open:
+            while not isinstance(message, (messages.PortalSuspended, messages.CommandComplete,
+                                           messages.ErrorResponse)):
+                message = self.connection.read_message()
+                self._buffer.append(message)
+
+            # rows read from the connection but not fetched yet
+            pending = sum(1 for m in self._buffer if isinstance(m, messages.DataRow))
+            if isinstance(self._message, messages.DataRow):
+                pending += 1
+            if (isinstance(message, messages.PortalSuspended)
+                    and self._portal_rows_left == pending):
+                if self.connection.parameters.get('auto_commit', 'on') == 'off':
+                    # end the exchange and discard its response, the portal stays open
+                    self.connection.write(messages.Sync())
+                    message = self.connection.read_message()
+                    while not isinstance(message, messages.ReadyForQuery):
+                        message = self.connection.read_message()
+                    self.connection.transaction_status = message.transaction_status
+                    return
+
+                # fetch the remaining rows in place of the suspension
+                suspended = not self._buffer  # the suspension is the current message
+                if not suspended:
+                    self._buffer.pop()
+                self.connection.write(messages.Execute(self.portal_name, 0))
+                self.connection.write(messages.Flush())
+                message = self.connection.read_message()
+                if suspended:
+                    self._message = message
+                else:
+                    self._buffer.append(message)
+                while not isinstance(message, (messages.CommandComplete, messages.ErrorResponse)):
+                    message = self.connection.read_message()
+                    self._buffer.append(message)
+
+            self._portal_open = False
+            if not isinstance(message, messages.ErrorResponse):
+                self.connection.write(messages.Close('portal', self.portal_name))
+            self.connection.write(messages.Sync())
+
+        while not isinstance(message, messages.ReadyForQuery):
+            message = self.connection.read_message()
+            self._buffer.append(message)
+        self.connection.transaction_status = message.transaction_status
+
+    def _fetch_data_row(self):
+        # Returns the next DataRow message of the current result set, or None
+        while True:
+            if isinstance(self._message, messages.DataRow):
+                if self.rowcount == -1:
+                    self.rowcount = 1
+                else:
+                    self.rowcount += 1
+                if self._portal_open:
+                    self._portal_rows_left -= 1
+                row_data = self._message
+                # fetch next message
+                self._message = self._read_message()
+                return row_data
+            elif isinstance(self._message, messages.RowDescription):
+                self._set_description(self._message)
+            elif isinstance(self._message, messages.ReadyForQuery):
+                return None
+            elif (self._portal_open and isinstance(self._message, messages.PortalSuspended)
+                    and self._portal_rows_left == 0):
+                # the server sent the requested number of rows, fetch the next
+                # rows of the server-side cursor
+                self._execute_portal_rows()
+            elif isinstance(self._message, END_OF_RESULT_RESPONSES):
+                if self._portal_open:
+                    self._close_portal()
+                return None
+            elif isinstance(self._message, messages.EmptyQueryResponse):
+                pass
+            elif isinstance(self._message, messages.ErrorResponse):
+                if self._portal_open:
+                    # the server ignores messages until a Sync
+                    self._portal_open = False
+                    self.connection.write(messages.Sync())
+                raise errors.QueryError.from_error_response(self._message, self.operation)
+            else:
+                raise errors.MessageError('Unexpected fetchone() state: {}'.format(
+                                    type(self._message).__name__))
+
+            self._message = self._read_message()
+
+    def _fetch_column_buffers(self, size=None):
+        """
+        Reads up to size (default: all) remaining rows of the current result
+        set into one ColumnBuffer per column.
+        """
+        row_data = self._fetch_data_row()
+        if self.description is None:
+            return []
+        buffers = [ColumnBuffer(column) for column in self.description]
+        appenders = tuple(enumerate(buf.append for buf in buffers))
+        count = 0
+        while row_data is not None:
+            for idx, append in appenders:
+                append(row_data.value(idx))
+            count += 1
+            if count == size:
+                break
+            row_data = self._fetch_data_row()
+        return buffers
+
+    def _set_description(self, row_description, binary_transfer=False):
+        self.description = [Column(fd, self.unicode_error, binary_transfer)
+                            for fd in row_description.fields]
+        self._column_names = tuple(column.name for column in self.description)
+        self._row_decoder = _make_row_decoder(self.description)
+
     def row_formatter(self, row_data):
         if self.cursor_type is None:
             return self.format_row_as_array(row_data)
@@ -401,61 +1109,61 @@ class Cursor(object):
             raise TypeError('Unrecognized cursor_type: {0}'.format(self.cursor_type))
 
     def format_row_as_dict(self, row_data):
-        return OrderedDict(
-            (self.description[idx].name, self.description[idx].convert(value))
-            for idx, value in enumerate(row_data.values)
-        )
+        return OrderedDict(zip(self._column_names, self._row_decoder(row_data)))
 
     def format_row_as_array(self, row_data):
-        return [self.description[idx].convert(value)
-                for idx, value in enumerate(row_data.values)]
+        return self._row_decoder(row_data)
 
     # noinspection PyArgumentList
     def format_operation_with_parameters(self, operation, parameters, is_csv=False):
         operation = as_text(operation)
 
         if isinstance(parameters, dict):
+            values = {}
             for key, param in six.iteritems(parameters):
                 if not isinstance(key, string_types):
                     key = str(key)
                 key = as_text(key)
-
-                if isinstance(param, (string_types, bytes)):
-                    param = self.format_quote(as_text(param), is_csv)
-                elif isinstance(param, (datetime.datetime, datetime.date, datetime.time, UUID)):
-                    param = self.format_quote(as_text(str(param)), is_csv)
-                elif param is None:
-                    param = '' if is_csv else NULL
-                else:
-                    param = str(param)
-                value = as_text(param)
-
-                # Using a regex with word boundary to correctly handle params with similar names
-                # such as :s and :start
-                match_str = u":{0}\\b".format(key)
-                operation = re.sub(match_str, value, operation, flags=re.U)
+                value = self._format_parameter(param, is_csv)
+                if u'\\' in value:
+                    # backslash escapes are processed as in a re.sub() replacement
+                    value = RE_EMPTY_STRING.sub(value, u'')
+                values[key] = value
+
+            if all(RE_WORD.match(key) for key in values):
+                # Substitute the :name placeholders found when the operation was
+                # tokenized. As with a word boundary, :s does not match :start
+                texts, names = _named_template(operation)
+                parts = [texts[0]]
+                for name, text in zip(names, texts[1:]):
+                    parts.append(values.get(name, u':' + name))
+                    parts.append(text)
+                operation = u''.join(parts)
+            else:
+                for key, value in six.iteritems(values):
+                    operation = re.sub(u":{0}\\b".format(key), lambda _: value, operation,
+                                       flags=re.U)
 
         elif isinstance(parameters, (tuple, list)):
-            tlist = []
-            for param in parameters:
-                if isinstance(param, (string_types, bytes)):
-                    param = self.format_quote(as_text(param), is_csv)
-                elif isinstance(param, (datetime.datetime, datetime.date, datetime.time, UUID)):
-                    param = self.format_quote(as_text(str(param)), is_csv)
-                elif param is None:
-                    param = '' if is_csv else NULL
-                else:
-                    param = str(param)
-                value = as_text(param)
-
-                tlist.append(value)
-
-            operation = operation % tuple(tlist)
+            operation = operation % tuple(self._format_parameter(param, is_csv)
+                                          for param in parameters)
         else:
             raise TypeError("Argument 'parameters' must be dict or tuple/list")
 
         return operation
 
+    def _format_parameter(self, param, is_csv):
+        # Returns the SQL literal of a parameter for client-side bindings
+        if isinstance(param, (string_types, bytes)):
+            param = self.format_quote(as_text(param), is_csv)
+        elif isinstance(param, (datetime.datetime, datetime.date, datetime.time, UUID)):
+            param = self.format_quote(as_text(str(param)), is_csv)
+        elif param is None:
+            param = '' if is_csv else NULL
+        else:
+            param = str(param)
+        return as_text(param)
+
     def format_quote(self, param, is_csv):
         if is_csv:
             return u'"{0}"'.format(re.escape(param))
@@ -478,15 +1186,56 @@ class Cursor(object):
         #   RowDescription: This is the "normal" case when executing a query.
         #                   It marks the start of the results.
         #   CommandComplete: This occurs when executing DDL/transactions.
-        self._message = self.connection.read_message()
+        self._message = self._read_message()
         if isinstance(self._message, messages.ErrorResponse):
             raise errors.QueryError.from_error_response(self._message, query)
         elif isinstance(self._message, messages.RowDescription):
-            self.description = [Column(fd, self.unicode_error) for fd in self._message.fields]
-            self._message = self.connection.read_message()
+            self._set_description(self._message)
+            self._message = self._read_message()
             if isinstance(self._message, messages.ErrorResponse):
                 raise errors.QueryError.from_error_response(self._message, query)
 
+    def _execute_hot_statement(self, operation, parameters):
+        """
+        Counts the executions of an operation using client-side bindings, and
+        executes it as a prepared statement once it has been executed
+        prepare_threshold times, if it can be rewritten into one.
+
+        Returns True if the operation has been executed.
+        """
+        # keyed by the exact text: entry[1] is the rewrite of this very text
+        entry = self.connection._execution_counter.add(operation)
+        if entry[0] < self.connection.options['prepare_threshold'] or entry[1] is False:
+            return False
+
+        if entry[1] is None:
+            entry[1] = _to_prepared_operation(operation, parameters) or False
+        if entry[1] is False:
+            return False
+        prepared_operation, names = entry[1]
+        if isinstance(parameters, dict):
+            if not all(name in parameters for name in names):
+                return False
+            values = [parameters[name] for name in names]
+        else:
+            values = list(parameters or ())
+            if len(values) != len(names):
+                return False
+        if not all(value is None or isinstance(value, PREPARABLE_VALUE_TYPES) for value in values):
+            return False
+
+        try:
+            self._prepare(prepared_operation)
+        except errors.QueryError:
+            # keep executing it with client-side bindings
+            self._logger.info(u'Cannot prepare the statement: [{}]'.format(prepared_operation))
+            entry[1] = False
+            self.flush_to_query_ready()
+            return False
+        self.prepared_sql = prepared_operation
+        self._execute_prepared_statement([values])
+        return True
+
     def _error_handler(self, msg):
         self.connection.write(messages.Sync())
         raise errors.QueryError.from_error_response(msg, self.operation)
@@ -495,9 +1244,27 @@ class Cursor(object):
         """
         Send the query to be prepared to the server. The server will parse the
         query and return some metadata.
+
+        Prepared statements are kept in the statement cache of the connection:
+        if query is found there, its metadata is taken from the cache and
+        nothing is sent.
         """
+        cache = self.connection._statement_cache
+        statement = cache.get(query)
+        if statement is not None:
+            self._use_statement(statement)
+            return
+
         self._logger.info(u'Prepare a statement: [{}]'.format(query))
 
+        # Close the least recently used statements if the cache is full, in
+        # the same round trip
+        evicted = cache.make_room()
+        for old in evicted:
+            self._logger.info(u'Close the prepared statement {}'.format(old.name))
+            self.connection.write(messages.Close('prepared_statement', old.name))
+
+        self.prepared_name = cache.next_name()
         # Send Parse message to server
         # We don't need to tell the server the parameter types yet
         self.connection.write(messages.Parse(self.prepared_name, query, param_types=()))
@@ -505,6 +1272,9 @@ class Cursor(object):
         self.connection.write(messages.Describe('prepared_statement', self.prepared_name))
         self.connection.write(messages.Flush())
 
+        for _ in evicted:
+            self.connection.read_expected_message(messages.CloseComplete, self._error_handler)
+
         # Read expected message: ParseComplete
         self._message = self.connection.read_expected_message(messages.ParseComplete, self._error_handler)
 
@@ -515,10 +1285,7 @@ class Cursor(object):
         # Read expected message: RowDescription or NoData
         self._message = self.connection.read_expected_message(
                         (messages.RowDescription, messages.NoData), self._error_handler)
-        if isinstance(self._message, messages.NoData):
-            self.description = None # response was NoData for a DDL/transaction PreparedStatement
-        else:
-            self.description = [Column(fd, self.unicode_error) for fd in self._message.fields]
+        row_description = self._message if isinstance(self._message, messages.RowDescription) else None
 
         # Read expected message: CommandDescription
         self._message = self.connection.read_expected_message(messages.CommandDescription, self._error_handler)
@@ -528,8 +1295,112 @@ class Cursor(object):
             self.connection.write(messages.Sync())
             raise errors.EmptyQueryError(msg)
 
+        statement = PreparedStatement(self.prepared_name, query, self._param_metadata,
+                                      row_description)
+        cache.add(statement)
+        self._use_statement(statement)
         self._logger.info('Finish preparing the statement')
 
+    def _prepare_and_execute(self, query, parameters):
+        """
+        Prepares and executes a statement that is not in the statement cache
+        in a single round trip: Parse, Describe, Bind, Execute and Sync are
+        sent together. The statement is parsed without parameter types, so the
+        server chooses them as it does in _prepare() and the cached statement
+        can be executed later with parameters of other Python types. This first
+        execution binds the parameters in text format, with types inferred from
+        their Python types instead of read from the ParameterDescription, and
+        its results are in text format too.
+
+        Returns False, without sending anything, if the statement is cached or
+        the type of a parameter cannot be inferred.
+        """
+        cache = self.connection._statement_cache
+        parameters = parameters or ()
+        if query in cache:
+            return False
+        parameter_type_oids = [_parameter_type_oid(value) for value in parameters]
+        if None in parameter_type_oids:
+            return False
+
+        self._logger.info(u'Prepare and execute a statement: [{}]'.format(query))
+        evicted = cache.make_room()
+        for old in evicted:
+            self._logger.info(u'Close the prepared statement {}'.format(old.name))
+            self.connection.write(messages.Close('prepared_statement', old.name))
+        self.prepared_name = cache.next_name()
+        self.prepared_sql = query
+        self.connection.write(messages.Parse(self.prepared_name, query, param_types=()))
+        self.connection.write(messages.Describe('prepared_statement', self.prepared_name))
+        self.connection.write(messages.Bind("", self.prepared_name, parameters,
+                                            parameter_type_oids, None, False))
+        self.connection.write(messages.Execute("", 0))
+        self.connection.write(messages.Sync())
+
+        read = self.connection.read_expected_message
+        for _ in evicted:
+            read(messages.CloseComplete, self._sync_error_handler)
+        read(messages.ParseComplete, self._sync_error_handler)
+        parameter_description = read(messages.ParameterDescription, self._sync_error_handler)
+        row_description = read((messages.RowDescription, messages.NoData), self._sync_error_handler)
+        if isinstance(row_description, messages.NoData):
+            row_description = None
+        command_description = read(messages.CommandDescription, self._sync_error_handler)
+        statement = PreparedStatement(self.prepared_name, query, parameter_description.parameters,
+                                      row_description)
+        if len(command_description.command_tag) == 0:
+            msg = 'The statement being prepared is empty'
+            self._logger.error(msg)
+            # the statement is closed with the next one prepared, and the
+            # responses to Bind, Execute and Sync are discarded
+            cache.add(statement)
+            cache.discard(query)
+            self._message = command_description
+            self.flush_to_query_ready()
+            raise errors.EmptyQueryError(msg)
+
+        cache.add(statement)
+        self._use_statement(statement)
+        if row_description is not None:
+            self._set_description(row_description)
+
+        read(messages.BindComplete, self._statement_error_handler)
+        self._message = self._read_message()
+        if isinstance(self._message, messages.ErrorResponse):
+            self._statement_error_handler(self._message)
+        return True
+
+    def _sync_error_handler(self, msg):
+        # The Sync has already been sent: the ReadyForQuery is read by the next
+        # fetch or execute
+        self._message = msg
+        raise errors.QueryError.from_error_response(msg, self.operation)
+
+    def _statement_error_handler(self, msg):
+        # The execution of a cached statement failed. The Sync has already
+        # been sent.
+        self._discard_stale_statement(msg)
+        self._message = msg
+        raise errors.QueryError.from_error_response(msg, self.prepared_sql)
+
+    def _discard_stale_statement(self, error_response):
+        # A statement that failed because it is stale is prepared again by its
+        # next execution. Other errors, e.g. a constraint violation, keep it.
+        if error_response.sqlstate in STALE_STATEMENT_SQLSTATES:
+            self.connection._statement_cache.discard(self.prepared_sql)
+
+    def _use_statement(self, statement):
+        # Makes the prepared statement the one bound by the next Bind messages
+        self.prepared_name = statement.name
+        self._param_metadata = statement.parameters
+        if statement.row_description is None:
+            self.description = None # response was NoData for a DDL/transaction PreparedStatement
+            self._result_format_codes = None
+        else:
+            self._set_description(statement.row_description,
+                                  self.connection.options['binary_transfer'])
+            self._result_format_codes = [column.format_code for column in self.description]
+
     def _execute_prepared_statement(self, list_of_parameter_values):
         """
         Send multiple statement parameter sets to the server using the extended
@@ -542,6 +1413,7 @@ class Cursor(object):
         portal_name = ""
         parameter_type_oids = [metadata['data_type_oid'] for metadata in self._param_metadata]
         parameter_count = len(self._param_metadata)
+        binary_transfer = self.connection.options['binary_transfer']
 
         try:
             if len(list_of_parameter_values) == 0:
@@ -555,32 +1427,203 @@ class Cursor(object):
                            .format(parameter_values, len(parameter_values), parameter_count))
                     raise ValueError(msg)
                 self.connection.write(messages.Bind(portal_name, self.prepared_name,
-                                             parameter_values, parameter_type_oids))
+                                             parameter_values, parameter_type_oids,
+                                             self._result_format_codes, binary_transfer))
                 self.connection.write(messages.Execute(portal_name, 0))
             self.connection.write(messages.Sync())
         except Exception as e:
             self._logger.error(str(e))
             # the server will not send anything until we issue a sync
             self.connection.write(messages.Sync())
-            self._message = self.connection.read_message()
+            self._message = self._read_message()
             raise
 
         self.connection.write(messages.Flush())
 
         # Read expected message: BindComplete
-        self.connection.read_expected_message(messages.BindComplete)
+        self.connection.read_expected_message(messages.BindComplete, self._statement_error_handler)
 
-        self._message = self.connection.read_message()
+        self._message = self._read_message()
         if isinstance(self._message, messages.ErrorResponse):
-            raise errors.QueryError.from_error_response(self._message, self.prepared_sql)
+            self._statement_error_handler(self._message)
 
-    def _close_prepared_statement(self):
+    def _execute_prepared_batch(self, seq_of_parameters):
         """
-        Close the prepared statement on the server.
+        Executes the prepared statement once per parameter set, pipelined:
+        parameter sets are sent DEFAULT_EXECUTEMANY_WINDOW at a time and the
+        responses of a window are read while the next one is processed by the
+        server, so neither side accumulates a whole batch of responses.
+
+        The affected row counts of DML statements are collected in
+        batch_rowcounts, and their sum in rowcount. The results of other
+        statements are kept, to be fetched one parameter set at a time with
+        nextset().
+
+        All parameter sets are sent before a single Sync, so they run in the
+        same implicit transaction. If one fails, the following ones are
+        skipped by the server and the QueryError raised has the index of the
+        failing parameter set in its batch_index attribute.
+
+        This function should not be called without first calling _prepare() to
+        prepare a statement.
         """
-        self.prepared_sql = None
-        self.flush_to_query_ready()
-        self.connection.write(messages.Close('prepared_statement', self.prepared_name))
+        window = DEFAULT_EXECUTEMANY_WINDOW
+
+        self.batch_rowcounts = []
+        results = []  # messages of the parameter sets whose result is not a row count
+        sent = 0
+        try:
+            for parameter_values in seq_of_parameters:
+                self.connection.write(self._batch_bind(parameter_values))
+                self.connection.write(messages.Execute("", 0))
+                sent += 1
+                if sent % window == 0:
+                    self.connection.write(messages.Flush())
+                    # keep at most two windows in flight
+                    while sent - len(self.batch_rowcounts) > window:
+                        self._read_batch_result(results)
+        except BaseException as e:
+            # e.g. an invalid parameter set, a failed one, or an error raised
+            # by seq_of_parameters itself: the server will not send anything
+            # until we issue a sync
+            if not isinstance(e, errors.QueryError):
+                self._logger.error(str(e))
+            self.connection.write(messages.Sync())
+            self._discard_batch()
+            raise
+
+        self.connection.write(messages.Sync())
+        try:
+            while len(self.batch_rowcounts) < sent:
+                self._read_batch_result(results)
+        finally:
+            message = self._discard_batch()
+        self._end_batch(results, message)
+
+    def _batch_bind(self, parameter_values):
+        # Returns the Bind message of a parameter set of _execute_prepared_batch()
+        parameter_count = len(self._param_metadata)
+        if not isinstance(parameter_values, (list, tuple)):
+            raise TypeError("Each seq_of_parameters element should be a list/tuple")
+        if len(parameter_values) != parameter_count:
+            raise ValueError("Invalid number of parameters for {}: {} given, {} expected"
+                             .format(parameter_values, len(parameter_values), parameter_count))
+        return messages.Bind("", self.prepared_name, parameter_values,
+                             [metadata['data_type_oid'] for metadata in self._param_metadata],
+                             self._result_format_codes, self.connection.options['binary_transfer'])
+
+    def _read_batch_result(self, results):
+        # Reads the response to the next parameter set of _execute_prepared_batch()
+        rows = []
+        message = self.connection.read_message()
+        while not _batch_response(message, rows):
+            message = self.connection.read_message()
+        self._add_batch_result(rows, message, results)
+
+    def _add_batch_result(self, rows, message, results):
+        # Records the response (rows, then message) to the next parameter set
+        index = len(self.batch_rowcounts)
+        if isinstance(message, messages.ErrorResponse):
+            self._discard_stale_statement(message)
+            raise errors.QueryError.from_error_response(message, self.prepared_sql,
+                                                        batch_index=index)
+
+        tag = message.command_tag.split() if isinstance(message, messages.CommandComplete) else []
+        if tag and tag[0].upper() in DML_COMMANDS:
+            if tag[-1].isdigit():
+                count = int(tag[-1])
+            elif len(rows) == 1 and self.description:
+                count = self._row_decoder(rows[0])[0]
+            else:
+                count = -1
+        else:
+            count = -1
+            if results:
+                results.append(messages.BindComplete(b''))
+            results.extend(rows)
+            results.append(message)
+        self.batch_rowcounts.append(count)
+
+    def _end_batch(self, results, message):
+        # Makes the results of _execute_prepared_batch() those of the cursor,
+        # message is the ReadyForQuery that ends them
+        if results:
+            # fetch the first result, and the others with nextset()
+            self._buffer.extend(results[1:])
+            self._buffer.append(message)
+            self._message = results[0]
+        else:
+            self.rowcount = sum(count for count in self.batch_rowcounts if count > 0)
+
+    def _discard_batch(self):
+        # Discards the responses of _execute_prepared_batch() up to ReadyForQuery
+        message = self.connection.read_message()
+        while not isinstance(message, messages.ReadyForQuery):
+            message = self.connection.read_message()
+        self.connection.transaction_status = message.transaction_status
+        self._message = message
+        return message
+
+    def _execute_portal(self, parameter_values):
+        """
+        Bind the parameters of the prepared statement to a named portal and
+        fetch its first rows. The remaining rows are fetched arraysize rows at
+        a time as they are consumed, by resuming the portal each time the
+        server suspends it. The portal stays open until all of its rows are
+        fetched or the result is discarded.
+
+        This function should not be called without first calling _prepare() to
+        prepare a statement.
+        """
+        if parameter_values is None:
+            parameter_values = ()
+        parameter_type_oids = [metadata['data_type_oid'] for metadata in self._param_metadata]
+        if len(parameter_values) != len(parameter_type_oids):
+            msg = ("Invalid number of parameters for {}: {} given, {} expected"
+                   .format(parameter_values, len(parameter_values), len(parameter_type_oids)))
+            self._logger.error(msg)
+            self.connection.write(messages.Sync())
+            self._message = self._read_message()
+            raise ValueError(msg)
+
+        self._logger.info(u'Bind parameters to portal {}: {}'.format(self.portal_name, parameter_values))
+        self.connection.write(messages.Bind(self.portal_name, self.prepared_name,
+                                            parameter_values, parameter_type_oids,
+                                            self._result_format_codes,
+                                            self.connection.options['binary_transfer']))
+        self._portal_open = True
+        self._execute_portal_rows()
+
+        # Read expected message: BindComplete
+        self._message = self.connection.read_expected_message(messages.BindComplete,
+                                                              self._portal_error_handler)
+
+        self._message = self._read_message()
+        if isinstance(self._message, messages.ErrorResponse):
+            self._portal_error_handler(self._message)
+
+    def _execute_portal_rows(self):
+        # Requests the next rows of the portal of a server-side cursor
+        # arraysize rows are requested per Execute message
+        self._portal_rows_left = max(int(self.arraysize), 1)
+        self.connection._acquire(self)
+        self.connection.write(messages.Execute(self.portal_name, self._portal_rows_left))
         self.connection.write(messages.Flush())
-        self._message = self.connection.read_expected_message(messages.CloseComplete)
+
+    def _portal_error_handler(self, msg):
+        self._discard_stale_statement(msg)
+        self._message = msg
+        self._portal_open = False
+        self.connection.write(messages.Sync())
+        raise errors.QueryError.from_error_response(msg, self.prepared_sql)
+
+    def _close_portal(self):
+        """
+        Close the portal of a server-side cursor and end the extended query
+        protocol exchange. The responses (CloseComplete, ReadyForQuery) are
+        read by the next fetch or execute.
+        """
+        self._portal_open = False
+        self.connection._acquire(self)
+        self.connection.write(messages.Close('portal', self.portal_name))
         self.connection.write(messages.Sync())
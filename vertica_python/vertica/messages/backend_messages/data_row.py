@@ -33,9 +33,21 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+"""
+DataRow message
+
+A DataRow message carries the values of one row of a query result. Each field
+is sent as a 4-byte length followed by that many bytes; a length of -1
+indicates a NULL value.
+
+Fields are not copied out of the message when it is received. The message keeps
+a memoryview over its payload and an offset table, and a field is sliced only
+when it is accessed.
+"""
+
 from __future__ import print_function, division, absolute_import
 
-from struct import unpack, unpack_from
+from struct import unpack_from
 
 from six.moves import range
 
@@ -47,21 +59,43 @@ class DataRow(BackendMessage):
 
     def __init__(self, data):
         BackendMessage.__init__(self)
-        self.values = []
-        field_count = unpack('!H', data[0:2])[0]
+        self._data = memoryview(data)
+        self.field_count = unpack_from('!H', data, 0)[0]
+        self._offsets = None  # built on first access
+
+    def _build_offsets(self):
+        # (start, end) of each field in the payload, or None for a NULL value
+        offsets = []
+        data = self._data
         pos = 2
+        for _ in range(self.field_count):
+            size = unpack_from('!i', data, pos)[0]
+            pos += 4
+            if size == -1:
+                offsets.append(None)
+            else:
+                offsets.append((pos, pos + size))
+                pos += size
+        self._offsets = offsets
+        return offsets
 
-        for i in range(field_count):
-            size = unpack_from('!I', data, pos)[0]
+    def __len__(self):
+        return self.field_count
 
-            if size == 4294967295:
-                size = -1
+    def value(self, idx):
+        """Returns the raw bytes of the field at idx, or None if it is NULL"""
+        offsets = self._offsets if self._offsets is not None else self._build_offsets()
+        offset = offsets[idx]
+        if offset is None:
+            return None
+        return self._data[offset[0]:offset[1]].tobytes()
 
-            if size == -1:
-                self.values.append(None)
-            else:
-                self.values.append(unpack_from('{0}s'.format(size), data, pos + 4)[0])
-            pos += (4 + max(size, 0))
+    @property
+    def values(self):
+        offsets = self._offsets if self._offsets is not None else self._build_offsets()
+        data = self._data
+        return [None if offset is None else data[offset[0]:offset[1]].tobytes()
+                for offset in offsets]
 
 
 BackendMessage.register(DataRow)
@@ -39,13 +39,20 @@ Bind message
 In the extended query protocol, the frontend sends a Bind message to bind values
 to parameter placeholders present in an existing prepared statement.
 
+Parameter values are sent in text format by default. When binary parameters are
+enabled, INT8, FLOAT8, BOOL, DATE and TIMESTAMP values of a matching Python type
+are sent in binary format instead: BOOL as a single byte, INT8 and FLOAT8 as
+8-byte big-endian values, DATE as the number of days since 2000-01-01 and
+TIMESTAMP as the number of microseconds since 2000-01-01 00:00:00.
+
 The response is either BindComplete or ErrorResponse.
 """
 
 from __future__ import print_function, division, absolute_import
 
+from datetime import date, datetime
 from struct import pack
-from six import string_types
+from six import string_types, integer_types
 
 from ..message import BulkFrontendMessage
 from ....datatypes import VerticaType
@@ -55,15 +62,47 @@ UTF_8 = 'utf-8'
 BACKSLASH = b'\\'
 BACKSLASH_ESCAPE = b'\\134'
 
+FORMAT_TEXT = 0
+FORMAT_BINARY = 1
+
+MAX_INT8 = 2 ** 63 - 1
+EPOCH_DATE = date(2000, 1, 1)
+EPOCH_DATETIME = datetime(2000, 1, 1)
+
+
+def _binary_value(oid, val):
+    # Returns the binary encoding of val, or None if it should be sent as text
+    if oid == VerticaType.INT8:
+        if (isinstance(val, integer_types) and not isinstance(val, bool)
+                and -MAX_INT8 <= val <= MAX_INT8):
+            return pack('!q', val)
+    elif oid == VerticaType.FLOAT8:
+        if isinstance(val, (float,) + integer_types) and not isinstance(val, bool):
+            return pack('!d', val)
+    elif oid == VerticaType.BOOL:
+        return b'\x01' if str(val).lower() in ('t', 'true', 'y', 'yes', '1') else b'\x00'
+    elif oid == VerticaType.DATE:
+        if isinstance(val, date) and not isinstance(val, datetime):
+            return pack('!q', (val - EPOCH_DATE).days)
+    elif oid == VerticaType.TIMESTAMP:
+        if isinstance(val, datetime) and val.tzinfo is None:
+            delta = val - EPOCH_DATETIME
+            return pack('!q', (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+    return None
+
+
 class Bind(BulkFrontendMessage):
     message_id = b'B'
 
-    def __init__(self, portal_name, prepared_statement_name, parameter_values, parameter_type_oids):
+    def __init__(self, portal_name, prepared_statement_name, parameter_values, parameter_type_oids,
+                 result_format_codes=None, binary_parameters=False):
         BulkFrontendMessage.__init__(self)
         self._portal_name = portal_name
         self._prepared_statement_name = prepared_statement_name
         self._parameter_values = parameter_values
         self._parameter_type_oids = parameter_type_oids
+        self._result_format_codes = result_format_codes
+        self._binary_parameters = binary_parameters
 
     def read_bytes(self):
         utf_portal_name = self._portal_name.encode(UTF_8)
@@ -72,25 +111,28 @@ class Bind(BulkFrontendMessage):
         bytes_ = pack('!{0}sx{1}sx'.format(len(utf_portal_name), len(utf_prepared_statement_name)),
                       utf_portal_name, utf_prepared_statement_name)
 
-        # Parameter format codes -- use the default format (text)
-        bytes_ += pack('!H', 0)
-
-        # Number of parameters
-        bytes_ += pack('!H', len(self._parameter_type_oids))
-
-        param_bytes_ = b''
+        param_format_codes = []
+        param_bytes_ = []
         for oid, val in zip(self._parameter_type_oids, self._parameter_values):
-            # Parameter type oids
-            bytes_ += pack('!I', oid)
             # Parameter values
             if val is None:  # -1 indicates a NULL parameter value
-                param_bytes_ += pack('!i', -1)
-            elif oid in (VerticaType.BINARY, VerticaType.VARBINARY, VerticaType.LONGVARBINARY):
+                param_format_codes.append(FORMAT_TEXT)
+                param_bytes_.append(pack('!i', -1))
+                continue
+
+            if self._binary_parameters:
+                binary_val = _binary_value(oid, val)
+                if binary_val is not None:
+                    param_format_codes.append(FORMAT_BINARY)
+                    param_bytes_.append(pack('!I', len(binary_val)) + binary_val)
+                    continue
+
+            param_format_codes.append(FORMAT_TEXT)
+            if oid in (VerticaType.BINARY, VerticaType.VARBINARY, VerticaType.LONGVARBINARY):
                 # Encode binary data as UTF8 bytes
                 val = as_bytes(val)
                 # Escape the byte value \ with "\134"(octal for backslash)
                 val = val.replace(BACKSLASH, BACKSLASH_ESCAPE)
-                param_bytes_ += pack('!I{0}s'.format(len(val)), len(val), val)
             else:
                 # Convert input to string
                 if oid == VerticaType.BOOL:
@@ -99,11 +141,30 @@ class Bind(BulkFrontendMessage):
                     val = str(val)
                 # Encode string as UTF8 bytes
                 val = val.encode(UTF_8) if not isinstance(val, bytes) else val
-                param_bytes_ += pack('!I{0}s'.format(len(val)), len(val), val)
+            param_bytes_.append(pack('!I', len(val)) + val)
+
+        # Parameter format codes -- one code per parameter, or none to use
+        # the default format (text) for all parameters
+        if FORMAT_BINARY in param_format_codes:
+            bytes_ += pack('!H{0}H'.format(len(param_format_codes)),
+                           len(param_format_codes), *param_format_codes)
+        else:
+            bytes_ += pack('!H', 0)
+
+        # Number of parameters
+        bytes_ += pack('!H', len(self._parameter_type_oids))
+
+        # Parameter type oids
+        bytes_ += pack('!{0}I'.format(len(self._parameter_type_oids)), *self._parameter_type_oids)
 
-        bytes_ += param_bytes_
+        bytes_ += b''.join(param_bytes_)
 
-        # Result column format codes -- use the default format (text)
-        bytes_ += pack('!H', 0)
+        # Result column format codes -- one code (0 text, 1 binary) per column,
+        # or none to use the default format (text) for all columns
+        if self._result_format_codes and any(self._result_format_codes):
+            bytes_ += pack('!H{0}H'.format(len(self._result_format_codes)),
+                           len(self._result_format_codes), *self._result_format_codes)
+        else:
+            bytes_ += pack('!H', 0)
 
         return bytes_
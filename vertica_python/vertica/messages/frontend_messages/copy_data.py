@@ -49,7 +49,7 @@ class CopyData(BulkFrontendMessage):
         BulkFrontendMessage.__init__(self)
         self._unicode_error = unicode_error
         if isinstance(data, text_type):
-            self._data = self._data.encode(encoding=UTF_8, errors=self._unicode_error)
+            self._data = data.encode(encoding=UTF_8, errors=self._unicode_error)
         elif isinstance(data, binary_type):
             self._data = data
         else:
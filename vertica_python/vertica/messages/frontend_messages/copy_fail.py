@@ -37,8 +37,12 @@ from __future__ import print_function, division, absolute_import
 
 from struct import pack
 
+from six import text_type
+
 from ..message import BulkFrontendMessage
 
+UTF_8 = 'utf-8'
+
 
 class CopyFail(BulkFrontendMessage):
     message_id = b'f'
@@ -48,5 +52,8 @@ class CopyFail(BulkFrontendMessage):
         self._error_message = error_message
 
     def read_bytes(self):
-        bytes_ = pack('{0}sx'.format(len(self._error_message)), self._error_message)
+        encoded = self._error_message
+        if isinstance(encoded, text_type):
+            encoded = encoded.encode(UTF_8)
+        bytes_ = pack('{0}sx'.format(len(encoded)), encoded)
         return bytes_
@@ -0,0 +1,225 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Writer of the NATIVE binary load format of COPY
+
+A NativeEncoder encodes rows of Python values in the format loaded by
+COPY ... FROM STDIN NATIVE: a file header listing the width of every column,
+followed by one record per row made of the row length, a bit field of the NULL
+values and the values, in little-endian order. The server loads the values as
+they are, without parsing text.
+
+The encoding of the values is driven by the types of the target columns, taken
+from the RowDescription of a query on them.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import operator
+from decimal import Context, Decimal, ROUND_HALF_UP
+from struct import Struct
+
+from six import binary_type, text_type
+
+from .. import errors
+from ..datatypes import VerticaType
+from .column import EPOCH_ORDINAL, USECS_PER_DAY
+
+SIGNATURE = b'NATIVE\n\xff\r\n\x00'
+FORMAT_VERSION = 1
+VARIABLE_WIDTH = 0xFFFFFFFF
+
+USECS_PER_SECOND = 1000000
+
+UTF_8 = 'utf-8'
+
+_UINT16 = Struct('<H')
+_UINT32 = Struct('<I')
+_INT64 = Struct('<q')
+_UINT64 = Struct('<Q')
+_FLOAT64 = Struct('<d')
+
+
+def _encode_bool(value):
+    return b'\x01' if value else b'\x00'
+
+
+def _encode_int(value):
+    return _INT64.pack(operator.index(value))
+
+
+def _encode_float(value):
+    return _FLOAT64.pack(float(value))
+
+
+def _encode_date(value):
+    return _INT64.pack(value.toordinal() - EPOCH_ORDINAL)
+
+
+def _time_usecs(value):
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * USECS_PER_SECOND + value.microsecond
+
+
+def _encode_time(value):
+    return _INT64.pack(_time_usecs(value))
+
+
+def _encode_timestamp(value):
+    days = value.toordinal() - EPOCH_ORDINAL
+    return _INT64.pack(days * USECS_PER_DAY + _time_usecs(value))
+
+
+def _encode_timestamp_tz(value):
+    # naive datetimes are taken as UTC
+    offset = value.utcoffset()
+    if offset is not None:
+        value = (value - offset).replace(tzinfo=None)
+    return _encode_timestamp(value)
+
+
+def _encode_interval(value):
+    return _INT64.pack((value.days * 86400 + value.seconds) * USECS_PER_SECOND + value.microseconds)
+
+
+def _as_bytes(value):
+    if isinstance(value, text_type):
+        return value.encode(UTF_8)
+    elif isinstance(value, (binary_type, bytearray, memoryview)):
+        return binary_type(value)
+    raise TypeError('Expected a string or bytes, got {!r}'.format(value))
+
+
+def _encode_variable(value):
+    value = _as_bytes(value)
+    return _UINT32.pack(len(value)) + value
+
+
+def _fixed_encoder(width, padding):
+    def encode(value):
+        value = _as_bytes(value)
+        if len(value) > width:
+            raise ValueError('Value too long for a column of {} bytes: {!r}'.format(width, value))
+        return value + padding * (width - len(value))
+    return encode
+
+
+def _numeric_encoder(precision, scale):
+    # two's complement of the value scaled by 10^scale, in 64-bit words from
+    # the most significant one, each in little-endian order
+    words = precision // 19 + 1
+    bits = words * 64
+    limit = 10 ** precision
+    exponent = Decimal(1).scaleb(-scale)
+    context = Context(prec=precision + scale + 1, rounding=ROUND_HALF_UP)
+
+    def encode(value):
+        unscaled = int(Decimal(value).quantize(exponent, context=context).scaleb(scale, context=context))
+        if not -limit < unscaled < limit:
+            raise ValueError('Value out of range for NUMERIC({}, {}): {}'.format(precision, scale, value))
+        unscaled &= (1 << bits) - 1
+        return b''.join([_UINT64.pack((unscaled >> (64 * i)) & 0xFFFFFFFFFFFFFFFF)
+                         for i in reversed(range(words))])
+    return words * 8, encode
+
+
+FIXED_ENCODERS = {
+    VerticaType.BOOL: (1, _encode_bool),
+    VerticaType.INT8: (8, _encode_int),
+    VerticaType.FLOAT8: (8, _encode_float),
+    VerticaType.DATE: (8, _encode_date),
+    VerticaType.TIME: (8, _encode_time),
+    VerticaType.TIMESTAMP: (8, _encode_timestamp),
+    VerticaType.TIMESTAMPTZ: (8, _encode_timestamp_tz),
+    VerticaType.INTERVAL: (8, _encode_interval),
+}
+
+VARIABLE_TYPES = (VerticaType.VARCHAR, VerticaType.LONGVARCHAR,
+                  VerticaType.VARBINARY, VerticaType.LONGVARBINARY)
+
+
+def column_encoder(column):
+    """
+    Returns (width, encoder) for a column of the RowDescription of the target
+    columns. width is VARIABLE_WIDTH for variable-length types.
+    :raises NotSupportedError for types without a NATIVE encoding here
+    """
+    type_code = column.props.type_code
+    if type_code in FIXED_ENCODERS:
+        return FIXED_ENCODERS[type_code]
+    elif type_code in VARIABLE_TYPES:
+        return VARIABLE_WIDTH, _encode_variable
+    elif type_code == VerticaType.CHAR:
+        return column.display_size, _fixed_encoder(column.display_size, b' ')
+    elif type_code == VerticaType.BINARY:
+        return column.display_size, _fixed_encoder(column.display_size, b'\x00')
+    elif type_code == VerticaType.NUMERIC:
+        return _numeric_encoder(column.precision, column.scale)
+    raise errors.NotSupportedError(
+        'Column {} of type {} cannot be loaded in the NATIVE format'.format(
+            column.name, column.type_name))
+
+
+class NativeEncoder(object):
+    def __init__(self, columns):
+        encoders = [column_encoder(column) for column in columns]
+        widths = [width for width, _ in encoders]
+        self._encoders = [encode for _, encode in encoders]
+        self._null_bytes = (len(columns) + 7) // 8
+        body = (_UINT16.pack(FORMAT_VERSION) + b'\x00' + _UINT16.pack(len(columns)) +
+                b''.join([_UINT32.pack(width) for width in widths]))
+        self.header = SIGNATURE + _UINT32.pack(len(body)) + body
+
+    def encode_row(self, row):
+        if len(row) != len(self._encoders):
+            raise ValueError('Invalid number of values for {}: {} given, {} expected'
+                             .format(row, len(row), len(self._encoders)))
+        nulls = bytearray(self._null_bytes)
+        values = []
+        for index, (encode, value) in enumerate(zip(self._encoders, row)):
+            if value is None:
+                nulls[index >> 3] |= 0x80 >> (index & 7)
+            else:
+                values.append(encode(value))
+        data = b''.join(values)
+        # the row length does not count the NULL bit field
+        return _UINT32.pack(len(data)) + bytes(nulls) + data
+
+    def encode(self, rows):
+        """Yields the header, then the records of the rows"""
+        yield self.header
+        for row in rows:
+            yield self.encode_row(row)
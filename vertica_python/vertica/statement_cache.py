@@ -0,0 +1,154 @@
+# Copyright (c) 2018-2019 Micro Focus or one of its affiliates.
+# Copyright (c) 2018 Uber Technologies, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Copyright (c) 2013-2017 Uber Technologies, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Cache of the server-side prepared statements of a connection
+
+Preparing a statement costs a round trip to the server (Parse and Describe).
+The statements prepared on a connection are kept in an LRU cache keyed by their
+SQL text, together with the ParameterDescription and RowDescription returned by
+the server, so that executing a cached statement again only needs its Bind and
+Execute messages. The least recently used statement is closed on the server
+when the cache is full. A statement whose execution fails because it is
+stale, e.g. a table it uses has been dropped, is dropped from the cache too, to
+be prepared again by its next execution.
+
+With the prepare_threshold connection option, statements executed with
+client-side bindings are counted, and the ones executed often enough are
+prepared too.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from collections import OrderedDict
+
+DEFAULT_STATEMENT_CACHE_SIZE = 32
+
+# SQLSTATEs of the errors meaning that a prepared statement is stale
+STALE_STATEMENT_SQLSTATES = frozenset([
+    b'26000',  # invalid SQL statement name: the statement does not exist
+    b'3F000',  # undefined schema
+    b'42V01',  # undefined relation
+    b'42703',  # undefined column
+    b'42883',  # undefined function
+])
+
+
+class PreparedStatement(object):
+    def __init__(self, name, sql, parameters, row_description):
+        self.name = name
+        self.sql = sql
+        self.parameters = parameters  # metadata of ParameterDescription
+        self.row_description = row_description  # None for NoData
+
+
+class StatementCache(object):
+    def __init__(self, capacity=DEFAULT_STATEMENT_CACHE_SIZE):
+        # at least the statement being executed is kept
+        self.capacity = max(int(capacity), 1)
+        self._statements = OrderedDict()
+        self._discarded = []  # removed statements not closed yet
+        self._count = 0
+
+    def __len__(self):
+        return len(self._statements)
+
+    def __contains__(self, sql):
+        return sql in self._statements
+
+    def get(self, sql):
+        """Returns the PreparedStatement of sql, marked as most recently used, or None"""
+        statement = self._statements.pop(sql, None)
+        if statement is not None:
+            self._statements[sql] = statement
+        return statement
+
+    def next_name(self):
+        """Returns an unused name for a new prepared statement"""
+        self._count += 1
+        return 's{0}'.format(self._count)
+
+    def make_room(self):
+        """
+        Removes the least recently used statements so that one more statement
+        fits in the cache, and returns them with the discarded statements. They
+        have to be closed on the server.
+        """
+        evicted, self._discarded = self._discarded, []
+        while len(self._statements) >= self.capacity:
+            evicted.append(self._statements.popitem(last=False)[1])
+        return evicted
+
+    def add(self, statement):
+        self._statements.pop(statement.sql, None)
+        self._statements[statement.sql] = statement
+
+    def discard(self, sql):
+        """
+        Removes the statement of sql, e.g. after its execution failed. It is
+        returned by the next make_room(), to be closed on the server.
+        """
+        statement = self._statements.pop(sql, None)
+        if statement is not None:
+            self._discarded.append(statement)
+
+    def clear(self):
+        """Forgets all statements, e.g. when the session is closed"""
+        self._statements.clear()
+        del self._discarded[:]
+
+
+class ExecutionCounter(object):
+    """
+    Counts the executions of SQL statements, to find the ones worth
+    preparing. Only the capacity most recently executed statements are kept.
+    """
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+
+    def add(self, key):
+        """
+        Counts an execution of key. Returns its entry, a list of the
+        execution count and of a value left to the caller (initially None).
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            entry = [0, None]
+            if len(self._entries) >= self.capacity:
+                self._entries.popitem(last=False)
+        entry[0] += 1
+        self._entries[key] = entry
+        return entry